@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,6 +14,66 @@ class Settings(BaseSettings):
     CRYPTO_COMPARE_API_KEY: str
     JWT_SECRET: str
 
+    DB_COLUMNAR_FETCH: bool = True
+
+    # Read replica for read-only endpoints; reads fall back to the primary when unset
+    # or when the replica lags more than DB_READ_MAX_STALENESS_SECONDS
+    DATABASE_READ_URL: Optional[str] = None
+    DB_READ_MAX_STALENESS_SECONDS: float = 30
+    DB_READ_LAG_CHECK_INTERVAL_SECONDS: float = 5
+
+    # Connection pool, per engine and per process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    # asyncpg server-side prepared statements and SQLAlchemy's cache of them;
+    # set both to 0 behind a transaction-mode pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # In-process cache in front of Redis, kept coherent through Redis pub/sub
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_BYTES: int = 64 * 1024 * 1024
+
+    CACHE_CODEC: Literal['msgpack', 'json'] = 'msgpack'
+    CACHE_COMPRESSION_THRESHOLD_BYTES: int = 16 * 1024
+    # Payloads this large are encoded/decoded off the event loop
+    CACHE_CODEC_THREAD_THRESHOLD_BYTES: int = 256 * 1024
+    CACHE_CODEC_THREAD_MIN_ITEMS: int = 1000
+
+    # Cached endpoint variants precomputed after each portfolio consolidation
+    CACHE_WARM_ENABLED: bool = True
+    CACHE_WARM_CONCURRENCY: int = 4
+    CACHE_WARM_CURRENCIES: list[str] = ['BRL', 'USD']
+
+    # Interval of the per key prefix cache metrics log summary; 0 disables it
+    CACHE_METRICS_LOG_INTERVAL_SECONDS: float = 300
+
+    # Views of one dashboard batch request computed at once, each holding a connection
+    DASHBOARD_CONCURRENCY: int = 4
+
+    # Files built by report jobs; 'redis' unless the web service and the worker
+    # share REPORT_ARTIFACTS_DIR
+    REPORT_ARTIFACT_STORAGE: Literal['redis', 'disk'] = 'redis'
+    REPORT_ARTIFACTS_DIR: str = '/tmp/my-stonks-reports'
+    REPORT_ARTIFACT_TTL_SECONDS: int = 6 * 3600
+    # A report job queued or running without updates for this long is taken as
+    # dead (its message was lost or its worker killed) and can be requested again
+    REPORT_JOB_STALE_SECONDS: int = 10 * 60
+
+    # Response compression; brotli is preferred when the client accepts it
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_COMPRESSION_GZIP_LEVEL: int = 6
+    RESPONSE_COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Server-Timing header and a timing log line per request; only requests
+    # taking at least REQUEST_TIMING_LOG_MIN_MS are logged
+    SERVER_TIMING_ENABLED: bool = True
+    REQUEST_TIMING_LOG_MIN_MS: float = 0
+    # Stack sampling interval of `?profile=1` (superusers only)
+    PROFILE_SAMPLING_INTERVAL_SECONDS: float = 0.001
+
     CORS_ORIGINS: list[str] = [
         'https://my-stonks-front.onrender.com',
         'http://localhost:5173',
@@ -22,7 +82,7 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
 
-    @field_validator('DATABASE_URL', mode='before')
+    @field_validator('DATABASE_URL', 'DATABASE_READ_URL', mode='before')
     @classmethod
     def fix_postgres_scheme(cls, v: str) -> str:
         return v.replace('postgres://', 'postgresql://') if v else v
@@ -9,6 +9,7 @@ from app.domain.income_tax.constants import (
     TAX_RATE_STOCK,
 )
 from app.infra.db.models.constants.asset_type import ASSET_TYPE
+from app.utils.timing import timeit
 
 
 class TaxIncomeCalculator:
@@ -48,6 +49,7 @@ class TaxIncomeCalculator:
         else:
             raise ValueError("Invalid asset type")
 
+    @timeit('TaxIncomeCalculator.calculate_tax')
     def calculate_tax(self) -> pd.DataFrame:
         acc_loss = 0.0
 
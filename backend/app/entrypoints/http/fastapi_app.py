@@ -1,6 +1,7 @@
 # app/entrypoints/http/app.py
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,8 +9,16 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from app.config.logger import logger
 from app.config.settings import settings
+from app.entrypoints.http.middlewares import (
+    LAST_CONSOLIDATED_DATE_HEADER,
+    SERVER_TIMING_HEADER,
+    CompressionMiddleware,
+    ResponseHeadersMiddleware,
+    ServerTimingMiddleware,
+)
 from app.entrypoints.http.router import router as main_router
-from app.modules.users.views import setup_user_views
+from app.modules.users.views import is_superuser_request, setup_user_views
+from app.utils.response import TimedORJSONResponse
 
 
 @asynccontextmanager
@@ -19,10 +28,27 @@ async def lifespan(app: FastAPI):
         consolidate_indexes_history,
     )
 
+    from app.infra.redis.local_cache import listen_for_invalidations
+    from app.infra.redis.metrics import log_cache_metrics
+
     logger.info("🚀 Disparando consolidate_indexes_history no startup")
     run_task(consolidate_indexes_history)
+
+    background_tasks = []
+    if settings.CACHE_L1_ENABLED:
+        background_tasks.append(asyncio.create_task(listen_for_invalidations()))
+    if settings.CACHE_METRICS_LOG_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(log_cache_metrics(settings.CACHE_METRICS_LOG_INTERVAL_SECONDS))
+        )
+
     yield
 
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -30,6 +56,7 @@ def create_app() -> FastAPI:
         description='API for portfolio consolidation',
         version='1.0.0',
         lifespan=lifespan,
+        default_response_class=TimedORJSONResponse,
     )
 
     app.add_middleware(
@@ -38,10 +65,29 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=['*'],
         allow_headers=['*'],
+        expose_headers=['ETag', 'Last-Modified', LAST_CONSOLIDATED_DATE_HEADER, SERVER_TIMING_HEADER],
     )
 
     app.add_middleware(SessionMiddleware, secret_key=settings.JWT_SECRET)
 
+    app.add_middleware(ResponseHeadersMiddleware)
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.RESPONSE_COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY,
+    )
+
+    # Outermost, so the timing covers every other middleware
+    if settings.SERVER_TIMING_ENABLED:
+        app.add_middleware(
+            ServerTimingMiddleware,
+            authorize_profile=is_superuser_request,
+            profile_interval=settings.PROFILE_SAMPLING_INTERVAL_SECONDS,
+            log_min_ms=settings.REQUEST_TIMING_LOG_MIN_MS,
+        )
+
     setup_user_views(app)
     
     app.include_router(main_router)
@@ -0,0 +1,295 @@
+# app/entrypoints/http/middlewares.py
+
+import json
+import threading
+import zlib
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.logger import logger
+from app.utils.profiling import SamplingProfiler
+from app.utils.timing import reset_request_timings, start_request_timings
+
+# Request state key holding headers that dependencies want on the response
+RESPONSE_HEADERS_STATE = 'response_headers'
+
+# Latest date the server has for a time series, for clients syncing with `since`
+LAST_CONSOLIDATED_DATE_HEADER = 'X-Last-Consolidated-Date'
+
+
+def set_response_headers(request: Request, headers: dict[str, str]):
+    """Headers for ResponseHeadersMiddleware to add to the response of `request`."""
+    state_headers = getattr(request.state, RESPONSE_HEADERS_STATE, None) or {}
+    setattr(request.state, RESPONSE_HEADERS_STATE, {**state_headers, **headers})
+
+
+def set_last_consolidated_date(request: Request, last_date: Optional[date]):
+    if last_date is not None:
+        set_response_headers(request, {LAST_CONSOLIDATED_DATE_HEADER: last_date.isoformat()})
+
+
+class ResponseHeadersMiddleware:
+    """
+    Adds the headers a dependency stored in `request.state.response_headers` to
+    successful responses. Works for endpoints that build their own Response,
+    which the injected `Response` parameter does not reach.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message['type'] == 'http.response.start' and 200 <= message['status'] < 300:
+                extra_headers = scope.get('state', {}).get(RESPONSE_HEADERS_STATE)
+                if extra_headers:
+                    message = {
+                        **message,
+                        'headers': [
+                            *message.get('headers', []),
+                            *((name.lower().encode('latin-1'), value.encode('latin-1'))
+                              for name, value in extra_headers.items()),
+                        ],
+                    }
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+
+class ServerTimingMiddleware:
+    """
+    Breaks each request's time down into DB, Redis, serialization, compute and
+    the rest (see app/utils/timing.py), sent as a `Server-Timing` header and
+    logged as one JSON line once the response is complete. The header is sent
+    with the response start, so a streamed body's time is only in the log.
+
+    `?profile=1` on a request `authorize_profile` accepts returns, instead of
+    the response, a sampling profile of the request in the folded stack format
+    (see app/utils/profiling.py).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        authorize_profile: Optional[Callable[[Request], Awaitable[bool]]] = None,
+        profile_interval: float = 0.001,
+        log_min_ms: float = 0,
+    ):
+        self.app = app
+        self.authorize_profile = authorize_profile
+        self.profile_interval = profile_interval
+        self.log_min_ms = log_min_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request_timings()
+        status_code = None
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                MutableHeaders(scope=message).append(SERVER_TIMING_HEADER, timings.server_timing())
+            await send(message)
+
+        try:
+            if await self._profile_requested(scope):
+                await self._profile(scope, receive, send_with_timing)
+            else:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            reset_request_timings(token)
+            summary = timings.summary()
+            if summary['total_ms'] >= self.log_min_ms:
+                logger.info('request_timing %s', json.dumps({
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'status': status_code,
+                    **summary,
+                }))
+
+    async def _profile_requested(self, scope: Scope) -> bool:
+        if self.authorize_profile is None:
+            return False
+        query = QueryParams(scope['query_string'].decode('latin-1'))
+        if query.get('profile') not in ('1', 'true'):
+            return False
+        return await self.authorize_profile(Request(scope))
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send):
+        status_code = None
+
+        async def discard(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+        # The middleware runs on the event loop thread, the one to sample
+        profiler = SamplingProfiler(threading.get_ident(), self.profile_interval)
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        response = Response(
+            profiler.folded(),
+            media_type='text/plain; charset=utf-8',
+            headers={'X-Profiled-Status': str(status_code)},
+        )
+        await response(scope, receive, send)
+
+
+# Streams that must reach the client chunk by chunk, or that are already compressed
+UNCOMPRESSED_MEDIA_TYPES = (
+    'text/event-stream',
+    'application/zip',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.apache.parquet',
+    'application/vnd.apache.arrow.stream',
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level: int):
+        # wbits=31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies of at least `minimum_size` bytes with brotli or
+    gzip, whichever the client accepts (brotli first). Responses that already
+    carry a Content-Encoding, event streams and compressed file formats are
+    passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compressor(self, scope: Scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get('accept-encoding', ''))
+        if 'br' in accepted:
+            return _BrotliCompressor(self.brotli_quality)
+        if 'gzip' in accepted or '*' in accepted:
+            return _GzipCompressor(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        compressor = self._compressor(scope)
+        if compressor is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        compressing = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, compressing
+
+            if message['type'] == 'http.response.start':
+                # Held back until the first body chunk tells us whether to compress
+                start_message = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                passthrough = (
+                    'content-encoding' in headers
+                    or headers.get('content-type', '').startswith(UNCOMPRESSED_MEDIA_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if not passthrough:
+                    compressing = True
+                    headers['Content-Encoding'] = compressor.encoding
+                    headers.add_vary_header('Accept-Encoding')
+                    if more_body:
+                        del headers['content-length']
+                    else:
+                        body = compressor.compress(body) + compressor.finish()
+                        headers['Content-Length'] = str(len(body))
+                        message = {**message, 'body': body}
+                await send(start_message)
+                start_message = None
+                if not compressing or not more_body:
+                    await send(message)
+                    return
+
+            if compressing:
+                body = compressor.compress(body)
+                if not more_body:
+                    body += compressor.finish()
+                message = {**message, 'body': body}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -1,6 +1,7 @@
 from app.modules.asset import router as asset_router
 from app.modules.brokers import router as brokers_router
 from app.modules.market_data import router as market_data_router
+from app.modules.monitoring import router as monitoring_router
 from app.modules.portfolio import router as portfolio_router
 from fastapi import APIRouter
 
@@ -10,6 +11,7 @@ router.include_router(asset_router)
 router.include_router(market_data_router)
 router.include_router(portfolio_router)
 router.include_router(brokers_router)
+router.include_router(monitoring_router)
 
 
 @router.get('/hc', tags=['Health Check'])
@@ -0,0 +1,112 @@
+"""
+Storage of generated files (e.g. reports built by the worker and downloaded
+through the API), kept for REPORT_ARTIFACT_TTL_SECONDS.
+
+Redis is the default backend because the web service and the worker don't
+share a filesystem; the disk backend suits deployments where they do. Both
+are written incrementally and published atomically once complete, and read
+back in slices, so neither side holds a whole file in memory.
+"""
+
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from app.config.settings import settings
+from app.infra.redis.redis_service import RedisService
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class _RedisArtifactWriter:
+    def __init__(self, redis: RedisService, key: str, ttl_seconds: int):
+        self.redis = redis
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+        self.size = 0
+
+    async def write(self, data: bytes) -> None:
+        if data:
+            # The partial blob expires too, so a writer killed midway doesn't leak it
+            expire_seconds = self.ttl_seconds if self.size == 0 else None
+            self.size = await self.redis.append_blob(self.key, data, expire_seconds)
+
+
+class RedisArtifactStore:
+    def __init__(self, ttl_seconds: int):
+        self.redis = RedisService()
+        self.ttl_seconds = ttl_seconds
+
+    @asynccontextmanager
+    async def writer(self, key: str) -> AsyncIterator[_RedisArtifactWriter]:
+        writer = _RedisArtifactWriter(self.redis, f'{key}:partial:{uuid.uuid4().hex}', self.ttl_seconds)
+        try:
+            yield writer
+            await self.redis.commit_blob(writer.key, key, self.ttl_seconds)
+        except BaseException:
+            await self.redis.delete_blob(writer.key)
+            raise
+
+    async def size(self, key: str) -> Optional[int]:
+        return await self.redis.blob_size(key) or None
+
+    def read(self, key: str) -> AsyncIterator[bytes]:
+        return self.redis.iter_blob(key, READ_CHUNK_SIZE)
+
+
+class _DiskArtifactWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.size = 0
+
+    async def write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.size += len(data)
+
+
+class DiskArtifactStore:
+    def __init__(self, directory: str, ttl_seconds: int):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    @asynccontextmanager
+    async def writer(self, key: str) -> AsyncIterator[_DiskArtifactWriter]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        writer = _DiskArtifactWriter(self._path(f'{key}.partial.{uuid.uuid4().hex}'))
+        try:
+            yield writer
+            writer.file.close()
+            os.replace(writer.path, self._path(key))
+        except BaseException:
+            writer.file.close()
+            writer.path.unlink(missing_ok=True)
+            raise
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return stat.st_size
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        with open(self._path(key), 'rb') as file:
+            while data := file.read(READ_CHUNK_SIZE):
+                yield data
+
+
+def get_artifact_store() -> RedisArtifactStore | DiskArtifactStore:
+    if settings.REPORT_ARTIFACT_STORAGE == 'disk':
+        return DiskArtifactStore(settings.REPORT_ARTIFACTS_DIR, settings.REPORT_ARTIFACT_TTL_SECONDS)
+    return RedisArtifactStore(settings.REPORT_ARTIFACT_TTL_SECONDS)
@@ -0,0 +1,29 @@
+"""add transaction keyset index
+
+Revision ID: 6b1f0e2c9d47
+Revises: 1095106b5968
+Create Date: 2026-10-19 10:12:41.318502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1f0e2c9d47'
+down_revision: Union[str, None] = '1095106b5968'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_transaction_portfolio_date_id',
+        'transaction',
+        ['portfolio_id', 'date', 'id'],
+        schema='portfolio',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transaction_portfolio_date_id', table_name='transaction', schema='portfolio')
@@ -0,0 +1,37 @@
+"""
+Query timing: adds each statement's execution time to the current request's
+`db` timing (see app/utils/timing.py).
+"""
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.utils.timing import DB, record_timing
+
+# Connection.info key of the start times of the statements in flight
+_QUERY_STARTS = 'query_starts'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_timing(DB, time.perf_counter() - conn.info[_QUERY_STARTS].pop())
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_QUERY_STARTS):
+        record_timing(DB, time.perf_counter() - conn.info[_QUERY_STARTS].pop())
+
+
+def instrument_query_timing(engine: AsyncEngine):
+    # Events run in SQLAlchemy's greenlet, which shares the calling task's context
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(sync_engine, 'handle_error', _handle_error)
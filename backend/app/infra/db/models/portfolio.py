@@ -4,7 +4,7 @@ from datetime import datetime
 from app.infra.db.base import Base
 from sqlalchemy import JSON, Boolean, Column, Date, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 
@@ -103,7 +103,11 @@ class Position(Base):
 
 class Transaction(Base):
     __tablename__ = 'transaction'
-    __table_args__ = {'schema': 'portfolio'}
+    __table_args__ = (
+        # Keyset pagination of a portfolio's transactions by (date, id)
+        Index('ix_transaction_portfolio_date_id', 'portfolio_id', 'date', 'id'),
+        {'schema': 'portfolio'},
+    )
 
     id = Column(Integer, primary_key=True)
     portfolio_id = Column(Integer, ForeignKey('portfolio.portfolio.id'), nullable=False)
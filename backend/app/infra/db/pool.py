@@ -0,0 +1,104 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config.settings import settings
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+
+class PoolStats:
+    """Checkout counters for one pool, accumulated since process start."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record_checkout(self, wait: float, checked_out: int, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self.wait_histogram[bisect_left(WAIT_BUCKETS, wait)] += 1
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f'<={bound}s' for bound in WAIT_BUCKETS] + [f'>{WAIT_BUCKETS[-1]}s']
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': self.peak_overflow,
+                'wait_histogram': dict(zip(labels, self.wait_histogram, strict=True)),
+            }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        self.stats.record_checkout(
+            time.perf_counter() - start, self.checkedout(), max(self.overflow(), 0)
+        )
+        return connection
+
+
+def engine_options() -> dict:
+    """Pool and driver options shared by every async engine."""
+    return {
+        'poolclass': InstrumentedAsyncPool,
+        'pool_pre_ping': True,
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'connect_args': {
+            'statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+            'prepared_statement_cache_size': settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+def pool_status(engine) -> dict:
+    """Live pool occupancy plus the accumulated checkout stats."""
+    pool = engine.sync_engine.pool
+    status = {
+        'size': pool.size(),
+        'max_overflow': pool._max_overflow,
+        'timeout': pool.timeout(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        status.update(pool.stats.snapshot())
+    return status
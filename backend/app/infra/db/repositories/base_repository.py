@@ -1,18 +1,50 @@
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Any, List, Optional, Type, TypeVar
+from functools import lru_cache
+from typing import Any, AsyncIterator, List, Optional, Type, TypeVar
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import Date, DateTime, asc
+from sqlalchemy import Date, DateTime, Float, Numeric, asc
 from sqlalchemy import delete as sqlalchemy_delete
-from sqlalchemy import desc, inspect, select, text
+from sqlalchemy import cast, desc, inspect, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from sqlalchemy.orm import selectinload
 
+from app.config.settings import settings
+from app.utils.timing import DB, timed
+
 ModelType = TypeVar('ModelType', bound=DeclarativeMeta)
 
+FILTER_OPERATORS = {
+    'eq': lambda col, value: col == value,
+    'ilike': lambda col, value: col.ilike(value),
+    'like': lambda col, value: col.like(value),
+    'gte': lambda col, value: col >= value,
+    'lte': lambda col, value: col <= value,
+    'gt': lambda col, value: col > value,
+    'lt': lambda col, value: col < value,
+    'in': lambda col, value: col.in_(value),
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_filter_key(key: str) -> tuple[str, str]:
+    if '__' not in key:
+        return key, 'eq'
+    field, op = key.split('__', 1)
+    if op not in FILTER_OPERATORS:
+        raise ValueError(f'Unsupported filter operation: {op}')
+    return field, op
+
+
+@lru_cache(maxsize=256)
+def _compile_statement(stmt, dialect):
+    """Compiled form of a statement, shared by every call that reuses the same statement object."""
+    return stmt.compile(dialect=dialect)
+
 
 class SQLAlchemyRepository:
     def __init__(self, session: AsyncSession):
@@ -21,27 +53,8 @@ class SQLAlchemyRepository:
     @staticmethod
     def _apply_filters(stmt, model, by: dict):
         for key, value in by.items():
-            if '__' in key:
-                field, op = key.split('__', 1)
-                col = getattr(model, field)
-                if op == 'ilike':
-                    stmt = stmt.where(col.ilike(value))
-                elif op == 'like':
-                    stmt = stmt.where(col.like(value))
-                elif op == 'gte':
-                    stmt = stmt.where(col >= value)
-                elif op == 'lte':
-                    stmt = stmt.where(col <= value)
-                elif op == 'gt':
-                    stmt = stmt.where(col > value)
-                elif op == 'lt':
-                    stmt = stmt.where(col < value)
-                elif op == 'in':
-                    stmt = stmt.where(col.in_(value))
-                else:
-                    raise ValueError(f'Unsupported filter operation: {op}')
-            else:
-                stmt = stmt.where(getattr(model, key) == value)
+            field, op = _parse_filter_key(key)
+            stmt = stmt.where(FILTER_OPERATORS[op](getattr(model, field), value))
         return stmt
 
     @staticmethod
@@ -51,6 +64,117 @@ class SQLAlchemyRepository:
                 df[column.name] = pd.to_datetime(df[column.name])
         return df
 
+    @staticmethod
+    def _df_columns(model: ModelType) -> list:
+        columns = []
+        for column in model.__table__.columns:
+            if isinstance(column.type, Numeric) and not isinstance(column.type, Float):
+                columns.append(cast(column, Float).label(column.name))
+            else:
+                columns.append(column)
+        return columns
+
+    @staticmethod
+    def _rows_to_df(rows: list, model: ModelType) -> pd.DataFrame:
+        columns = list(model.__table__.columns)
+        df = pd.DataFrame.from_records(rows, columns=[col.name for col in columns])
+        for column in columns:
+            if isinstance(column.type, Numeric):
+                df[column.name] = df[column.name].astype('float64')
+            elif isinstance(column.type, (DateTime, Date)):
+                df[column.name] = pd.to_datetime(df[column.name])
+        return df
+
+    @staticmethod
+    def _apply_order_by(stmt, model, order_by: str):
+        if order_by.endswith(' desc'):
+            field = order_by.replace(' desc', '')
+            return stmt.order_by(desc(getattr(model, field)))
+        if order_by.endswith(' asc'):
+            field = order_by.replace(' asc', '')
+            return stmt.order_by(asc(getattr(model, field)))
+        return stmt.order_by(getattr(model, order_by))
+
+    async def get_df(
+        self,
+        model: ModelType,
+        by: Optional[dict] = None,
+        order_by: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Columnar read of the model's table: selects the table columns with a Core
+        select and builds the DataFrame straight from the row tuples, without
+        instantiating ORM objects. Numeric columns are cast to float in SQL.
+        """
+        stmt = select(*self._df_columns(model))
+        if by:
+            stmt = self._apply_filters(stmt, model, by)
+        if order_by:
+            stmt = self._apply_order_by(stmt, model, order_by)
+
+        result = await self.session.execute(stmt)
+        return self._rows_to_df(result.all(), model)
+
+    @staticmethod
+    def as_float(column, name: Optional[str] = None):
+        """Casts a Numeric column to float8 in SQL, so the driver returns floats instead of Decimals."""
+        return cast(column, Float).label(name or column.key)
+
+    async def fetch_frame(
+        self,
+        stmt,
+        dtypes: dict[str, str],
+        params: Optional[dict] = None,
+    ) -> pd.DataFrame:
+        """
+        Opt-in columnar fetch for time-series queries. `dtypes` maps each selected
+        column, in order, to its NumPy dtype. On asyncpg the compiled statement runs
+        straight on the driver connection and the records are decoded into typed
+        NumPy columns, skipping SQLAlchemy Row construction and result processing.
+        Numeric columns should be cast in SQL with `as_float`. Prebuilt statements
+        take their values through `params` and are compiled only once.
+        """
+        connection = await self.session.connection()
+        dialect = connection.dialect
+
+        if (
+            settings.DB_COLUMNAR_FETCH
+            and dialect.driver == 'asyncpg'
+            and dialect.paramstyle == 'numeric_dollar'
+        ):
+            compiled = _compile_statement(stmt, dialect)
+            if compiled.post_compile_params:
+                # Expanding IN parameters are rendered into the SQL, so those
+                # statements can't share a compiled form
+                if params:
+                    stmt = stmt.params(**params)
+                compiled = stmt.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+            bound = compiled.construct_params(params)
+            args = [bound[name] for name in compiled.positiontup]
+            raw_connection = await connection.get_raw_connection()
+            # Bypasses the engine's cursor events, so it is timed here
+            with timed(DB):
+                records = await raw_connection.driver_connection.fetch(str(compiled), *args)
+        else:
+            result = await connection.execute(stmt, params)
+            records = result.all()
+
+        columns = {}
+        for position, (name, dtype) in enumerate(dtypes.items()):
+            columns[name] = np.array([record[position] for record in records], dtype=dtype)
+
+        return pd.DataFrame(columns, columns=list(dtypes), copy=False)
+
+    async def stream_df(self, stmt, chunk_size: int = 5000) -> AsyncIterator[pd.DataFrame]:
+        """
+        Runs the statement on a server-side cursor and yields DataFrame chunks of
+        at most `chunk_size` rows, so memory stays bounded by the chunk size.
+        """
+        result = await self.session.stream(stmt.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        async for rows in result.partitions(chunk_size):
+            yield pd.DataFrame.from_records(rows, columns=columns)
+
     async def get(
         self,
         model: ModelType,
@@ -81,6 +205,9 @@ class SQLAlchemyRepository:
 
             return instance
 
+        if as_df:
+            return await self.get_df(model, by=by, order_by=order_by)
+
         stmt = select(model)
 
         if relations:
@@ -91,29 +218,17 @@ class SQLAlchemyRepository:
             stmt = self._apply_filters(stmt, model, by)
 
         if order_by:
-            if order_by.endswith(' desc'):
-                field = order_by.replace(' desc', '')
-                stmt = stmt.order_by(desc(getattr(model, field)))
-            elif order_by.endswith(' asc'):
-                field = order_by.replace(' asc', '')
-                stmt = stmt.order_by(asc(getattr(model, field)))
-            else:
-                stmt = stmt.order_by(getattr(model, order_by))
+            stmt = self._apply_order_by(stmt, model, order_by)
 
         result = await self.session.execute(stmt)
         scalars = result.scalars()
 
-        if as_df:
-            items = scalars.all()
-            data = [
-                {col.name: getattr(item, col.name) for col in model.__table__.columns}
-                for item in items
-            ]
-            df = pd.DataFrame(data)
-            return self._normalize_datetime_columns(df, model)
-
         return scalars.first() if first else scalars.all()
 
+    @staticmethod
+    def _has_joined_relationships(model: ModelType) -> bool:
+        return any(rel.lazy == 'joined' for rel in inspect(model).relationships)
+
     def _serialize_instance(self, instance: Any) -> dict:
         def serialize_value(value: Any) -> Any:
             if isinstance(value, datetime):
@@ -153,6 +268,9 @@ class SQLAlchemyRepository:
         relations: Optional[list[str]] = None,
         as_df: bool = False,
     ) -> List[Any] | pd.DataFrame:
+        if as_df and not relations and not self._has_joined_relationships(model):
+            return await self.get_df(model)
+
         stmt = select(model)
 
         if relations:
@@ -1,15 +1,70 @@
-from typing import AsyncGenerator
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config.settings import settings
+from app.infra.db.instrumentation import instrument_query_timing
+from app.infra.db.pool import engine_options
+
+logger = logging.getLogger(__name__)
 
 ASYNC_DATABASE_URL = settings.DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
-async_engine = create_async_engine(
-    ASYNC_DATABASE_URL, echo=False, pool_pre_ping=True, pool_recycle=1800
-)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **engine_options())
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
+if settings.DATABASE_READ_URL:
+    ASYNC_DATABASE_READ_URL = settings.DATABASE_READ_URL.replace('postgresql://', 'postgresql+asyncpg://')
+    read_engine = create_async_engine(ASYNC_DATABASE_READ_URL, echo=False, **engine_options())
+else:
+    read_engine = async_engine
+ReadSessionLocal = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+
+instrument_query_timing(async_engine)
+if read_engine is not async_engine:
+    instrument_query_timing(read_engine)
+
+# Seconds behind the primary; 0 when every received WAL record has been replayed,
+# NULL when the server is not a standby
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+_replica_state = {'checked_at': float('-inf'), 'fresh': False}
+
+
+async def _replica_is_fresh() -> bool:
+    """
+    Whether the replica is within the configured staleness tolerance. The lag is
+    checked at most once per DB_READ_LAG_CHECK_INTERVAL_SECONDS per process; an
+    unreachable replica counts as stale.
+    """
+    now = time.monotonic()
+    if now - _replica_state['checked_at'] < settings.DB_READ_LAG_CHECK_INTERVAL_SECONDS:
+        return _replica_state['fresh']
+
+    try:
+        async with read_engine.connect() as connection:
+            lag = (await connection.execute(REPLICA_LAG_QUERY)).scalar()
+        fresh = lag is None or lag <= settings.DB_READ_MAX_STALENESS_SECONDS
+        if not fresh:
+            logger.warning('Read replica is %.1fs behind, routing reads to the primary', lag)
+    except Exception:
+        logger.exception('Read replica lag check failed, routing reads to the primary')
+        fresh = False
+
+    _replica_state.update(checked_at=now, fresh=fresh)
+    return fresh
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -18,4 +73,32 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         finally:
             if session.in_transaction():
                 await session.rollback()
-        
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work. Uses the read replica when one is configured and
+    fresh enough, otherwise the primary.
+    """
+    session_factory = AsyncSessionLocal
+    if read_engine is not async_engine and await _replica_is_fresh():
+        session_factory = ReadSessionLocal
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            if session.in_transaction():
+                await session.rollback()
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency of read-only endpoints, see `read_session`."""
+    async with read_session() as session:
+        yield session
+
+
+def get_read_session_factory():
+    """Dependency of endpoints that open several read sessions, e.g. to run queries concurrently."""
+    return read_session
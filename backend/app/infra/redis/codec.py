@@ -0,0 +1,107 @@
+import asyncio
+import json
+import struct
+import zlib
+from typing import Any
+
+import msgpack
+
+from app.config.settings import settings
+from app.utils.timing import SERIALIZE, timeit
+
+# First byte of every stored payload
+RAW = b'\x00'
+ZLIB = b'\x01'
+# Uncompressed length, stored after the ZLIB marker
+LENGTH = struct.Struct('>I')
+
+
+class JsonCodec:
+    name = 'json'
+    version = 1
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, allow_nan=False).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    name = 'msgpack'
+    version = 1
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data, strict_map_key=False)
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec, MsgpackCodec)}
+
+
+def _item_count(value: Any) -> int:
+    """
+    Rough size of a value to encode: a list counts its items and a dict the
+    item counts of its values, so the `@cached` envelope ({value, fresh_until})
+    and dicts of series weigh as much as the lists they hold. Lists aren't
+    descended into, which keeps the estimate cheap for long lists of records.
+    """
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_item_count(item) for item in value.values()) or len(value)
+    return 0
+
+
+class CacheCodec:
+    """
+    Serializes cache values with the configured codec and zlib-compresses the
+    ones above CACHE_COMPRESSION_THRESHOLD_BYTES. `tag` goes into every cache
+    key, so changing the codec or its format never reads an old payload.
+    Payloads above CACHE_CODEC_THREAD_THRESHOLD_BYTES are encoded and decoded
+    in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, codec_name: str):
+        self.codec = CODECS[codec_name]
+        self.tag = f'{self.codec.name}{self.codec.version}'
+
+    @timeit('CacheCodec.encode', category=SERIALIZE)
+    def encode(self, value: Any) -> bytes:
+        data = self.codec.dumps(value)
+        if len(data) >= settings.CACHE_COMPRESSION_THRESHOLD_BYTES:
+            return ZLIB + LENGTH.pack(len(data)) + zlib.compress(data, level=1)
+        return RAW + data
+
+    @timeit('CacheCodec.decode', category=SERIALIZE)
+    def decode(self, payload: bytes) -> Any:
+        if payload[:1] == ZLIB:
+            return self.codec.loads(zlib.decompress(payload[1 + LENGTH.size:]))
+        return self.codec.loads(payload[1:])
+
+    @staticmethod
+    def decoded_size(payload: bytes) -> int:
+        """Size of the serialized value before compression, used to budget the local cache."""
+        if payload[:1] == ZLIB:
+            return LENGTH.unpack_from(payload, 1)[0]
+        return len(payload) - 1
+
+    async def encode_async(self, value: Any) -> bytes:
+        # The encoded size isn't known upfront; containers are the large ones
+        if _item_count(value) >= settings.CACHE_CODEC_THREAD_MIN_ITEMS:
+            return await asyncio.to_thread(self.encode, value)
+        return self.encode(value)
+
+    async def decode_async(self, payload: bytes) -> Any:
+        if len(payload) >= settings.CACHE_CODEC_THREAD_THRESHOLD_BYTES:
+            return await asyncio.to_thread(self.decode, payload)
+        return self.decode(payload)
+
+
+cache_codec = CacheCodec(settings.CACHE_CODEC)
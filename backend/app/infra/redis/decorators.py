@@ -1,26 +1,178 @@
+import asyncio
 import functools
-from typing import Any, Awaitable, Callable
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config.logger import logger
+from app.infra.redis.metrics import cache_metrics
+
+# Cached values are stored wrapped with the time they stop being fresh. Between
+# that and the Redis expiry they are served stale while a refresh runs.
+ENVELOPE_VALUE = 'value'
+ENVELOPE_FRESH_UNTIL = 'fresh_until'
+
+LOCK_POLL_SECONDS = 0.1
+
+# Computations in progress in this process, by cache key, so concurrent callers
+# of the same key wait for one result instead of recomputing it
+_inflight: dict[str, asyncio.Future] = {}
+# Background refreshes in progress in this process, by cache key
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+def _unwrap(cached_value) -> tuple[Any, bool]:
+    """Returns (value, is_fresh). Values written without an envelope count as fresh."""
+    if isinstance(cached_value, dict) and ENVELOPE_FRESH_UNTIL in cached_value and ENVELOPE_VALUE in cached_value:
+        return cached_value[ENVELOPE_VALUE], time.time() < cached_value[ENVELOPE_FRESH_UNTIL]
+    return cached_value, True
 
 
 def cached(
     key_prefix: str,
     cache, 
     ttl=3600,
+    stale_ttl: Optional[int] = None,
+    lock_timeout: int = 120,
+    version_tag: Optional[str] = None,
     ):
+    """
+    Caches the coroutine result in Redis for `ttl` seconds.
+
+    Keys are built from the bound arguments with defaults applied, so positional
+    and keyword calls share an entry. With `version_tag` (formatted with the
+    arguments, e.g. 'portfolio:{portfolio_id}') the tag's current version is
+    part of the key; bumping it with `RedisService.bump_version` invalidates
+    every entry of the tag at once.
+
+    - Concurrent calls with the same key in this process share one computation.
+    - A Redis lock lets a single process compute a missing key; the others wait
+      for its result, up to `lock_timeout` seconds, before computing it themselves.
+    - For `stale_ttl` seconds after `ttl` (defaults to `ttl`) the old value is
+      returned immediately while one background refresh recomputes it. The
+      refresh runs on a new instance of the service with its own DB session.
+
+    `func.refresh(self, *args, **kwargs)` recomputes and stores an entry
+    unconditionally, for cache-warming tasks.
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+
     def decorator(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+
+        async def build_key(self, redis_client, args, kwargs) -> str:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop('self', None)
+
+            key = key_prefix
+            if version_tag is not None:
+                tag = version_tag.format(**arguments)
+                key = f"{key}:{tag}:v{await redis_client.get_version(tag)}"
+            return f"{key}:{':'.join(f'{k}={v}' for k, v in arguments.items())}"
+
+        async def store(redis_client, cache_key, result):
+            envelope = {ENVELOPE_VALUE: result, ENVELOPE_FRESH_UNTIL: time.time() + ttl}
+            await redis_client.set_json(cache_key, envelope, expire_seconds=ttl + stale_ttl)
+
+        async def compute(self, redis_client, cache_key, args, kwargs):
+            token = await redis_client.acquire_lock(cache_key, lock_timeout)
+            if token is None:
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+                    cached_value = await redis_client.get_json(cache_key)
+                    if cached_value is not None:
+                        return _unwrap(cached_value)[0]
+                    token = await redis_client.acquire_lock(cache_key, lock_timeout)
+                    if token is not None:
+                        break
+                else:
+                    logger.warning(f"Timed out waiting for cache lock on {cache_key}, computing anyway")
+
+            try:
+                start = time.perf_counter()
+                result = await func(self, *args, **kwargs)
+                cache_metrics.record_compute(key_prefix, time.perf_counter() - start)
+                await store(redis_client, cache_key, result)
+                return result
+            finally:
+                if token is not None:
+                    await redis_client.release_lock(cache_key, token)
+
+        async def refresh(service_cls, cache_key, args, kwargs):
+            from app.infra.db.session import AsyncSessionLocal
+
+            try:
+                async with AsyncSessionLocal() as session:
+                    service = service_cls(session)
+                    redis_client = cache(service)
+                    token = await redis_client.acquire_lock(cache_key, lock_timeout)
+                    if token is None:
+                        return
+                    try:
+                        start = time.perf_counter()
+                        result = await func(service, *args, **kwargs)
+                        cache_metrics.record_compute(key_prefix, time.perf_counter() - start)
+                        await store(redis_client, cache_key, result)
+                    finally:
+                        await redis_client.release_lock(cache_key, token)
+            except Exception:
+                logger.exception(f"Background refresh of {cache_key} failed")
+            finally:
+                _refreshing.pop(cache_key, None)
+
         @functools.wraps(func)
         async def wrapper(self, *args, **kwargs):
             redis_client = cache(self)
-            
-            cache_key = f"{key_prefix}:{':'.join(map(str, args))}:{':'.join(f'{k}={v}' for k, v in kwargs.items())}"
-            cached_result = await redis_client.get_json(cache_key)
-            if cached_result is not None:
-                return cached_result
-            
+            cache_key = await build_key(self, redis_client, args, kwargs)
+            cached_value = await redis_client.get_json(cache_key)
+            if cached_value is not None:
+                value, is_fresh = _unwrap(cached_value)
+                cache_metrics.record_lookup(key_prefix, hit=True, stale=not is_fresh)
+                if not is_fresh and cache_key not in _refreshing:
+                    _refreshing[cache_key] = asyncio.create_task(
+                        refresh(type(self), cache_key, args, kwargs)
+                    )
+                return value
+
+            cache_metrics.record_lookup(key_prefix, hit=False)
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                try:
+                    return await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # The caller computing it was cancelled, compute it here
+                    return await func(self, *args, **kwargs)
+
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
+            try:
+                result = await compute(self, redis_client, cache_key, args, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Mark it retrieved, waiters re-raise it from their own await
+                future.exception()
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                _inflight.pop(cache_key, None)
+
+        async def refresh_entry(self, *args, **kwargs):
+            redis_client = cache(self)
+            cache_key = await build_key(self, redis_client, args, kwargs)
             result = await func(self, *args, **kwargs)
-            await redis_client.set_json(cache_key, result, expire_seconds=ttl)
+            await store(redis_client, cache_key, result)
             return result
+
+        wrapper.refresh = refresh_entry
         return wrapper
     return decorator
-
-    
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+
+from app.config.logger import logger
+from app.config.settings import settings
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+# Identifies this process in invalidation messages, so it skips its own writes
+INSTANCE_ID = uuid.uuid4().hex
+
+RECONNECT_DELAY_SECONDS = 1
+
+MISSING = object()
+
+
+class LocalCache:
+    """
+    In-process LRU of decoded Redis values, bounded by the encoded size of the
+    entries. Values are shared between callers and must be treated as read-only.
+
+    Disabled until an invalidation listener is running in the process, so a
+    process that can't hear about rewrites never serves stale values.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.enabled = False
+        self.used_bytes = 0
+        # Bumped on every invalidation, so a value read from Redis before an
+        # invalidation arrived is not stored after it
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[Any, int, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, size, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._pop(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        ttl_seconds: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._pop(key)
+            expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+            self._entries[key] = (value, size, expires_at)
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self.generation += 1
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= entry[1]
+
+
+local_cache = LocalCache(settings.CACHE_L1_MAX_BYTES)
+
+
+def invalidation_message(key: str) -> str:
+    return f'{INSTANCE_ID}:{key}'
+
+
+async def listen_for_invalidations() -> None:
+    """
+    Keeps the local cache coherent with Redis: drops every key another process
+    rewrites or deletes. The cache is enabled only while subscribed and cleared
+    on every (re)connect, since messages sent while disconnected are lost.
+    """
+    client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        while True:
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    local_cache.clear()
+                    local_cache.enabled = True
+                    async for message in pubsub.listen():
+                        if message['type'] != 'message':
+                            continue
+                        origin, _, key = message['data'].partition(':')
+                        if origin != INSTANCE_ID:
+                            local_cache.invalidate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Cache invalidation listener disconnected, retrying')
+            finally:
+                local_cache.enabled = False
+                local_cache.clear()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+    finally:
+        await client.aclose()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from app.config.logger import logger
+
+
+class PrefixStats:
+    __slots__ = (
+        'hits', 'stale_hits', 'misses', 'l1_hits', 'compute_count', 'compute_seconds',
+        'compute_max_seconds', 'bytes_read', 'bytes_written', 'last_size',
+    )
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.l1_hits = 0
+        self.compute_count = 0
+        self.compute_seconds = 0.0
+        self.compute_max_seconds = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.last_size = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else None,
+            'l1_hits': self.l1_hits,
+            'avg_compute_ms': self.compute_seconds / self.compute_count * 1000 if self.compute_count else None,
+            'max_compute_ms': self.compute_max_seconds * 1000,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'last_payload_bytes': self.last_size,
+        }
+
+
+class CacheMetrics:
+    """Per key prefix cache counters for this process, accumulated since start."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, PrefixStats] = defaultdict(PrefixStats)
+
+    @staticmethod
+    def prefix_of(key: str) -> str:
+        return key.split(':', 1)[0]
+
+    def record_lookup(self, prefix: str, hit: bool, stale: bool = False) -> None:
+        with self._lock:
+            stats = self._stats[prefix]
+            if not hit:
+                stats.misses += 1
+            elif stale:
+                stats.stale_hits += 1
+            else:
+                stats.hits += 1
+
+    def record_compute(self, prefix: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stats[prefix]
+            stats.compute_count += 1
+            stats.compute_seconds += seconds
+            stats.compute_max_seconds = max(stats.compute_max_seconds, seconds)
+
+    def record_read(self, key: str, size: int, from_l1: bool = False) -> None:
+        with self._lock:
+            stats = self._stats[self.prefix_of(key)]
+            if from_l1:
+                stats.l1_hits += 1
+            else:
+                stats.bytes_read += size
+
+    def record_write(self, key: str, size: int) -> None:
+        with self._lock:
+            stats = self._stats[self.prefix_of(key)]
+            stats.bytes_written += size
+            stats.last_size = size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {prefix: stats.as_dict() for prefix, stats in sorted(self._stats.items())}
+
+
+cache_metrics = CacheMetrics()
+
+
+async def log_cache_metrics(interval_seconds: float) -> None:
+    """Logs a one-line summary per key prefix every `interval_seconds`."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for prefix, stats in cache_metrics.snapshot().items():
+            ratio = f"{stats['hit_ratio']:.0%}" if stats['hit_ratio'] is not None else '-'
+            compute = f"{stats['avg_compute_ms']:.0f}ms" if stats['avg_compute_ms'] is not None else '-'
+            logger.info(
+                f"📊 cache {prefix}: hit ratio {ratio} "
+                f"({stats['hits']} hits, {stats['stale_hits']} stale, {stats['misses']} misses, {stats['l1_hits']} L1), "
+                f"avg compute {compute}, last payload {stats['last_payload_bytes']} B"
+            )
@@ -1,34 +1,185 @@
 import json
-from typing import Optional
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline, PubSub
 
 from app.config.settings import settings
+from app.infra.redis.codec import cache_codec
+from app.infra.redis.local_cache import (
+    INVALIDATION_CHANNEL,
+    MISSING,
+    invalidation_message,
+    local_cache,
+)
+from app.infra.redis.metrics import cache_metrics
+from app.utils.timing import REDIS, timed
+
+
+# Deletes the lock only if it still holds our token, so an expired lock taken
+# over by another holder is never released by the previous one
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with timed(REDIS):
+            return await super().execute(raise_on_error)
+
+
+class TimedRedis(Redis):
+    """Redis client that adds each command's round trip to the current request's `redis` timing."""
+
+    async def execute_command(self, *args, **options):
+        with timed(REDIS):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return _TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
 
 class RedisService:
     def __init__(self):
-        self.client: Redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        # Payloads are binary (see codec.py), so responses are not decoded
+        self.client: Redis = TimedRedis.from_url(settings.REDIS_URL)
         self.prefix = 'cache'
 
     def _format_key(self, key: str) -> str:
-        return f'{self.prefix}:{key}'
+        return f'{self.prefix}:{cache_codec.tag}:{key}'
 
     async def set_json(self, key: str, value: dict, expire_seconds: Optional[int] = None) -> None:
         full_key = self._format_key(key)
         if isinstance(value, str):
-            data = value
-        else:
-            data = json.dumps(value, allow_nan=False)
-        await self.client.set(full_key, data, ex=expire_seconds)
+            value = json.loads(value)
+        payload = await cache_codec.encode_async(value)
+        await self.client.set(full_key, payload, ex=expire_seconds)
+        cache_metrics.record_write(key, len(payload))
+        await self.client.publish(INVALIDATION_CHANNEL, invalidation_message(full_key))
+        local_cache.invalidate(full_key)
+        if local_cache.enabled:
+            # Cache what readers would decode, not the caller's (mutable) object
+            decoded = await cache_codec.decode_async(payload)
+            local_cache.set(full_key, decoded, cache_codec.decoded_size(payload), expire_seconds)
 
     async def get_json(self, key: str) -> Optional[dict]:
         full_key = self._format_key(key)
-        data = await self.client.get(full_key)
-        if data:
-            return json.loads(data)
+        value = local_cache.get(full_key)
+        if value is not MISSING:
+            cache_metrics.record_read(key, 0, from_l1=True)
+            return value
+
+        if not local_cache.enabled:
+            payload = await self.client.get(full_key)
+            if not payload:
+                return None
+            cache_metrics.record_read(key, len(payload))
+            return await cache_codec.decode_async(payload)
+
+        generation = local_cache.generation
+        payload, ttl_ms = await self.client.pipeline(transaction=False).get(full_key).pttl(full_key).execute()
+        if payload:
+            cache_metrics.record_read(key, len(payload))
+            value = await cache_codec.decode_async(payload)
+            local_cache.set(
+                full_key, value, cache_codec.decoded_size(payload), ttl_ms / 1000 if ttl_ms > 0 else None, generation
+            )
+            return value
         return None
 
     async def delete(self, key: str) -> None:
         full_key = self._format_key(key)
         await self.client.delete(full_key)
+        await self.client.publish(INVALIDATION_CHANNEL, invalidation_message(full_key))
+        local_cache.invalidate(full_key)
+
+    async def acquire_lock(self, key: str, timeout_seconds: int) -> Optional[str]:
+        """Tries to take `key` as a lock; returns the owner token, or None if it is held."""
+        token = uuid.uuid4().hex
+        acquired = await self.client.set(self._format_key(f'lock:{key}'), token, nx=True, ex=timeout_seconds)
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self.client.eval(RELEASE_LOCK_SCRIPT, 1, self._format_key(f'lock:{key}'), token)
+
+    def _version_key(self, tag: str) -> str:
+        # Not codec-tagged: versions are plain counters and outlive codec changes
+        return f'{self.prefix}:version:{tag}'
+
+    async def get_version(self, tag: str) -> int:
+        version = await self.client.get(self._version_key(tag))
+        return int(version) if version else 0
+
+    async def get_version_info(self, tag: str) -> tuple[int, Optional[float]]:
+        """`tag`'s version and the time it was last bumped, None if never."""
+        version, bumped_at = await self.client.mget(self._version_key(tag), f'{self._version_key(tag)}:at')
+        return (int(version) if version else 0), (float(bumped_at) if bumped_at else None)
+
+    async def bump_version(self, tag: str) -> int:
+        """Invalidates every cache entry keyed on `tag`'s version."""
+        version_key = self._version_key(tag)
+        version, _ = await (
+            self.client.pipeline(transaction=True)
+            .incr(version_key)
+            .set(f'{version_key}:at', time.time())
+            .execute()
+        )
+        return version
+
+    def _blob_key(self, key: str) -> str:
+        # Raw bytes (e.g. report files), not codec-encoded
+        return f'{self.prefix}:blob:{key}'
+
+    async def append_blob(self, key: str, data: bytes, expire_seconds: Optional[int] = None) -> int:
+        """Appends to the blob, returning its new size; `expire_seconds` (re)sets its expiry."""
+        if expire_seconds is None:
+            return await self.client.append(self._blob_key(key), data)
+        size, _ = await (
+            self.client.pipeline(transaction=True)
+            .append(self._blob_key(key), data)
+            .expire(self._blob_key(key), expire_seconds)
+            .execute()
+        )
+        return size
+
+    async def commit_blob(self, partial_key: str, key: str, expire_seconds: int) -> None:
+        """Publishes a blob written under `partial_key` as `key`, atomically."""
+        await (
+            self.client.pipeline(transaction=True)
+            .rename(self._blob_key(partial_key), self._blob_key(key))
+            .expire(self._blob_key(key), expire_seconds)
+            .execute()
+        )
+
+    async def blob_size(self, key: str) -> int:
+        """Size of the blob in bytes, 0 when it doesn't exist."""
+        return await self.client.strlen(self._blob_key(key))
+
+    async def iter_blob(self, key: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        start = 0
+        while True:
+            data = await self.client.getrange(self._blob_key(key), start, start + chunk_size - 1)
+            if not data:
+                return
+            yield data
+            start += len(data)
+
+    async def delete_blob(self, key: str) -> None:
+        await self.client.delete(self._blob_key(key))
+
+    async def publish_json(self, channel: str, message: dict) -> None:
+        await self.client.publish(channel, json.dumps(message, default=str))
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[PubSub]:
+        """PubSub subscribed to `channel`; read it with `get_message(timeout=...)`."""
+        async with self.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(channel)
+            yield pubsub
@@ -4,14 +4,18 @@ Market data API routes.
 Handles market indexes, USD/BRL history, and asset quotes.
 """
 
+from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.params import Query
+from typing_extensions import Annotated
 
+from app.entrypoints.http.middlewares import set_last_consolidated_date
 from app.entrypoints.worker.task_runner import run_task
 from app.infra.db.models.constants.asset_type import ASSET_TYPE
 from app.infra.db.models.constants.exchange import EXCHANGE
+from app.infra.db.models.constants.index import INDEX
 from app.infra.db.session import get_session
 from app.modules.market_data.api.schemas import (
     Currency,
@@ -26,6 +30,14 @@ from app.modules.market_data.tasks.set_indexes_history_cache import (
 )
 from app.modules.users.models import User
 from app.modules.users.views import current_active_user, current_superuser
+from app.utils.df import named_dict_to_columnar
+from app.utils.response import SeriesFormat, json_response
+from app.utils.timeseries import (
+    TimeSeriesFilters,
+    downsample_records,
+    last_date,
+    records_since,
+)
 
 router = APIRouter(
     prefix='/market_data',
@@ -54,20 +66,47 @@ async def list_indexes(
 
 @router.get('/indexes/time_series', response_model=MarketIndexesTimeSeries)
 async def get_indexes_time_series(
+    request: Request,
+    series_format: Annotated[SeriesFormat, Depends()],
+    filters: Annotated[TimeSeriesFilters, Depends()],
+    since: date = Query(None),
     session=Depends(get_session),
 ):
-    """Get historical time series data for all indexes"""
+    """
+    Get historical time series data for all indexes. With `since`, only points
+    after that date are returned; values are accumulated from the start of the
+    full series, so they are sliced from the cached history.
+    """
     service = MarketDataService(session)
-    return await service.get_indexes_history()
+    indexes_history = await service.get_indexes_history()
+    if indexes_history:
+        last_dates = [last_date(points) for points in indexes_history.values() if points]
+        set_last_consolidated_date(request, max(last_dates, default=None))
+        indexes_history = {
+            index: downsample_records(records_since(points, since), filters, value_key='value')
+            for index, points in indexes_history.items()
+        }
+    if series_format.columnar:
+        return json_response(named_dict_to_columnar(indexes_history, epoch_days=series_format.epoch_days))
+    return indexes_history
 
 
 @router.get('/indexes/usd_brl', response_model=USD_BRL_History)
 async def get_usd_brl_history(
+    request: Request,
+    since: date = Query(None),
     session=Depends(get_session),
 ):
-    """Get USD/BRL exchange rate history"""
+    """Get USD/BRL exchange rate history, only after `since` when given"""
     service = MarketDataService(session)
-    return await service.get_usd_brl_history(as_df=False)
+    if since:
+        history = await service.get_usd_brl_history_since(since)
+        last_consolidated = last_date(history) or await service.get_last_index_date(INDEX.USDBRL)
+    else:
+        history = await service.get_usd_brl_history(as_df=False)
+        last_consolidated = last_date(history)
+    set_last_consolidated_date(request, last_consolidated)
+    return history
 
 
 @router.post('/indexes/consolidate_history')
@@ -38,7 +38,14 @@ class MarketIndexesTimeSeries(RootModel[Dict[str, List[IndexPoint]]]):
     pass
 
 
-class USD_BRL_History(RootModel[List[IndexPoint]]):
+class USDBRLPoint(BaseModel):
+    date: date
+    usdbrl: float | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class USD_BRL_History(RootModel[List[USDBRLPoint]]):
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -3,12 +3,37 @@
 Market data repository - handles database operations for indexes and their history.
 """
 
+from functools import lru_cache
+
 import pandas as pd
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 
 from app.infra.db.models.market_data import Index, IndexHistory
 from app.infra.db.repositories.base_repository import SQLAlchemyRepository
 
+INDEX_HISTORY_DTYPES = {
+    'date': 'datetime64[ns]',
+    'value': 'float64',
+    'index_symbol': 'object',
+    'index_name': 'object',
+}
+
+
+@lru_cache(maxsize=None)
+def _index_history_stmt(has_start_date: bool, has_index_id: bool):
+    stmt = select(
+        IndexHistory.date,
+        SQLAlchemyRepository.as_float(IndexHistory.close, 'value'),
+        Index.symbol.label('index_symbol'),
+        Index.short_name.label('index_name'),
+    ).join(Index, IndexHistory.index_id == Index.id)
+
+    if has_start_date:
+        stmt = stmt.where(IndexHistory.date >= bindparam('start_date'))
+    if has_index_id:
+        stmt = stmt.where(Index.id == bindparam('index_id'))
+    return stmt
+
 
 class MarketDataRepository(SQLAlchemyRepository):
     """Repository for market data operations"""
@@ -22,22 +47,11 @@ class MarketDataRepository(SQLAlchemyRepository):
         Get index history as DataFrame.
         Joins Index and IndexHistory tables to include index metadata.
         """
-        stmt = select(
-            IndexHistory.date,
-            IndexHistory.close.label('value'),
-            Index.symbol.label('index_symbol'),
-            Index.short_name.label('index_name'),
-        ).join(Index, IndexHistory.index_id == Index.id)
-
+        stmt = _index_history_stmt(bool(start_date), bool(index_id))
+        params = {}
         if start_date:
-            stmt = stmt.where(IndexHistory.date >= start_date)
+            params['start_date'] = start_date
         if index_id:
-            stmt = stmt.where(Index.id == index_id)
-
-        result = await self.session.execute(stmt)
-        rows = result.all()
-
-        df = pd.DataFrame(rows, columns=['date', 'value', 'index_symbol', 'index_name'])
-        df['date'] = pd.to_datetime(df['date'])
+            params['index_id'] = index_id
 
-        return df
+        return await self.fetch_frame(stmt, INDEX_HISTORY_DTYPES, params)
@@ -197,6 +197,27 @@ class MarketDataService:
             return df
         return payload
 
+    async def get_usd_brl_history_since(self, since) -> list[dict]:
+        """USD/BRL points dated after `since`; empty when there is nothing new."""
+        usdbrl = await self.repo.get(
+            IndexHistory,
+            by={'index_id': INDEX.USDBRL, 'date__gt': since},
+            order_by='date',
+        )
+        return [
+            {"date": o.date.isoformat(), "usdbrl": float(o.close) if o.close is not None else None}
+            for o in usdbrl
+        ]
+
+    async def get_last_index_date(self, index_id: int):
+        most_recent = await self.repo.get(
+            IndexHistory,
+            by={'index_id': index_id},
+            order_by='date desc',
+            first=True,
+        )
+        return most_recent.date if most_recent else None
+
     async def get_asset_quotes(
         self,
         ticker: str,
@@ -6,7 +6,6 @@ Celery task to compute and cache market indexes history.
 from app.config.logger import logger
 from app.entrypoints.worker.task_runner import celery_async_task
 from app.infra.db.session import AsyncSessionLocal
-from app.infra.redis.redis_service import RedisService
 from app.modules.market_data.service.market_data_service import MarketDataService
 
 
@@ -20,8 +19,6 @@ async def set_indexes_history_cache():
     try:
         async with AsyncSessionLocal() as session:
             service = MarketDataService(session)
-            indexes_history = await service.compute_indexes_history()
-            cache = RedisService()
-            await cache.set_json("indexes_history", indexes_history)
+            await MarketDataService.get_indexes_history.refresh(service)
     except Exception as e:
         logger.error(f"❌ Erro em set_indexes_history_cache: {e}", exc_info=True)
@@ -0,0 +1,12 @@
+"""
+Monitoring Module
+
+Admin-only runtime metrics used to size infrastructure from data.
+
+Structure:
+- api/: FastAPI routes
+"""
+
+from app.modules.monitoring.api.routes import router
+
+__all__ = ['router']
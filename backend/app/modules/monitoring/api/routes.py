@@ -0,0 +1,47 @@
+# app/modules/monitoring/api/routes.py
+"""
+Monitoring API routes.
+Exposes live runtime metrics to superusers.
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.infra.db.pool import pool_status
+from app.infra.db.session import async_engine, read_engine
+from app.infra.redis.local_cache import local_cache
+from app.infra.redis.metrics import cache_metrics
+from app.modules.users.views import current_superuser
+
+router = APIRouter(
+    prefix='/monitoring',
+    tags=['Monitoring'],
+    dependencies=[Depends(current_superuser)]
+)
+
+
+@router.get('/db/pool')
+async def get_db_pool_status():
+    """
+    Connection pool occupancy and checkout wait stats for this process.
+    Counters accumulate since the process started.
+    """
+    pools = {'primary': pool_status(async_engine)}
+    if read_engine is not async_engine:
+        pools['replica'] = pool_status(read_engine)
+    return pools
+
+
+@router.get('/cache')
+async def get_cache_metrics():
+    """
+    Cache hits, misses, compute time on miss and payload sizes per key prefix,
+    plus the in-process L1 occupancy. Counters accumulate since the process started.
+    """
+    return {
+        'prefixes': cache_metrics.snapshot(),
+        'l1': {
+            'enabled': local_cache.enabled,
+            'used_bytes': local_cache.used_bytes,
+            'max_bytes': local_cache.max_bytes,
+        },
+    }
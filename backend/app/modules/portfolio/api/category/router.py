@@ -5,11 +5,8 @@ from app.infra.db.session import get_session
 from app.modules.portfolio.service.portfolio_category_service import (
     PortfolioCategoryService,
 )
-from app.modules.portfolio.tasks.set_patrimony_evolution_cache import (
-    set_patrimony_evolution_cache,
-)
-from app.modules.portfolio.tasks.set_portfolio_returns_cache import (
-    set_portfolio_returns_cache,
+from app.modules.portfolio.tasks.consolidate_portfolio_returns import (
+    consolidate_portfolio_returns,
 )
 
 from .schema import CategoryAssignmentRequest, SaveCategoriesRequest
@@ -23,7 +20,11 @@ async def save_custom_category(
     session = Depends(get_session)
 ):
     service = PortfolioCategoryService(session)
-    await service.save_custom_categories(payload.categories)
+    portfolio_ids = await service.save_custom_categories(payload.categories)
+
+    # Category returns are keyed by the categories
+    for portfolio_id in portfolio_ids:
+        run_task(consolidate_portfolio_returns, portfolio_id)
     return {'message': 'Custom category saved successfully.'}
 
 
@@ -33,7 +34,10 @@ async def delete_custom_category(
     session = Depends(get_session)
 ):
     service = PortfolioCategoryService(session)
-    await service.delete_custom_category(category_id)
+    portfolio_id = await service.delete_custom_category(category_id)
+
+    if portfolio_id is not None:
+        run_task(consolidate_portfolio_returns, portfolio_id)
     return {'message': 'Custom category deleted successfully.'}
 
 
@@ -45,6 +49,7 @@ async def assign_category_to_assets(
     service = PortfolioCategoryService(session)
     await service.assign_category_to_asset(payload)
 
-    run_task(set_patrimony_evolution_cache, payload.portfolio_id)
-    run_task(set_portfolio_returns_cache, payload.portfolio_id)
+    # Category returns depend on the assignment; consolidating them also bumps
+    # the portfolio cache version and warms its endpoints
+    run_task(consolidate_portfolio_returns, payload.portfolio_id)
     return {'message': 'Category assigned to assets successfully.'}
@@ -0,0 +1,25 @@
+from app.infra.db.session import get_read_session_factory
+from app.modules.portfolio.api.dashboard.schema import DashboardRequest
+from app.modules.portfolio.service.portfolio_dashboard_service import (
+    PortfolioDashboardService,
+)
+from app.utils.response import json_response
+from fastapi import APIRouter, Depends
+
+router = APIRouter(tags=['Portfolio Dashboard'])
+
+
+@router.post('/{portfolio_id}/dashboard')
+async def get_dashboard(
+    portfolio_id: int,
+    request: DashboardRequest,
+    session_factory=Depends(get_read_session_factory),
+):
+    """
+    Several portfolio views in one round trip, e.g.
+    `{"views": [{"view": "position"}, {"view": "returns", "filters": {"max_points": 200}}]}`.
+    Each entry of the response is `{"status": 200, "data": ...}` or
+    `{"status": <code>, "detail": ...}` when that view failed.
+    """
+    service = PortfolioDashboardService(session_factory)
+    return json_response(await service.get_dashboard(portfolio_id, request.views))
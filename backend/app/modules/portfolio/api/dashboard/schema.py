@@ -0,0 +1,46 @@
+from typing import Literal
+
+from app.utils.timeseries import TimeSeriesFilters
+from pydantic import BaseModel, Field, model_validator
+
+DashboardViewName = Literal[
+    'position',
+    'returns',
+    'category_returns',
+    'patrimony_evolution',
+    'analysis',
+    'category_analysis',
+    'dividends',
+]
+
+
+class DashboardView(BaseModel):
+    view: DashboardViewName
+    # Key of the view in the response, defaults to the view name
+    key: str | None = None
+    currency: str = 'BRL'
+    category_id: int | None = None
+    most_recent: bool = False
+    group_by_broker: bool = False
+    filters: TimeSeriesFilters = Field(default_factory=TimeSeriesFilters)
+
+    @property
+    def result_key(self) -> str:
+        return self.key or self.view
+
+    @model_validator(mode="after")
+    def check_category(self):
+        if self.view == 'category_analysis' and self.category_id is None:
+            raise ValueError("category_analysis requires category_id")
+        return self
+
+
+class DashboardRequest(BaseModel):
+    views: list[DashboardView] = Field(min_length=1, max_length=20)
+
+    @model_validator(mode="after")
+    def check_keys(self):
+        keys = [view.result_key for view in self.views]
+        if len(keys) != len(set(keys)):
+            raise ValueError("view keys must be unique")
+        return self
@@ -1,4 +1,4 @@
-from app.infra.db.session import get_session
+from app.infra.db.session import get_read_session, get_session
 from app.modules.portfolio.api.dividend.schema import (
     Dividend,
     DividendCreateRequest,
@@ -19,7 +19,7 @@ async def get_portfolio_dividends(
     portfolio_id: int,
     filters: Annotated[DividendFilters, Depends()],
     currency: str = Query('BRL'),
-    session = Depends(get_session),
+    session = Depends(get_read_session),
 ):
     service = PortfolioDividendService(session)
     return await service.get_dividends(portfolio_id, filters, currency=currency)
@@ -0,0 +1,51 @@
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, status
+
+from app.entrypoints.http.middlewares import set_response_headers
+from app.modules.portfolio.cache import get_portfolio_cache_version
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as the response may be re-encoded (e.g. compressed)
+    candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
+def _not_modified_since(if_modified_since: str, modified_at: float) -> bool:
+    try:
+        return int(modified_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+async def portfolio_conditional_request(request: Request, portfolio_id: int):
+    """
+    Conditional GET for portfolio data that only changes when the portfolio is
+    consolidated. The ETag is the portfolio cache version plus the query string,
+    and Last-Modified is the time of that version. A matching If-None-Match (or
+    If-Modified-Since) answers 304 before the endpoint runs any query.
+    """
+    version, modified_at = await get_portfolio_cache_version(portfolio_id)
+    query_hash = zlib.crc32(request.url.query.encode())
+    etag = f'W/"p{portfolio_id}-v{version}-{query_hash:08x}"'
+
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if modified_at is not None:
+        headers['Last-Modified'] = formatdate(modified_at, usegmt=True)
+
+    if_none_match = request.headers.get('if-none-match')
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = (
+            if_modified_since is not None
+            and modified_at is not None
+            and _not_modified_since(if_modified_since, modified_at)
+        )
+    if not_modified:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    set_response_headers(request, headers)
@@ -1,12 +1,20 @@
+from datetime import date
 from typing import List, Optional
 
-from app.infra.db.session import get_session
+import pandas as pd
+from app.entrypoints.http.middlewares import set_last_consolidated_date
+from app.infra.db.session import get_read_session
 from app.modules.asset.api.schemas import AssetDetailsWithPosition
+from app.modules.portfolio.api.position.dependencies import (
+    portfolio_conditional_request,
+)
 from app.modules.portfolio.service.portfolio_position_service import (
     PortfolioPositionService,
 )
-from app.utils.response import df_response
-from fastapi import APIRouter, Depends, Query
+from app.utils.response import SeriesFormat, df_response
+from app.utils.timeseries import TimeSeriesFilters, downsample_records, last_date
+from fastapi import APIRouter, Depends, Query, Request
+from typing_extensions import Annotated
 
 router = APIRouter()
 
@@ -14,49 +22,67 @@ router = APIRouter()
 # --- Portfolio Data ---
 
 
-@router.get('/{portfolio_id}/returns', tags=['Portfolio Data'])
+@router.get('/{portfolio_id}/returns', tags=['Portfolio Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_portfolio_returns(
+    request: Request,
     portfolio_id: int,
+    filters: Annotated[TimeSeriesFilters, Depends()],
+    since: date = Query(None),
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
-    return await service.get_portfolio_returns(portfolio_id, currency)
+    if since:
+        returns = await service.get_portfolio_returns_since(portfolio_id, since, currency)
+        last_consolidated = last_date(returns) or await service.get_last_returns_date(portfolio_id)
+    else:
+        returns = await service.get_portfolio_returns(portfolio_id, currency)
+        last_consolidated = last_date(returns)
+    set_last_consolidated_date(request, last_consolidated)
+    return downsample_records(returns, filters, value_key='acc_return')
 
 
-@router.get('/{portfolio_id}/position', tags=['Portfolio Data'])
+@router.get('/{portfolio_id}/position', tags=['Portfolio Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_portfolio_position(
     portfolio_id: int,
+    series_format: Annotated[SeriesFormat, Depends()],
+    filters: Annotated[TimeSeriesFilters, Depends()],
     most_recent: bool = Query(True),
     group_by_broker: bool = Query(False),
     asset_id: int = Query(None),
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     if most_recent:
         return await service.get_portfolio_position(portfolio_id, group_by_broker=group_by_broker, currency=currency)
-    return await service.get_portfolio_position_history(portfolio_id, asset_id, currency=currency)
+    return await service.get_portfolio_position_history(portfolio_id, asset_id, currency=currency, series_format=series_format, filters=filters)
 
 
-@router.get('/{portfolio_id}/patrimony_evolution', tags=['Portfolio Data'])
+@router.get('/{portfolio_id}/patrimony_evolution', tags=['Portfolio Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_patrimony_evolution(
     portfolio_id: int,
+    series_format: Annotated[SeriesFormat, Depends()],
+    filters: Annotated[TimeSeriesFilters, Depends()],
     asset_id: int = Query(None),
     asset_type_id: int = Query(None),
     asset_type_ids: Optional[List[int]] = Query(None),
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
-    return await service.get_patrimony_evolution(portfolio_id, asset_id, asset_type_id, asset_type_ids, currency=currency)
+    evolution = await service.get_patrimony_evolution(portfolio_id, asset_id, asset_type_id, asset_type_ids, currency=currency)
+    evolution = downsample_records(evolution, filters, value_key='portfolio')
+    if series_format.columnar:
+        return df_response(pd.DataFrame(evolution), series_format)
+    return evolution
 
 
-@router.get('/{portfolio_id}/analysis', tags=['Portfolio Data'])
+@router.get('/{portfolio_id}/analysis', tags=['Portfolio Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_portfolio_analysis(
     portfolio_id: int,
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     return await service.get_portfolio_stats(portfolio_id, currency=currency)
@@ -65,24 +91,34 @@ async def get_portfolio_analysis(
 # --- Portfolio Category Data ---
 
 
-@router.get('/{portfolio_id}/category/returns', tags=['Portfolio Category Data'])
+@router.get('/{portfolio_id}/category/returns', tags=['Portfolio Category Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_category_returns(
+    request: Request,
     portfolio_id: int,
+    filters: Annotated[TimeSeriesFilters, Depends()],
     category_id: int = Query(None),
     most_recent: bool = Query(False),
+    since: date = Query(None),
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
-    return await service.get_category_returns(portfolio_id, category_id, most_recent, currency)
+    returns = await service.get_category_returns(portfolio_id, category_id, most_recent, currency, since=since)
+    last_consolidated = last_date(returns)
+    if since and not returns:
+        last_consolidated = await service.get_last_returns_date(portfolio_id, category_id, by_category=True)
+    set_last_consolidated_date(request, last_consolidated)
+    if most_recent:
+        return returns
+    return downsample_records(returns, filters, value_key='acc_return', group_key='custom_category_id')
 
 
-@router.get('/{portfolio_id}/category/{category_id}/analysis', tags=['Portfolio Category Data'])
+@router.get('/{portfolio_id}/category/{category_id}/analysis', tags=['Portfolio Category Data'], dependencies=[Depends(portfolio_conditional_request)])
 async def get_category_analysis(
     portfolio_id: int,
     category_id: int,
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     return await service.get_category_stats(portfolio_id, category_id, currency=currency)
@@ -95,16 +131,17 @@ async def get_category_analysis(
 async def get_asset_returns(
     portfolio_id: int,
     asset_id: int,
+    series_format: Annotated[SeriesFormat, Depends()],
     start_date: str = None,
     end_date: str = None,
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     asset_returns = await service.get_asset_acc_returns(portfolio_id, [asset_id], start_date, end_date, currency=currency)
     if asset_returns is None:
-        return []
-    return df_response(asset_returns)
+        return df_response(pd.DataFrame(), series_format)
+    return df_response(asset_returns, series_format)
 
 
 @router.get('/{portfolio_id}/asset/{asset_id}/details', tags=['Portfolio Asset Data'], response_model=AssetDetailsWithPosition)
@@ -112,7 +149,7 @@ async def get_asset_details(
     portfolio_id: int,
     asset_id: int,
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     return await service.get_asset_details(portfolio_id, asset_id, currency=currency)
@@ -123,7 +160,7 @@ async def get_asset_analysis(
     portfolio_id: int,
     asset_id: int,
     currency: str = Query('BRL'),
-    session=Depends(get_session),
+    session=Depends(get_read_session),
 ):
     service = PortfolioPositionService(session)
     return await service.get_asset_analysis(portfolio_id, asset_id, currency=currency)
\ No newline at end of file
@@ -1,5 +1,14 @@
+import json
+from contextlib import aclosing
+from typing import AsyncIterator
+
 from app.entrypoints.worker.task_runner import run_task
 from app.infra.db.session import get_session
+from app.modules.portfolio.consolidation_progress import (
+    FINISHED_STATES,
+    ConsolidationProgress,
+    consolidation_events,
+)
 from app.modules.portfolio.repositories import PortfolioRepository
 from app.modules.portfolio.service.portfolio_consolidator_service import (
     PortfolioConsolidatorService,
@@ -10,28 +19,48 @@ from app.modules.portfolio.service.portfolio_returns_consolidator_service import
 from app.modules.portfolio.tasks.consolidate_portfolio_returns import (
     consolidate_portfolio_returns as consolidate_portfolio_returns_task,
 )
-from app.modules.portfolio.tasks.set_patrimony_evolution_cache import (
-    set_patrimony_evolution_cache,
+from app.modules.portfolio.tasks.consolidate_single_portfolio import (
+    consolidate_single_portfolio,
 )
-from app.modules.portfolio.tasks.set_portfolio_returns_cache import (
-    set_portfolio_returns_cache,
+from app.modules.portfolio.tasks.recalculate_all_positions import (
+    recalculate_all_positions as recalculate_all_positions_task,
 )
 from app.modules.users.views import current_superuser
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(tags=['Portfolio Consolidator'], dependencies=[Depends(current_superuser)])
 
+# Comment line sent when no event arrives, so proxies don't drop an idle stream
+SSE_KEEPALIVE_SECONDS = 15
+
+
+async def _queue_run(task, portfolio_id: int) -> str:
+    """Stores the run as queued before its task, so a client following its id never sees the previous run."""
+    progress = ConsolidationProgress(portfolio_id)
+    await progress.queue()
+    try:
+        run_task(task, portfolio_id, run_id=progress.run_id)
+    except Exception as e:
+        await progress.fail(str(e))
+        raise
+    return progress.run_id
+
 
 @router.post('/{portfolio_id}/consolidate')
 async def consolidate_portfolio(
     portfolio_id: int,
+    response: Response,
+    background: bool = Query(False, description='Queue the consolidation and follow it on /consolidation/events'),
     session = Depends(get_session)
 ):
+    if background:
+        run_id = await _queue_run(consolidate_single_portfolio, portfolio_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {'message': 'Queued', 'run_id': run_id}
     service = PortfolioConsolidatorService(session)
     await service.consolidate_position_portfolio(portfolio_id)
-    run_task(set_patrimony_evolution_cache, portfolio_id)
     run_task(consolidate_portfolio_returns_task, portfolio_id)
-    run_task(set_portfolio_returns_cache, portfolio_id)
     return {'message': 'OK'}
 
 
@@ -43,25 +72,69 @@ async def consolidate_portfolio_asset(
 ):
     service = PortfolioConsolidatorService(session)
     await service.recalculate_position_asset(portfolio_id, asset_id)
-    run_task(set_patrimony_evolution_cache, portfolio_id)
     run_task(consolidate_portfolio_returns_task, portfolio_id)
-    run_task(set_portfolio_returns_cache, portfolio_id)
     return {'message': 'OK'}
 
 
 @router.post('/{portfolio_id}/recalculate_all_positions')
 async def recalculate_all_positions(
     portfolio_id: int,
+    response: Response,
+    background: bool = Query(False, description='Queue the recalculation and follow it on /consolidation/events'),
     session = Depends(get_session)
 ):
+    if background:
+        run_id = await _queue_run(recalculate_all_positions_task, portfolio_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {'message': 'Queued', 'run_id': run_id}
     service = PortfolioConsolidatorService(session)
     await service.recalculate_all_positions_portfolio(portfolio_id)
-    run_task(set_patrimony_evolution_cache, portfolio_id)
     run_task(consolidate_portfolio_returns_task, portfolio_id)
-    run_task(set_portfolio_returns_cache, portfolio_id)
     return {'message': 'OK'}
 
 
+@router.get('/{portfolio_id}/consolidation/events')
+async def consolidation_events_stream(
+    portfolio_id: int,
+    request: Request,
+    run_id: str | None = Query(None, description='Run returned by a background consolidation; defaults to the current (or last) run'),
+):
+    """
+    Server-sent events with the progress of one consolidation run of the
+    portfolio: a `snapshot` of the stored status, then the run's events as they
+    happen, until it finishes. Events of other runs (e.g. a one-asset
+    recalculation after a transaction write) are left out. When the run already
+    finished, the stream ends after its snapshot. Clients should then close the
+    EventSource instead of letting it reconnect.
+    """
+    return StreamingResponse(
+        _sse(request, portfolio_id, run_id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def _sse(request: Request, portfolio_id: int, run_id: str | None = None) -> AsyncIterator[str]:
+    # aclosing: unsubscribe as soon as the client leaves, not when the generator is collected
+    async with aclosing(consolidation_events(portfolio_id, SSE_KEEPALIVE_SECONDS)) as events:
+        async for message in events:
+            if await request.is_disconnected():
+                return
+            if message is None:
+                yield ': keep-alive\n\n'
+                continue
+            if run_id is None and message['event'] in ('snapshot', 'run_started'):
+                # Without a run_id, follow the current (or last) run, or else the next one to start
+                run_id = message['run_id']
+            if message['run_id'] != run_id:
+                continue
+            yield f"event: {message['event']}\ndata: {json.dumps(message, default=str)}\n\n"
+            if message['event'] == 'run_finished' or (
+                message['event'] == 'snapshot' and message['state'] in FINISHED_STATES
+            ):
+                return
+
+
 @router.post('/{portfolio_id}/consolidate_portfolio_returns')
 async def consolidate_portfolio_returns(
     portfolio_id: int,
@@ -1,25 +1,125 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 
-from app.infra.db.session import get_session
-from app.modules.portfolio.domain.portfolio_reports import StatementScope
+from app.infra.db.session import get_read_session, get_read_session_factory
+from app.modules.portfolio.domain.portfolio_reports import (
+    ExportFormat,
+    StatementFormat,
+    StatementScope,
+)
+from app.modules.portfolio.service.portfolio_report_jobs_service import (
+    PortfolioReportJobsService,
+)
 from app.modules.portfolio.service.portfolio_reports_service import (
     PortfolioReportsService,
 )
 
+from .schema import PerformanceStatementRequest, ReportJob
+
 router = APIRouter(tags=['Portfolio Reports'])
 
 
-@router.get('/{portfolio_id}/reports/performance_statement.xlsx')
+@router.get('/{portfolio_id}/reports/performance_statement.{statement_format}')
 async def get_portfolio_returns(
     portfolio_id: int,
+    statement_format: StatementFormat,
     asset_ids: list[int] | None = Query(default=None),
     scope: StatementScope = StatementScope.PORTFOLIO,
-    session = Depends(get_session)
+    session_factory = Depends(get_read_session_factory)
 ):
-    service = PortfolioReportsService(session)
+    service = PortfolioReportsService(session_factory=session_factory)
     return await service.generate_performance_statement(
         portfolio_id=portfolio_id, 
         asset_ids=asset_ids,
-        scope=scope
+        scope=scope,
+        statement_format=statement_format,
     )
-    
\ No newline at end of file
+    
+
+
+@router.get('/{portfolio_id}/reports/position_history.{export_format}')
+async def export_position_history(
+    portfolio_id: int,
+    export_format: ExportFormat,
+    asset_ids: list[int] | None = Query(default=None),
+    session_factory = Depends(get_read_session_factory)
+):
+    service = PortfolioReportsService(session_factory=session_factory)
+    return await service.export_position_history(
+        portfolio_id=portfolio_id,
+        export_format=export_format,
+        asset_ids=asset_ids,
+    )
+
+
+@router.get('/{portfolio_id}/reports/returns.{export_format}')
+async def export_portfolio_returns(
+    portfolio_id: int,
+    export_format: ExportFormat,
+    currency: str = Query('BRL'),
+    session = Depends(get_read_session)
+):
+    service = PortfolioReportsService(session)
+    return await service.export_portfolio_returns(
+        portfolio_id=portfolio_id,
+        export_format=export_format,
+        currency=currency,
+    )
+
+
+@router.get('/{portfolio_id}/reports/category_returns.{export_format}')
+async def export_category_returns(
+    portfolio_id: int,
+    export_format: ExportFormat,
+    category_id: int | None = Query(default=None),
+    currency: str = Query('BRL'),
+    session = Depends(get_read_session)
+):
+    service = PortfolioReportsService(session)
+    return await service.export_category_returns(
+        portfolio_id=portfolio_id,
+        export_format=export_format,
+        category_id=category_id,
+        currency=currency,
+    )
+
+
+@router.post(
+    '/{portfolio_id}/reports/jobs/performance_statement',
+    response_model=ReportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def request_performance_statement(
+    portfolio_id: int,
+    request: PerformanceStatementRequest,
+):
+    service = PortfolioReportJobsService()
+    return await service.request_performance_statement(
+        portfolio_id=portfolio_id,
+        scope=request.scope,
+        asset_ids=request.asset_ids,
+        statement_format=request.statement_format,
+    )
+
+
+@router.get('/{portfolio_id}/reports/jobs/{job_id}', response_model=ReportJob)
+async def get_report_job(
+    portfolio_id: int,
+    job_id: str,
+):
+    service = PortfolioReportJobsService()
+    return await service.get_job(portfolio_id, job_id)
+
+
+@router.get('/{portfolio_id}/reports/jobs/{job_id}/download')
+async def download_report(
+    portfolio_id: int,
+    job_id: str,
+):
+    service = PortfolioReportJobsService()
+    job, content = await service.get_artifact(portfolio_id, job_id)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{job["filename"]}"',
+        "Content-Length": str(job["size"]),
+    }
+    return StreamingResponse(content, media_type=job['media_type'], headers=headers)
@@ -1,8 +1,28 @@
 from pydantic import BaseModel
 
-from app.modules.portfolio.domain.portfolio_reports import StatementScope
+from app.modules.portfolio.domain.portfolio_reports import (
+    ReportJobState,
+    StatementFormat,
+    StatementScope,
+)
 
 
 class PerformanceStatementRequest(BaseModel):
     asset_ids: list[int] | None = None
-    scope: StatementScope = StatementScope.PORTFOLIO
\ No newline at end of file
+    scope: StatementScope = StatementScope.PORTFOLIO
+    statement_format: StatementFormat = StatementFormat.XLSX
+
+
+class ReportJob(BaseModel):
+    job_id: str
+    state: ReportJobState
+    report: str
+    filename: str
+    rows_written: int = 0
+    total_rows: int | None = None
+    progress: float | None = None
+    size: int | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float | None = None
+    finished_at: float | None = None
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends
 from app.modules.users.views import current_active_user
 
 from .category.router import router as category_router
+from .dashboard.router import router as dashboard_router
 from .dividend.router import router as dividend_router
 from .income_tax.router import router as income_tax_router
 from .portfolio.router import router as portfolio_router
@@ -25,5 +26,6 @@ router.include_router(income_tax_router)
 router.include_router(user_configuration_router)
 router.include_router(reports_router)
 router.include_router(rebalancing_router)
+router.include_router(dashboard_router)
 
 __all__ = ['router']
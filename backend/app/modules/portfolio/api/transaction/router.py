@@ -3,7 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Body, Depends, Query
 
 from app.entrypoints.worker.task_runner import run_task
-from app.infra.db.session import get_session
+from app.infra.db.session import get_read_session, get_session
 from app.modules.portfolio.service.portfolio_transaction_service import (
     PortfolioTransactionService,
 )
@@ -11,7 +11,9 @@ from app.modules.portfolio.tasks.recalculate_asset_position import (
     recalculate_position_asset,
 )
 
-from .schema import Transaction
+from typing_extensions import Annotated
+
+from .schema import Transaction, TransactionFilters, TransactionPage
 
 router = APIRouter(prefix='/transaction', tags=['Portfolio Transaction'])
 
@@ -44,6 +46,16 @@ async def get_transactions(
     )
 
 
+@router.get('/{portfolio_id}/page', response_model=TransactionPage)
+async def get_transactions_page(
+    portfolio_id: int,
+    filters: Annotated[TransactionFilters, Query()],
+    session = Depends(get_read_session),
+):
+    service = PortfolioTransactionService(session)
+    return await service.get_transactions_page(portfolio_id, filters)
+
+
 @router.put('/')
 async def update_transaction(
     transaction: dict,
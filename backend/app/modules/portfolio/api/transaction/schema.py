@@ -1,6 +1,8 @@
+import datetime as dt
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class Transaction(BaseModel):
@@ -9,4 +11,28 @@ class Transaction(BaseModel):
     broker_id: int
     date: datetime
     quantity: float
-    price: float
\ No newline at end of file
+    price: float
+
+
+class TransactionFilters(BaseModel):
+    start_date: dt.date | None = None
+    end_date: dt.date | None = None
+    type: Literal['Compra', 'Venda'] | None = None
+    ticker: str | None = None
+    asset_id: int | None = None
+    asset_type_ids: list[int] | None = None
+    currency_id: int | None = None
+    # Opaque position returned as `next_cursor` by the previous page
+    cursor: str | None = None
+    limit: int = Field(50, ge=1, le=500)
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date must be <= end_date")
+        return self
+
+
+class TransactionPage(BaseModel):
+    items: list[dict]
+    next_cursor: str | None = None
@@ -0,0 +1,24 @@
+# app/modules/portfolio/cache.py
+"""
+Portfolio cache versioning.
+
+Every cached read scoped to a portfolio uses `PORTFOLIO_CACHE_TAG` as its
+`version_tag`, so bumping the portfolio's version after its data changes
+invalidates all of its entries at once. The version also drives the ETag of
+the portfolio data endpoints.
+"""
+
+from typing import Optional
+
+from app.infra.redis.redis_service import RedisService
+
+PORTFOLIO_CACHE_TAG = 'portfolio:{portfolio_id}'
+
+
+async def bump_portfolio_cache_version(portfolio_id: int) -> None:
+    await RedisService().bump_version(PORTFOLIO_CACHE_TAG.format(portfolio_id=portfolio_id))
+
+
+async def get_portfolio_cache_version(portfolio_id: int) -> tuple[int, Optional[float]]:
+    """Current version of the portfolio's data and when it was bumped (epoch seconds)."""
+    return await RedisService().get_version_info(PORTFOLIO_CACHE_TAG.format(portfolio_id=portfolio_id))
@@ -0,0 +1,150 @@
+# app/modules/portfolio/consolidation_progress.py
+"""
+Live progress of portfolio consolidations.
+
+Each run (a consolidation or recalculation of some of a portfolio's assets)
+publishes its events on the portfolio's Redis channel:
+
+- `run_started`: total_assets
+- `asset_started`: asset_id, ticker
+- `prices_fetched`, `computed`: asset_id, rows
+- `persisted`: asset_id, rows, duration
+- `failed`: asset_id, error, duration
+- `run_finished`: completed, failed, duration (and error when the run failed)
+
+The run's counters are also stored, so a client that connects mid-run starts
+from a `snapshot`. A run queued from the API is stored as `queued` before the
+worker takes it, so its id can be followed from the start. Progress is best
+effort: a Redis failure is logged and never fails the consolidation.
+"""
+
+import json
+import time
+import uuid
+from typing import AsyncIterator, Optional
+
+from app.config.logger import logger
+from app.infra.redis.redis_service import RedisService
+
+CONSOLIDATION_CHANNEL = 'consolidation:{portfolio_id}'
+CONSOLIDATION_STATUS_KEY = 'consolidation_status:{portfolio_id}'
+STATUS_TTL_SECONDS = 24 * 3600
+FINISHED_STATES = ('done', 'failed')
+
+
+class ConsolidationProgress:
+    """
+    Progress of one run. A run that `yields_status` (a standalone one-asset
+    recalculation) still publishes its events, but doesn't overwrite the stored
+    status of another run that is queued or running.
+    """
+
+    def __init__(self, portfolio_id: int, run_id: Optional[str] = None, yields_status: bool = False):
+        self.portfolio_id = portfolio_id
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.redis = RedisService()
+        self.yields_status = yields_status
+        self.saves_status = True
+        self.started_at = time.time()
+        self.status = {
+            'run_id': self.run_id,
+            'state': 'running',
+            'total_assets': 0,
+            'completed': 0,
+            'failed': 0,
+            'started_at': self.started_at,
+            'duration': None,
+        }
+
+    async def queue(self) -> None:
+        self.status['state'] = 'queued'
+        await self._save()
+
+    async def start(self, asset_ids: list[int]) -> None:
+        self.status['total_assets'] = len(asset_ids)
+        if self.yields_status:
+            self.saves_status = not await self._other_run_active()
+        await self._save()
+        await self.publish('run_started', total_assets=len(asset_ids))
+
+    async def asset_finished(self, asset_id: int, started: float, rows: int = 0, error: Optional[str] = None) -> None:
+        duration = round(time.perf_counter() - started, 3)
+        if error is None:
+            self.status['completed'] += 1
+            await self.publish('persisted', asset_id=asset_id, rows=rows, duration=duration)
+        else:
+            self.status['failed'] += 1
+            await self.publish('failed', asset_id=asset_id, error=error, duration=duration)
+        await self._save()
+
+    async def finish(self) -> None:
+        self.status.update(state='done', duration=round(time.time() - self.started_at, 3))
+        await self._save()
+        await self.publish(
+            'run_finished',
+            completed=self.status['completed'],
+            failed=self.status['failed'],
+            duration=self.status['duration'],
+        )
+
+    async def fail(self, error: str) -> None:
+        """Ends a run that couldn't go on, e.g. a queued run whose task didn't start."""
+        self.status.update(state='failed', error=error, duration=round(time.time() - self.started_at, 3))
+        await self._save()
+        await self.publish(
+            'run_finished',
+            completed=self.status['completed'],
+            failed=self.status['failed'],
+            duration=self.status['duration'],
+            error=error,
+        )
+
+    async def publish(self, event: str, **fields) -> None:
+        message = {
+            'event': event,
+            'run_id': self.run_id,
+            'portfolio_id': self.portfolio_id,
+            'at': time.time(),
+            **fields,
+        }
+        try:
+            await self.redis.publish_json(CONSOLIDATION_CHANNEL.format(portfolio_id=self.portfolio_id), message)
+        except Exception as e:
+            logger.warning(f'Falha ao publicar progresso da consolidação do portfolio {self.portfolio_id}: {e}')
+
+    async def _other_run_active(self) -> bool:
+        try:
+            status = await self.redis.get_json(CONSOLIDATION_STATUS_KEY.format(portfolio_id=self.portfolio_id))
+        except Exception as e:
+            logger.warning(f'Falha ao ler progresso da consolidação do portfolio {self.portfolio_id}: {e}')
+            return False
+        return bool(status) and status['run_id'] != self.run_id and status['state'] not in FINISHED_STATES
+
+    async def _save(self) -> None:
+        if not self.saves_status:
+            return
+        try:
+            await self.redis.set_json(
+                CONSOLIDATION_STATUS_KEY.format(portfolio_id=self.portfolio_id),
+                self.status,
+                expire_seconds=STATUS_TTL_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f'Falha ao salvar progresso da consolidação do portfolio {self.portfolio_id}: {e}')
+
+
+async def consolidation_events(portfolio_id: int, keepalive_seconds: float) -> AsyncIterator[Optional[dict]]:
+    """
+    The portfolio's consolidation events as they are published, starting with a
+    `snapshot` of the last run when there is one. Yields None after
+    `keepalive_seconds` without events.
+    """
+    redis = RedisService()
+    async with redis.subscribe(CONSOLIDATION_CHANNEL.format(portfolio_id=portfolio_id)) as pubsub:
+        # Read after subscribing, so no event falls between the snapshot and the stream
+        snapshot = await redis.get_json(CONSOLIDATION_STATUS_KEY.format(portfolio_id=portfolio_id))
+        if snapshot:
+            yield {'event': 'snapshot', 'portfolio_id': portfolio_id, **snapshot}
+        while True:
+            message = await pubsub.get_message(timeout=keepalive_seconds)
+            yield json.loads(message['data']) if message else None
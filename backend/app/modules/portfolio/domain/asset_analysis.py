@@ -12,6 +12,7 @@ from app.domain.finance.risk_metrics import (
     skewness,
     var_historic,
 )
+from app.utils.timing import timeit
 
 
 def sanitize_nan(obj):
@@ -23,6 +24,7 @@ def sanitize_nan(obj):
         return None
     return obj
 
+@timeit('calculate_returns_analysis')
 def calculate_returns_analysis(
     returns: pd.Series,
     benchmarks: dict[str, pd.Series],
@@ -54,6 +56,7 @@ def _calculate_rolling_cagr(returns: pd.Series) -> list[dict]:
     return results
 
 
+@timeit('calculate_risk_metrics')
 def calculate_risk_metrics(returns, cdi_returns):
     annual_vol = annualize_vol(returns)
     sr = sharpe_ratio(returns, cdi_returns)
@@ -83,6 +86,7 @@ def calculate_risk_metrics(returns, cdi_returns):
         "cvar_95": cvar_historic(returns, level=5),
     }
 
+@timeit('calculate_performance_metrics')
 def calculate_performance_metrics(returns, benchmarks):
     portfolio_cagr = cagr(returns)
     
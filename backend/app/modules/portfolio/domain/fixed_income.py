@@ -7,8 +7,10 @@ from app.domain.finance.fixed_income import calculate_fixed_income_price
 from app.infra.db.models.constants.asset_fixed_income_type import (
     ASSET_FIXED_INCOME_TYPE,
 )
+from app.utils.timing import timeit
 
 
+@timeit('calculate_fixed_income_prices')
 def calculate_fixed_income_prices(
     fixed_income_type_id: int,
     fee: float,
@@ -5,4 +5,21 @@ class StatementScope(str, Enum):
     PORTFOLIO = 'portfolio'
     ASSET = 'asset'
     CATEGORY = 'category'
-    CUSTOM = 'custom'
\ No newline at end of file
+    CUSTOM = 'custom'
+
+
+class ExportFormat(str, Enum):
+    PARQUET = 'parquet'
+    ARROW = 'arrow'
+
+
+class StatementFormat(str, Enum):
+    XLSX = 'xlsx'
+    CSV = 'csv'
+
+
+class ReportJobState(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
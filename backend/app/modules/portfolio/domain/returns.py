@@ -1,7 +1,9 @@
 import pandas as pd
 from app.domain.finance.returns import calculate_acc_returns
+from app.utils.timing import timeit
 
 
+@timeit('calculate_portfolio_daily_returns')
 def calculate_portfolio_daily_returns(pos_df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes daily returns for each asset in a portfolio position DataFrame.
@@ -44,6 +46,7 @@ def calculate_portfolio_daily_returns(pos_df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+@timeit('calculate_returns_portfolio')
 def calculate_returns_portfolio(pos_df: pd.DataFrame) -> dict:
     """
     Computes portfolio, category, and per-asset cumulative returns.
@@ -61,6 +64,7 @@ def calculate_returns_portfolio(pos_df: pd.DataFrame) -> dict:
         "category_returns": category_df,
     }
 
+@timeit('calculate_portfolio_acc_return')
 def calculate_portfolio_acc_return(df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes cumulative portfolio return using value-weighted daily returns.
@@ -72,6 +76,7 @@ def calculate_portfolio_acc_return(df: pd.DataFrame) -> pd.DataFrame:
     return grouped.drop(columns='weighted_return')
 
 
+@timeit('calculate_category_acc_return')
 def calculate_category_acc_return(df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes cumulative return per category using beginning-of-period weighting.
@@ -101,6 +106,7 @@ def calculate_category_acc_return(df: pd.DataFrame) -> pd.DataFrame:
     return cumulative.reset_index()
 
 
+@timeit('calculate_asset_acc_returns')
 def calculate_asset_acc_returns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Computes cumulative return per asset (ticker), pivoted by date.
@@ -1,6 +1,7 @@
 from datetime import date as date_type
 from datetime import datetime, timedelta
-from typing import List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
 
 import pandas as pd
 from app.infra.db.models.asset import Asset, AssetClass, AssetType
@@ -8,7 +9,8 @@ from app.infra.db.models.asset_etf import ETF
 from app.infra.db.models.asset_fii import FII, FIISegment
 from app.infra.db.models.asset_fixed_income import FixedIncome
 from app.infra.db.models.asset_treasury_bond import TreasuryBond
-from app.infra.db.models.market_data import Index
+from app.infra.db.models.constants.index import INDEX
+from app.infra.db.models.market_data import Index, IndexHistory
 from app.infra.db.models.portfolio import (
     Broker,
     CategoryReturn,
@@ -21,8 +23,86 @@ from app.infra.db.models.portfolio import (
     Transaction,
 )
 from app.infra.db.repositories.base_repository import SQLAlchemyRepository
-from sqlalchemy import Date, and_, cast, func, literal, select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    case,
+    cast,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased, joinedload
+
+HISTORY_CHUNK_SIZE = 5000
+
+ASSET_POSITION_DTYPES = {
+    'date': 'datetime64[ns]',
+    'asset_id': 'int64',
+    'ticker': 'object',
+    'quantity': 'float64',
+    'price': 'float64',
+    'price_usd': 'float64',
+    'twelve_months_return': 'float64',
+    'dividend': 'float64',
+    'dividend_usd': 'float64',
+}
+
+PORTFOLIO_POSITION_DTYPES = {
+    'date': 'datetime64[ns]',
+    'asset_id': 'int64',
+    'ticker': 'object',
+    'quantity': 'float64',
+    'price': 'float64',
+    'price_usd': 'float64',
+    'average_price': 'float64',
+    'dividend': 'float64',
+    'dividend_usd': 'float64',
+    'category': 'object',
+}
+
+COMPLETE_POSITION_HISTORY_DTYPES = {
+    'date': 'datetime64[ns]',
+    'portfolio_id': 'int64',
+    'asset_id': 'int64',
+    'quantity': 'float64',
+    'price': 'float64',
+    'average_price': 'float64',
+    'daily_return': 'float64',
+    'acc_return': 'float64',
+    'twelve_months_return': 'float64',
+    'price_usd': 'float64',
+    'average_price_usd': 'float64',
+    'daily_return_usd': 'float64',
+    'acc_return_usd': 'float64',
+    'twelve_months_return_usd': 'float64',
+    'ticker': 'object',
+    'dividend_amount': 'float64',
+    'transaction_quantity': 'float64',
+    'category': 'object',
+}
+
+RETURNS_DTYPES = {
+    'date': 'datetime64[ns]',
+    'daily_return': 'float64',
+    'acc_return': 'float64',
+    'cagr': 'float64',
+}
+
+CATEGORY_RETURNS_DTYPES = {
+    'date': 'datetime64[ns]',
+    'custom_category_id': 'int64',
+    'category': 'object',
+    'daily_return': 'float64',
+    'acc_return': 'float64',
+    'cagr': 'float64',
+}
 
 
 def get_custom_category_subquery(portfolio_id):
@@ -34,6 +114,258 @@ def get_custom_category_subquery(portfolio_id):
     )
 
 
+# ---------------------------------------------------------------------------
+# Prebuilt statements for the hot read paths.
+#
+# Every statement below is built once per shape and takes its values through
+# bind parameters (`portfolio_id`, `start_date`, ...), so each call reuses the
+# same statement object: SQLAlchemy's compiled cache is hit without rebuilding
+# the select tree, and the SQL text is stable for asyncpg's prepared-statement
+# cache. Lists are bound as arrays (`= ANY(:ids)`) instead of expanding IN, so
+# the SQL does not change with the number of ids.
+# ---------------------------------------------------------------------------
+PORTFOLIO_ID = bindparam('portfolio_id', type_=Integer)
+
+
+def _int_array_param(name: str):
+    return bindparam(name, type_=ARRAY(Integer))
+
+
+CUSTOM_CATEGORY_SUBQUERY = get_custom_category_subquery(PORTFOLIO_ID)
+
+LATEST_POSITION_DATE_STMT = select(func.max(Position.date)).where(
+    Position.portfolio_id == PORTFOLIO_ID
+)
+
+
+def _dividend_by_day_subquery(filter_asset_ids: bool = False):
+    stmt = (
+        select(
+            Dividend.asset_id,
+            Dividend.portfolio_id,
+            Dividend.date,
+            func.sum(Dividend.amount).label('total_dividend'),
+            func.sum(Dividend.amount_usd).label('total_dividend_usd'),
+        )
+        .where(Dividend.portfolio_id == PORTFOLIO_ID)
+        .group_by(Dividend.asset_id, Dividend.portfolio_id, Dividend.date)
+    )
+    if filter_asset_ids:
+        stmt = stmt.where(Dividend.asset_id == any_(_int_array_param('asset_ids')))
+    return stmt.subquery()
+
+
+@lru_cache(maxsize=None)
+def _asset_position_stmt(has_start_date: bool, has_end_date: bool):
+    dividend_subquery = _dividend_by_day_subquery(filter_asset_ids=True)
+
+    stmt = (
+        select(
+            Position.date,
+            Position.asset_id,
+            Asset.ticker,
+            Position.quantity,
+            Position.price,
+            Position.price_usd,
+            Position.twelve_months_return,
+            func.coalesce(dividend_subquery.c.total_dividend, 0).label('dividend'),
+            func.coalesce(dividend_subquery.c.total_dividend_usd, 0).label('dividend_usd'),
+        )
+        .join(Asset, Position.asset_id == Asset.id)
+        .outerjoin(
+            dividend_subquery,
+            and_(
+                dividend_subquery.c.asset_id == Position.asset_id,
+                dividend_subquery.c.date == Position.date,
+                dividend_subquery.c.portfolio_id == Position.portfolio_id,
+            ),
+        )
+        .where(Position.portfolio_id == PORTFOLIO_ID)
+        .where(Position.asset_id == any_(_int_array_param('asset_ids')))
+    )
+
+    if has_start_date:
+        stmt = stmt.where(Position.date >= bindparam('start_date', type_=Date))
+    if has_end_date:
+        stmt = stmt.where(Position.date <= bindparam('end_date', type_=Date))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _portfolio_position_stmt(
+    has_start_date: bool,
+    has_end_date: bool,
+    has_asset_id: bool,
+    has_asset_ids: bool,
+    has_asset_type_id: bool,
+    has_asset_type_ids: bool,
+):
+    dividend_subquery = _dividend_by_day_subquery()
+    cat_assignment_subq = CUSTOM_CATEGORY_SUBQUERY
+
+    stmt = (
+        select(
+            Position.date,
+            Position.asset_id,
+            Asset.ticker,
+            Position.quantity,
+            Position.price,
+            Position.price_usd,
+            Position.average_price,
+            dividend_subquery.c.total_dividend.label('dividend'),
+            dividend_subquery.c.total_dividend_usd.label('dividend_usd'),
+            cat_assignment_subq.c.category,
+        )
+        .join(Asset, Position.asset_id == Asset.id)
+        .outerjoin(
+            dividend_subquery,
+            and_(
+                dividend_subquery.c.asset_id == Position.asset_id,
+                dividend_subquery.c.date == Position.date,
+                dividend_subquery.c.portfolio_id == Position.portfolio_id,
+            ),
+        )
+        .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Position.asset_id)
+        .where(Position.portfolio_id == PORTFOLIO_ID)
+        .order_by(Position.date)
+    )
+
+    if has_start_date:
+        stmt = stmt.where(Position.date >= bindparam('start_date', type_=Date))
+    if has_end_date:
+        stmt = stmt.where(Position.date <= bindparam('end_date', type_=Date))
+    if has_asset_id:
+        stmt = stmt.where(Position.asset_id == bindparam('asset_id', type_=Integer))
+    if has_asset_ids:
+        stmt = stmt.where(Position.asset_id == any_(_int_array_param('asset_ids')))
+    if has_asset_type_id:
+        stmt = stmt.where(Asset.asset_type_id == bindparam('asset_type_id', type_=Integer))
+    if has_asset_type_ids:
+        stmt = stmt.where(Asset.asset_type_id == any_(_int_array_param('asset_type_ids')))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _position_on_date_stmt(currency: str, has_asset_type_id: bool):
+    cat_assignment_subq = CUSTOM_CATEGORY_SUBQUERY
+
+    price_col = Position.price_usd.label('price') if currency == 'USD' else Position.price
+    total_invested_col = Position.total_invested_usd.label('total_invested') if currency == 'USD' else Position.total_invested
+
+    stmt = (
+        select(
+            Position.date,
+            Position.asset_id,
+            Asset.ticker,
+            Asset.name,
+            Position.quantity,
+            price_col,
+            Position.twelve_months_return,
+            Position.acc_return,
+            Position.daily_return,
+            Position.cagr,
+            total_invested_col,
+            Dividend.amount.label('dividend'),
+            cat_assignment_subq.c.category,
+            AssetType.short_name.label('type'),
+            AssetType.id.label('type_id'),
+            AssetClass.name.label('class'),
+        )
+        .join(Asset, Position.asset_id == Asset.id)
+        .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Position.asset_id)
+        .join(AssetType, Asset.asset_type_id == AssetType.id)
+        .join(AssetClass, AssetType.asset_class_id == AssetClass.id)
+        .outerjoin(
+            Dividend,
+            and_(
+                Dividend.asset_id == Position.asset_id,
+                Dividend.date == Position.date,
+                Dividend.portfolio_id == Position.portfolio_id,
+            ),
+        )
+        .where(Position.portfolio_id == PORTFOLIO_ID)
+        .where(Position.date == bindparam('search_date', type_=Date))
+        .order_by(Position.date)
+    )
+
+    if has_asset_type_id:
+        stmt = stmt.where(Asset.asset_type_id == bindparam('asset_type_id', type_=Integer))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _portfolio_returns_stmt(currency: str, has_since: bool = False):
+    suffix = '_usd' if currency == 'USD' else ''
+    daily_col = getattr(PortfolioReturn, f'daily_return{suffix}')
+    acc_col = getattr(PortfolioReturn, f'acc_return{suffix}')
+    cagr_col = getattr(PortfolioReturn, f'cagr{suffix}')
+
+    stmt = (
+        select(
+            PortfolioReturn.date,
+            daily_col.label('daily_return'),
+            acc_col.label('acc_return'),
+            cagr_col.label('cagr'),
+        )
+        .where(PortfolioReturn.portfolio_id == PORTFOLIO_ID)
+        .order_by(PortfolioReturn.date)
+    )
+    if has_since:
+        stmt = stmt.where(PortfolioReturn.date > bindparam('since', type_=Date))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _category_returns_stmt(
+    currency: str, most_recent: bool, has_category_id: bool, has_since: bool = False
+):
+    suffix = '_usd' if currency == 'USD' else ''
+    daily_col = getattr(CategoryReturn, f'daily_return{suffix}')
+    acc_col = getattr(CategoryReturn, f'acc_return{suffix}')
+    cagr_col = getattr(CategoryReturn, f'cagr{suffix}')
+    category_id = bindparam('custom_category_id', type_=Integer)
+
+    stmt = (
+        select(
+            CategoryReturn.date,
+            CategoryReturn.custom_category_id,
+            CustomCategory.name.label('category'),
+            daily_col.label('daily_return'),
+            acc_col.label('acc_return'),
+            cagr_col.label('cagr'),
+        )
+        .join(CustomCategory, CustomCategory.id == CategoryReturn.custom_category_id)
+        .where(CategoryReturn.portfolio_id == PORTFOLIO_ID)
+    )
+
+    if most_recent:
+        # Subquery to get the max date per category
+        max_date_sq = (
+            select(
+                CategoryReturn.custom_category_id,
+                func.max(CategoryReturn.date).label('max_date'),
+            )
+            .where(CategoryReturn.portfolio_id == PORTFOLIO_ID)
+            .group_by(CategoryReturn.custom_category_id)
+        )
+        if has_category_id:
+            max_date_sq = max_date_sq.where(CategoryReturn.custom_category_id == category_id)
+        max_date_sq = max_date_sq.subquery()
+
+        return stmt.join(
+            max_date_sq,
+            (CategoryReturn.custom_category_id == max_date_sq.c.custom_category_id)
+            & (CategoryReturn.date == max_date_sq.c.max_date),
+        )
+
+    stmt = stmt.order_by(CategoryReturn.date)
+    if has_category_id:
+        stmt = stmt.where(CategoryReturn.custom_category_id == category_id)
+    if has_since:
+        stmt = stmt.where(CategoryReturn.date > bindparam('since', type_=Date))
+    return stmt
+
+
 class PortfolioRepository(SQLAlchemyRepository):
     async def get_position_on_date_by_broker(
         self,
@@ -236,6 +568,125 @@ class PortfolioRepository(SQLAlchemyRepository):
         df['price'] = df['price'].astype(float)
         return df
 
+    async def get_transactions_page_df(
+        self,
+        portfolio_id: int,
+        filters,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> pd.DataFrame:
+        """
+        One page of the portfolio's transactions, newest first, keyset-paginated
+        on (date, id): `after` is the (date, id) of the last row of the previous
+        page. Fetches `filters.limit + 1` rows so the caller can tell whether
+        another page exists. Average price and held quantity come from the
+        consolidated positions and the USD/BRL rate from index_history, so the
+        cost is bounded by the page size.
+
+        Sells take the average price of the last position before their day: a
+        sell that closes the position has no position row on its own day, since
+        the consolidator truncates positions at the last day with quantity > 0.
+        The held quantity is that position's plus the asset's transactions of the
+        day up to this one.
+        """
+        cat_assignment_subq = get_custom_category_subquery(portfolio_id)
+        transaction_date = cast(Transaction.date, Date)
+
+        previous_position = (
+            select(Position.quantity, Position.average_price)
+            .where(
+                Position.portfolio_id == Transaction.portfolio_id,
+                Position.asset_id == Transaction.asset_id,
+                Position.date < transaction_date,
+            )
+            .order_by(Position.date.desc())
+            .limit(1)
+            .correlate(Transaction)
+            .lateral('previous_position')
+        )
+        same_day = aliased(Transaction)
+        day_quantity = (
+            select(func.sum(same_day.quantity))
+            .where(
+                same_day.portfolio_id == Transaction.portfolio_id,
+                same_day.asset_id == Transaction.asset_id,
+                cast(same_day.date, Date) == transaction_date,
+                same_day.id <= Transaction.id,
+            )
+            .correlate(Transaction)
+            .scalar_subquery()
+        )
+        average_price = case(
+            (Transaction.quantity < 0, previous_position.c.average_price),
+            else_=func.coalesce(Position.average_price, previous_position.c.average_price),
+        )
+
+        stmt = (
+            select(
+                Transaction.id,
+                Transaction.date,
+                Transaction.quantity,
+                Broker.id.label('broker_id'),
+                Broker.name.label('broker'),
+                Broker.currency_id.label('currency_id'),
+                Transaction.price.label('original_price'),
+                IndexHistory.close.label('usdbrl'),
+                Asset.id.label('asset_id'),
+                Asset.ticker,
+                Asset.asset_type_id,
+                cat_assignment_subq.c.category,
+                (func.coalesce(previous_position.c.quantity, 0) + day_quantity).label('acc_quantity'),
+                average_price.label('average_price'),
+            )
+            .join(Asset, Transaction.asset_id == Asset.id)
+            .join(Broker, Transaction.broker_id == Broker.id)
+            .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Asset.id)
+            .outerjoin(previous_position, true())
+            .outerjoin(
+                Position,
+                and_(
+                    Position.portfolio_id == Transaction.portfolio_id,
+                    Position.asset_id == Transaction.asset_id,
+                    Position.date == transaction_date,
+                ),
+            )
+            .outerjoin(
+                IndexHistory,
+                and_(
+                    IndexHistory.index_id == INDEX.USDBRL,
+                    IndexHistory.date == transaction_date,
+                ),
+            )
+            .where(Transaction.portfolio_id == portfolio_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
+            .limit(filters.limit + 1)
+        )
+
+        if after:
+            stmt = stmt.where(tuple_(Transaction.date, Transaction.id) < tuple_(*after))
+        if filters.start_date:
+            stmt = stmt.where(Transaction.date >= filters.start_date)
+        if filters.end_date:
+            stmt = stmt.where(Transaction.date < filters.end_date + timedelta(days=1))
+        if filters.type == 'Compra':
+            stmt = stmt.where(Transaction.quantity > 0)
+        elif filters.type == 'Venda':
+            stmt = stmt.where(Transaction.quantity < 0)
+        if filters.ticker:
+            stmt = stmt.where(Asset.ticker.ilike(f'{filters.ticker}%'))
+        if filters.asset_id:
+            stmt = stmt.where(Transaction.asset_id == filters.asset_id)
+        if filters.asset_type_ids:
+            stmt = stmt.where(Asset.asset_type_id.in_(filters.asset_type_ids))
+        if filters.currency_id:
+            stmt = stmt.where(Broker.currency_id == filters.currency_id)
+
+        result = await self.session.execute(stmt)
+        df = pd.DataFrame(result.all(), columns=list(result.keys()))
+        df['date'] = pd.to_datetime(df['date'])
+        for column in ['quantity', 'original_price', 'usdbrl', 'acc_quantity', 'average_price']:
+            df[column] = df[column].astype(float)
+        return df
+
     async def get_portfolio_dividends(
         self, portfolio_id: int, filters, currency: str = 'BRL'
     ) -> pd.DataFrame:
@@ -277,58 +728,16 @@ class PortfolioRepository(SQLAlchemyRepository):
     async def get_asset_position_df(
         self, portfolio_id: int, asset_ids: list[int], start_date=None, end_date=None
     ) -> pd.DataFrame:
-        dividend_subquery = (
-            select(
-                Dividend.asset_id,
-                Dividend.portfolio_id,
-                Dividend.date,
-                func.sum(Dividend.amount).label('total_dividend'),
-                func.sum(Dividend.amount_usd).label('total_dividend_usd'),
-            )
-            .where(Dividend.portfolio_id == portfolio_id)
-            .where(Dividend.asset_id.in_(asset_ids))
-            .group_by(Dividend.asset_id, Dividend.portfolio_id, Dividend.date)
-            .subquery()
-        )
-
-        stmt = (
-            select(
-                Position.date,
-                Position.asset_id,
-                Asset.ticker,
-                Position.quantity,
-                Position.price,
-                Position.price_usd,
-                Position.twelve_months_return,
-                func.coalesce(dividend_subquery.c.total_dividend, 0).label('dividend'),
-                func.coalesce(dividend_subquery.c.total_dividend_usd, 0).label('dividend_usd'),
-            )
-            .join(Asset, Position.asset_id == Asset.id)
-            .outerjoin(
-                dividend_subquery,
-                and_(
-                    dividend_subquery.c.asset_id == Position.asset_id,
-                    dividend_subquery.c.date == Position.date,
-                    dividend_subquery.c.portfolio_id == Position.portfolio_id,
-                ),
-            )
-            .where(Position.portfolio_id == portfolio_id)
-            .where(Position.asset_id.in_(asset_ids))
-        )
-
+        stmt = _asset_position_stmt(bool(start_date), bool(end_date))
+        params = {'portfolio_id': portfolio_id, 'asset_ids': list(asset_ids)}
         if start_date:
-            stmt = stmt.where(Position.date >= start_date)
+            params['start_date'] = start_date
         if end_date:
-            stmt = stmt.where(Position.date <= end_date)
+            params['end_date'] = end_date
 
-        result = await self.session.execute(stmt)
-        df = pd.DataFrame(
-            result.all(),
-            columns=['date', 'asset_id', 'ticker', 'quantity', 'price', 'price_usd', 'twelve_months_return', 'dividend', 'dividend_usd'],
-        )
-        df['dividend'] = pd.to_numeric(df['dividend'], errors='coerce').fillna(0)
-        df['dividend_usd'] = pd.to_numeric(df['dividend_usd'], errors='coerce').fillna(0)
-        df['date'] = pd.to_datetime(df['date'])
+        df = await self.fetch_frame(stmt, ASSET_POSITION_DTYPES, params)
+        df['dividend'] = df['dividend'].fillna(0)
+        df['dividend_usd'] = df['dividend_usd'].fillna(0)
         return df
 
     async def get_portfolio_position_df(
@@ -341,86 +750,38 @@ class PortfolioRepository(SQLAlchemyRepository):
         asset_type_ids=None,
         asset_ids: Optional[List[int]] = None
     ) -> pd.DataFrame:
-        dividend_subquery = (
-            select(
-                Dividend.asset_id,
-                Dividend.portfolio_id,
-                Dividend.date,
-                func.sum(Dividend.amount).label('total_dividend'),
-                func.sum(Dividend.amount_usd).label('total_dividend_usd'),
-            )
-            .where(Dividend.portfolio_id == portfolio_id)
-            .group_by(Dividend.asset_id, Dividend.portfolio_id, Dividend.date)
-            .subquery()
+        filters = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'asset_id': asset_id,
+            'asset_ids': list(asset_ids) if asset_ids else None,
+            'asset_type_id': asset_type_id,
+            'asset_type_ids': list(asset_type_ids) if asset_type_ids else None,
+        }
+        stmt = _portfolio_position_stmt(
+            has_start_date=start_date is not None,
+            has_end_date=end_date is not None,
+            has_asset_id=asset_id is not None,
+            has_asset_ids=filters['asset_ids'] is not None,
+            has_asset_type_id=asset_type_id is not None,
+            has_asset_type_ids=filters['asset_type_ids'] is not None,
         )
+        params = {'portfolio_id': portfolio_id}
+        params.update({key: value for key, value in filters.items() if value is not None})
 
-        cat_assignment_subq = get_custom_category_subquery(portfolio_id)
-
-        stmt = (
-            select(
-                Position.date,
-                Position.asset_id,
-                Asset.ticker,
-                Position.quantity,
-                Position.price,
-                Position.price_usd,
-                Position.average_price,
-                dividend_subquery.c.total_dividend.label('dividend'),
-                dividend_subquery.c.total_dividend_usd.label('dividend_usd'),
-                cat_assignment_subq.c.category,
-            )
-            .join(Asset, Position.asset_id == Asset.id)
-            .outerjoin(
-                dividend_subquery,
-                and_(
-                    dividend_subquery.c.asset_id == Position.asset_id,
-                    dividend_subquery.c.date == Position.date,
-                    dividend_subquery.c.portfolio_id == Position.portfolio_id,
-                ),
-            )
-            .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Position.asset_id)
-            .where(Position.portfolio_id == portfolio_id)
-            .order_by(Position.date)
-        )
-
-        if start_date:
-            stmt = stmt.where(Position.date >= start_date)
-        if end_date:
-            stmt = stmt.where(Position.date <= end_date)
-        if asset_id:
-            stmt = stmt.where(Position.asset_id == asset_id)
-        if asset_ids:
-            stmt = stmt.where(Position.asset_id.in_(asset_ids))
-        if asset_type_id:
-            stmt = stmt.where(Asset.asset_type_id == asset_type_id)
-        if asset_type_ids:
-            stmt = stmt.where(Asset.asset_type_id.in_(asset_type_ids))
-
-        result = await self.session.execute(stmt)
-        df = pd.DataFrame(
-            result.all(),
-            columns=[
-                'date',
-                'asset_id',
-                'ticker',
-                'quantity',
-                'price',
-                'price_usd',
-                'average_price',
-                'dividend',
-                'dividend_usd',
-                'category',
-            ],
-        )
-        df['dividend'] = pd.to_numeric(df['dividend'], errors='coerce').fillna(0)
-        df['dividend_usd'] = pd.to_numeric(df['dividend_usd'], errors='coerce').fillna(0)
-        df['date'] = pd.to_datetime(df['date'])
+        df = await self.fetch_frame(stmt, PORTFOLIO_POSITION_DTYPES, params)
+        df['dividend'] = df['dividend'].fillna(0)
+        df['dividend_usd'] = df['dividend_usd'].fillna(0)
         return df
 
     async def get_position_on_date(self, portfolio_id, date=None, asset_type_id=None, currency='BRL'):
-        stmt = await self._build_portfolio_position_query(portfolio_id, date, asset_type_id, currency=currency)
+        search_date = date or await self._get_portfolio_position_latest_date(portfolio_id)
+        stmt = _position_on_date_stmt(currency, bool(asset_type_id))
+        params = {'portfolio_id': portfolio_id, 'search_date': search_date}
+        if asset_type_id:
+            params['asset_type_id'] = asset_type_id
 
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(stmt, params)
         df = pd.DataFrame(
             result.all(),
             columns=[
@@ -453,66 +814,28 @@ class PortfolioRepository(SQLAlchemyRepository):
         asset_type_id: int = None,
         currency: str = 'BRL',
     ):
-
+        """
+        Position-on-date query with its values bound, for repositories that extend
+        it with extra joins and columns.
+        """
         if date:
             search_date = date
         else:
             search_date = await self._get_portfolio_position_latest_date(portfolio_id)
-        
-        cat_assignment_subq = get_custom_category_subquery(portfolio_id)
 
-        price_col = Position.price_usd.label('price') if currency == 'USD' else Position.price
-        total_invested_col = Position.total_invested_usd.label('total_invested') if currency == 'USD' else Position.total_invested
-        
-        stmt = (
-            select(
-                Position.date,
-                Position.asset_id,
-                Asset.ticker,
-                Asset.name,
-                Position.quantity,
-                price_col,
-                Position.twelve_months_return,
-                Position.acc_return,
-                Position.daily_return,
-                Position.cagr,
-                total_invested_col,
-                Dividend.amount.label('dividend'),
-                cat_assignment_subq.c.category,
-                AssetType.short_name.label('type'),
-                AssetType.id.label('type_id'),
-                AssetClass.name.label('class'),
-            )
-            .join(Asset, Position.asset_id == Asset.id)
-            .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Position.asset_id)
-            .join(AssetType, Asset.asset_type_id == AssetType.id)
-            .join(AssetClass, AssetType.asset_class_id == AssetClass.id)
-            .outerjoin(
-                Dividend,
-                and_(
-                    Dividend.asset_id == Position.asset_id,
-                    Dividend.date == Position.date,
-                    Dividend.portfolio_id == Position.portfolio_id,
-                ),
-            )
-            .where(Position.portfolio_id == portfolio_id)
-            .where(Position.date == search_date)
-            .order_by(Position.date)
-        )
-        
+        params = {'portfolio_id': portfolio_id, 'search_date': search_date}
         if asset_type_id:
-            stmt = stmt.where(Asset.asset_type_id == asset_type_id)
-        
-        return stmt
-        
+            params['asset_type_id'] = asset_type_id
+
+        return _position_on_date_stmt(currency, bool(asset_type_id)).params(**params)
+
     async def _get_portfolio_position_latest_date(
         self,
         portfolio_id: int):
         
-        latest_date_stmt = select(func.max(Position.date)).where(
-            Position.portfolio_id == portfolio_id
+        latest_date_result = await self.session.execute(
+            LATEST_POSITION_DATE_STMT, {'portfolio_id': portfolio_id}
         )
-        latest_date_result = await self.session.execute(latest_date_stmt)
         latest_date = latest_date_result.scalar_one_or_none()
 
         if not latest_date:
@@ -564,6 +887,46 @@ class PortfolioRepository(SQLAlchemyRepository):
         portfolio_id: int,
         asset_ids: Optional[List[int]] = None,
     ) -> pd.DataFrame:
+        stmt = self._build_complete_position_history_query(portfolio_id, asset_ids)
+        result = await self.session.execute(stmt)
+
+        df = pd.DataFrame(result.mappings().all())
+
+        if not df.empty:
+            df["date"] = pd.to_datetime(df["date"])
+
+        return df
+
+    async def stream_complete_portfolio_position_history_df(
+        self,
+        portfolio_id: int,
+        asset_ids: Optional[List[int]] = None,
+        chunk_size: int = HISTORY_CHUNK_SIZE,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Streaming variant of get_complete_portfolio_position_history_df: yields the
+        history in chunks of `chunk_size` rows, ordered by date and asset, typed
+        as COMPLETE_POSITION_HISTORY_DTYPES so every chunk shares one schema.
+        """
+        stmt = self._build_complete_position_history_query(portfolio_id, asset_ids)
+        async for chunk in self.stream_df(stmt, chunk_size=chunk_size):
+            chunk["date"] = pd.to_datetime(chunk["date"])
+            yield chunk.astype(COMPLETE_POSITION_HISTORY_DTYPES)
+
+    async def count_complete_portfolio_position_history(
+        self,
+        portfolio_id: int,
+        asset_ids: Optional[List[int]] = None,
+    ) -> int:
+        stmt = self._build_complete_position_history_query(portfolio_id, asset_ids)
+        result = await self.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        return result.scalar()
+
+    @staticmethod
+    def _build_complete_position_history_query(
+        portfolio_id: int,
+        asset_ids: Optional[List[int]] = None,
+    ):
         div_q = (
             select(
                 Dividend.asset_id.label("asset_id"),
@@ -647,34 +1010,16 @@ class PortfolioRepository(SQLAlchemyRepository):
         if asset_ids:
             stmt = stmt.where(Position.asset_id.in_(asset_ids))
 
-        result = await self.session.execute(stmt)
-
-        df = pd.DataFrame(result.mappings().all())
-
-        if not df.empty:
-            df["date"] = pd.to_datetime(df["date"])
-
-        return df
+        return stmt
 
     async def get_portfolio_returns(
-        self, portfolio_id: int, currency: str = 'BRL'
+        self, portfolio_id: int, currency: str = 'BRL', since: Optional[date_type] = None
     ) -> list[dict]:
-        suffix = '_usd' if currency == 'USD' else ''
-        daily_col = getattr(PortfolioReturn, f'daily_return{suffix}')
-        acc_col = getattr(PortfolioReturn, f'acc_return{suffix}')
-        cagr_col = getattr(PortfolioReturn, f'cagr{suffix}')
+        params = {'portfolio_id': portfolio_id}
+        if since:
+            params['since'] = since
 
-        stmt = (
-            select(
-                PortfolioReturn.date,
-                daily_col.label('daily_return'),
-                acc_col.label('acc_return'),
-                cagr_col.label('cagr'),
-            )
-            .where(PortfolioReturn.portfolio_id == portfolio_id)
-            .order_by(PortfolioReturn.date)
-        )
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(_portfolio_returns_stmt(currency, bool(since)), params)
         return result.mappings().all()
 
     async def get_category_returns(
@@ -683,62 +1028,50 @@ class PortfolioRepository(SQLAlchemyRepository):
         custom_category_id: int = None,
         most_recent: bool = False,
         currency: str = 'BRL',
+        since: Optional[date_type] = None,
     ) -> list[dict]:
-        suffix = '_usd' if currency == 'USD' else ''
-        daily_col = getattr(CategoryReturn, f'daily_return{suffix}')
-        acc_col = getattr(CategoryReturn, f'acc_return{suffix}')
-        cagr_col = getattr(CategoryReturn, f'cagr{suffix}')
-
-        if most_recent:
-            # Subquery to get the max date per category
-            max_date_sq = (
-                select(
-                    CategoryReturn.custom_category_id,
-                    func.max(CategoryReturn.date).label('max_date'),
-                )
-                .where(CategoryReturn.portfolio_id == portfolio_id)
-                .group_by(CategoryReturn.custom_category_id)
-            )
-            if custom_category_id:
-                max_date_sq = max_date_sq.where(CategoryReturn.custom_category_id == custom_category_id)
-            max_date_sq = max_date_sq.subquery()
-
-            stmt = (
-                select(
-                    CategoryReturn.date,
-                    CategoryReturn.custom_category_id,
-                    CustomCategory.name.label('category'),
-                    daily_col.label('daily_return'),
-                    acc_col.label('acc_return'),
-                    cagr_col.label('cagr'),
-                )
-                .join(CustomCategory, CustomCategory.id == CategoryReturn.custom_category_id)
-                .join(
-                    max_date_sq,
-                    (CategoryReturn.custom_category_id == max_date_sq.c.custom_category_id)
-                    & (CategoryReturn.date == max_date_sq.c.max_date),
-                )
-                .where(CategoryReturn.portfolio_id == portfolio_id)
-            )
-            result = await self.session.execute(stmt)
-            return result.mappings().all()
+        has_since = bool(since) and not most_recent
+        stmt = _category_returns_stmt(currency, most_recent, bool(custom_category_id), has_since)
+        params = {'portfolio_id': portfolio_id}
+        if custom_category_id:
+            params['custom_category_id'] = custom_category_id
+        if has_since:
+            params['since'] = since
 
-        stmt = (
-            select(
-                CategoryReturn.date,
-                CategoryReturn.custom_category_id,
-                CustomCategory.name.label('category'),
-                daily_col.label('daily_return'),
-                acc_col.label('acc_return'),
-                cagr_col.label('cagr'),
-            )
-            .join(CustomCategory, CustomCategory.id == CategoryReturn.custom_category_id)
-            .where(CategoryReturn.portfolio_id == portfolio_id)
-            .order_by(CategoryReturn.date)
+        result = await self.session.execute(stmt, params)
+        return result.mappings().all()
+
+    async def get_portfolio_returns_df(
+        self, portfolio_id: int, currency: str = 'BRL'
+    ) -> pd.DataFrame:
+        return await self.fetch_frame(
+            _portfolio_returns_stmt(currency), RETURNS_DTYPES, {'portfolio_id': portfolio_id}
+        )
+
+    async def get_category_returns_df(
+        self,
+        portfolio_id: int,
+        custom_category_id: int = None,
+        currency: str = 'BRL',
+    ) -> pd.DataFrame:
+        stmt = _category_returns_stmt(currency, False, bool(custom_category_id))
+        params = {'portfolio_id': portfolio_id}
+        if custom_category_id:
+            params['custom_category_id'] = custom_category_id
+
+        return await self.fetch_frame(stmt, CATEGORY_RETURNS_DTYPES, params)
+
+    async def get_last_portfolio_return_date(self, portfolio_id: int) -> Optional[date_type]:
+        result = await self.session.execute(
+            select(func.max(PortfolioReturn.date)).where(PortfolioReturn.portfolio_id == portfolio_id)
         )
+        return result.scalar()
+
+    async def get_last_category_return_date(
+        self, portfolio_id: int, custom_category_id: int = None
+    ) -> Optional[date_type]:
+        stmt = select(func.max(CategoryReturn.date)).where(CategoryReturn.portfolio_id == portfolio_id)
         if custom_category_id:
             stmt = stmt.where(CategoryReturn.custom_category_id == custom_category_id)
-
         result = await self.session.execute(stmt)
-        return result.mappings().all()
-
+        return result.scalar()
@@ -7,6 +7,7 @@ from typing import List
 
 from app.infra.db.models.portfolio import CustomCategory, CustomCategoryAssignment
 from app.infra.db.repositories.base_repository import SQLAlchemyRepository
+from app.modules.portfolio.cache import bump_portfolio_cache_version
 
 
 class PortfolioCategoryService:
@@ -14,7 +15,8 @@ class PortfolioCategoryService:
         self.session = session
         self.repo = SQLAlchemyRepository(session)
 
-    async def save_custom_categories(self, categories) -> None:
+    async def save_custom_categories(self, categories) -> set[int]:
+        """Creates or updates the categories; returns the ids of the portfolios they belong to."""
         for cat in categories:
             if cat.id is None:
                 await self.repo.create(CustomCategory, cat.model_dump())
@@ -22,10 +24,23 @@ class PortfolioCategoryService:
                 await self.repo.update(CustomCategory, cat.model_dump())
         await self.session.commit()
 
-    async def delete_custom_category(self, category_id: int) -> None:
+        # Category names and membership feed cached views and their ETags
+        portfolio_ids = {cat.portfolio_id for cat in categories}
+        for portfolio_id in portfolio_ids:
+            await bump_portfolio_cache_version(portfolio_id)
+        return portfolio_ids
+
+    async def delete_custom_category(self, category_id: int) -> int | None:
+        """Deletes the category; returns the id of its portfolio, None when it didn't exist."""
+        category = await self.repo.get(CustomCategory, category_id, first=True)
         await self.repo.delete(CustomCategory, id=category_id)
         await self.session.commit()
 
+        if category is None:
+            return None
+        await bump_portfolio_cache_version(category.portfolio_id)
+        return category.portfolio_id
+
     async def get_user_categories(self, portfolio_id: int):
         return await self.repo.get(CustomCategory, portfolio_id)
 
@@ -4,6 +4,7 @@ Portfolio consolidator service - handles position consolidation and recalculatio
 """
 
 import asyncio
+import time
 from datetime import datetime
 
 import numpy as np
@@ -29,6 +30,8 @@ from app.infra.db.models.portfolio import (
 from app.infra.db.session import AsyncSessionLocal
 from app.infra.integrations.market_data_provider import MarketDataProvider
 from app.modules.market_data.service.market_data_service import MarketDataService
+from app.modules.portfolio.cache import bump_portfolio_cache_version
+from app.modules.portfolio.consolidation_progress import ConsolidationProgress
 from app.modules.portfolio.domain.fixed_income import calculate_fixed_income_prices
 from app.modules.portfolio.repositories import PortfolioRepository
 from fastapi import HTTPException
@@ -49,7 +52,7 @@ class PortfolioConsolidatorService:
         self.repo = PortfolioRepository(session)
         self.market_data_service = MarketDataService(session)
 
-    async def consolidate_position_portfolio(self, portfolio_id):
+    async def consolidate_position_portfolio(self, portfolio_id, run_id: str = None):
         logger.info(f'Consolidando posições do portfolio {portfolio_id}')
         
         positions_df = await self.repo.get(
@@ -61,32 +64,54 @@ class PortfolioConsolidatorService:
             as_df=True,
         )
         if positions_df.empty:
-            await self.recalculate_all_positions_portfolio(portfolio_id)
+            await self.recalculate_all_positions_portfolio(portfolio_id, run_id)
             return
 
         recent_date = positions_df['date'].max() - pd.DateOffset(days=10)
         asset_ids = positions_df[positions_df['date'] >= recent_date]['asset_id'].unique().tolist()
-        
-        # Executa em paralelo com sessões independentes
+        await self._recalculate_assets(portfolio_id, asset_ids, run_id)
+
+    async def _recalculate_assets(self, portfolio_id: int, asset_ids: list[int], run_id: str = None):
+        """Recalcula os ativos em paralelo, com sessões independentes, publicando o progresso."""
+        progress = ConsolidationProgress(portfolio_id, run_id)
+        await progress.start(asset_ids)
         tasks = [
-            self._recalculate_position_asset_with_session(portfolio_id, asset_id)
+            self._recalculate_position_asset_with_session(portfolio_id, asset_id, progress)
             for asset_id in asset_ids
         ]
         await asyncio.gather(*tasks)
+        await progress.finish()
 
-    async def _recalculate_position_asset_with_session(self, portfolio_id: int, asset_id: int):
+    async def _recalculate_position_asset_with_session(
+        self, portfolio_id: int, asset_id: int, progress: ConsolidationProgress
+    ):
         """Recalcula posição de um ativo criando sua própria sessão de banco."""
+        started = time.perf_counter()
         async with AsyncSessionLocal() as session:
             try:
                 service = PortfolioConsolidatorService(session)
-                await service.recalculate_position_asset(portfolio_id, asset_id)
+                await service.recalculate_position_asset(portfolio_id, asset_id, progress)
             except Exception as e:
                 logger.error(f'Falha ao recalcular ativo {asset_id} do portfolio {portfolio_id}: {e}')
+                await progress.asset_finished(asset_id, started, error=str(e))
+
+    async def recalculate_position_asset(self, portfolio_id, asset_id, progress: ConsolidationProgress = None):
+        if progress is None:
+            # Recálculo avulso de um ativo: vira uma execução de um ativo só, que não
+            # sobrescreve o status de uma consolidação em andamento
+            progress = ConsolidationProgress(portfolio_id, yields_status=True)
+            await progress.start([asset_id])
+            await self._recalculate_position_asset(portfolio_id, asset_id, progress)
+            await progress.finish()
+            return
+        await self._recalculate_position_asset(portfolio_id, asset_id, progress)
 
-    async def recalculate_position_asset(self, portfolio_id, asset_id):
+    async def _recalculate_position_asset(self, portfolio_id, asset_id, progress: ConsolidationProgress):
+        started = time.perf_counter()
         try:
             asset = await self.repo.get(Asset, asset_id, first=True, relations=["treasury_bond", "fixed_income"]) #TODO: eu preciso fazer o select in load do trasury_bond. Mas aqui não faz mt sentido. Repensar.
             logger.info(f'Consolidando ativo: {asset.ticker}')
+            await progress.publish('asset_started', asset_id=asset_id, ticker=asset.ticker)
             transactions_df = await self._get_transactions(portfolio_id, asset_id)
             
             if transactions_df.empty:
@@ -94,6 +119,8 @@ class PortfolioConsolidatorService:
                     Position,
                     by={'asset_id': asset_id, 'portfolio_id': portfolio_id},
                 )
+                await bump_portfolio_cache_version(portfolio_id)
+                await progress.asset_finished(asset_id, started)
                 return
             events = await self.repo.get(Event, order_by='date asc', by={'asset_id': asset.id})
             if len(events) > 0:
@@ -102,6 +129,7 @@ class PortfolioConsolidatorService:
                     transactions_df.loc[mask, 'quantity'] *= event.factor
 
             prices_df = await self._get_prices(transactions_df, asset, portfolio_id)
+            await progress.publish('prices_fetched', asset_id=asset_id, rows=len(prices_df))
             
             start_date = transactions_df['date'].min()
             end_date = prices_df['date'].max()
@@ -134,6 +162,7 @@ class PortfolioConsolidatorService:
                         Position,
                         by={'asset_id': asset_id, 'portfolio_id': portfolio_id},
                     )
+                    await progress.asset_finished(asset_id, started)
                     return
                 position_df = position_df.loc[:last_nonzero.index[-1]].copy()
 
@@ -159,12 +188,15 @@ class PortfolioConsolidatorService:
             position_df['dividend_usd'] = position_df['dividend_usd'].fillna(0.0)
 
             self._calculate_returns(position_df)
+            await progress.publish('computed', asset_id=asset_id, rows=len(position_df))
             
             await self._persist_positions_db(position_df, transactions_df['date'].min(), asset, portfolio_id)
             logger.info(f'Sucesso ao consolidar ativo: {asset.ticker}')
+            await progress.asset_finished(asset_id, started, rows=len(position_df))
         except Exception as e:
             ticker = asset.ticker if 'asset' in dir() and asset else f'id={asset_id}'
             logger.error(f'Falha ao calcular posições para {ticker}: {e}')
+            await progress.asset_finished(asset_id, started, error=str(e))
 
     async def _get_transactions(self, portfolio_id, asset_id):
         trans_df = await self.repo.get_transactions_df(
@@ -288,8 +320,9 @@ class PortfolioConsolidatorService:
 
         await self.repo.upsert_bulk(Position, values, unique_columns=['portfolio_id', 'asset_id', 'date'])
         await self.session.commit()
+        await bump_portfolio_cache_version(portfolio_id)
 
-    async def recalculate_all_positions_portfolio(self, portfolio_id):
+    async def recalculate_all_positions_portfolio(self, portfolio_id, run_id: str = None):
         transactions_df = await self.repo.get(
             Transaction, by={'portfolio_id': portfolio_id}, as_df=True
         )
@@ -301,13 +334,7 @@ class PortfolioConsolidatorService:
             )
 
         asset_ids = transactions_df['asset_id'].unique().tolist()
-        
-        # Executa em paralelo com sessões independentes
-        tasks = [
-            self._recalculate_position_asset_with_session(portfolio_id, asset_id)
-            for asset_id in asset_ids
-        ]
-        await asyncio.gather(*tasks)
+        await self._recalculate_assets(portfolio_id, asset_ids, run_id)
 
     @staticmethod
     def _is_fixed_income(asset):
@@ -489,6 +516,7 @@ class PortfolioConsolidatorService:
                 }
             )
         await self.session.commit()
+        await bump_portfolio_cache_version(portfolio_id)
         logger.info(f"Dividendos de {row['ticker']} na data {row['date']} consolidados com sucesso")
 
         logger.info(f"Dividendos de {row['ticker']} na data {row['date']} consolidados com sucesso")
@@ -0,0 +1,90 @@
+# app/modules/portfolio/service/portfolio_dashboard_service.py
+"""
+Portfolio dashboard service - computes several portfolio views in one request.
+"""
+
+import asyncio
+
+import orjson
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.modules.portfolio.api.dashboard.schema import DashboardView
+from app.modules.portfolio.api.dividend.schema import Dividend, DividendFilters
+from app.modules.portfolio.service.portfolio_dividend_service import (
+    PortfolioDividendService,
+)
+from app.modules.portfolio.service.portfolio_position_service import (
+    PortfolioPositionService,
+)
+from app.utils.memo import AsyncMemo
+from app.utils.timeseries import downsample_records
+
+
+class PortfolioDashboardService:
+    """
+    Views run concurrently, each on its own read session (a session can't be
+    shared between concurrent queries), at most DASHBOARD_CONCURRENCY at a time.
+    Intermediates used by several views are computed once through an AsyncMemo.
+    A failing view doesn't fail the others: its entry carries the error instead.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.memo = AsyncMemo()
+        self.semaphore = asyncio.Semaphore(settings.DASHBOARD_CONCURRENCY)
+
+    async def get_dashboard(self, portfolio_id: int, views: list[DashboardView]) -> dict:
+        results = await asyncio.gather(*(self._run_view(portfolio_id, view) for view in views))
+        return {view.result_key: result for view, result in zip(views, results, strict=True)}
+
+    async def _run_view(self, portfolio_id: int, view: DashboardView) -> dict:
+        try:
+            async with self.semaphore, self.session_factory() as session:
+                data = await self._compute_view(session, portfolio_id, view)
+        except HTTPException as e:
+            return {'status': e.status_code, 'detail': e.detail}
+        except Exception:
+            logger.exception(f'Dashboard view {view.result_key} of portfolio {portfolio_id} failed')
+            return {'status': 500, 'detail': 'Internal Server Error'}
+
+        if isinstance(data, Response):
+            # Already rendered JSON, embedded as is
+            data = orjson.Fragment(data.body)
+        else:
+            data = jsonable_encoder(data)
+        return {'status': 200, 'data': data}
+
+    async def _compute_view(self, session, portfolio_id: int, view: DashboardView):
+        if view.view == 'dividends':
+            filters = DividendFilters(start_date=view.filters.start_date, end_date=view.filters.end_date)
+            dividends = await PortfolioDividendService(session).get_dividends(
+                portfolio_id, filters, currency=view.currency
+            )
+            return [Dividend.model_validate(dividend).model_dump() for dividend in dividends]
+
+        service = PortfolioPositionService(session, memo=self.memo)
+        if view.view == 'position':
+            return await service.get_portfolio_position(
+                portfolio_id, group_by_broker=view.group_by_broker, currency=view.currency
+            )
+        if view.view == 'returns':
+            returns = await service.get_portfolio_returns(portfolio_id, view.currency)
+            return downsample_records(returns, view.filters, value_key='acc_return')
+        if view.view == 'category_returns':
+            returns = await service.get_category_returns(
+                portfolio_id, view.category_id, view.most_recent, view.currency
+            )
+            if view.most_recent:
+                return returns
+            return downsample_records(returns, view.filters, value_key='acc_return', group_key='custom_category_id')
+        if view.view == 'patrimony_evolution':
+            evolution = await service.get_patrimony_evolution(portfolio_id, currency=view.currency)
+            return downsample_records(evolution, view.filters, value_key='portfolio')
+        if view.view == 'analysis':
+            return await service.get_portfolio_stats(portfolio_id, currency=view.currency)
+        if view.view == 'category_analysis':
+            return await service.get_category_stats(portfolio_id, view.category_id, currency=view.currency)
+        raise HTTPException(status_code=400, detail=f'Unknown view {view.view}')
@@ -8,6 +8,7 @@ from app.infra.db.models.constants.currency import CURRENCY
 from app.infra.db.models.portfolio import Broker, Dividend, Transaction
 from app.modules.market_data.service.market_data_service import MarketDataService
 from app.modules.portfolio.api.dividend.schema import DividendFilters
+from app.modules.portfolio.cache import bump_portfolio_cache_version
 from app.modules.portfolio.repositories import PortfolioRepository
 from sqlalchemy import select
 
@@ -66,6 +67,7 @@ class PortfolioDividendService:
         data = await self._fill_dual_currency(data, data['portfolio_id'], data['asset_id'])
         dividend = await self.repo.create(Dividend, data)
         await self.session.commit()
+        await bump_portfolio_cache_version(data['portfolio_id'])
         return dividend
 
     async def update_dividend(self, dividend_data):
@@ -83,6 +85,7 @@ class PortfolioDividendService:
         updated_dividend = await self.repo.update(Dividend, update_data)
         
         await self.session.commit()
+        await bump_portfolio_cache_version(existing_dividend.portfolio_id)
         return updated_dividend
 
     async def delete_dividend(self, dividend_id: int):
@@ -92,4 +95,5 @@ class PortfolioDividendService:
 
         deleted = await self.repo.delete(Dividend, dividend_id)
         await self.session.commit()
+        await bump_portfolio_cache_version(existing_dividend.portfolio_id)
         return deleted
\ No newline at end of file
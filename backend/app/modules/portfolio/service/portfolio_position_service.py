@@ -15,6 +15,7 @@ from app.infra.redis.decorators import cached
 from app.infra.redis.redis_service import RedisService
 from app.modules.asset.api.schemas import AssetDetailsOut, AssetDetailsWithPosition
 from app.modules.market_data.service.market_data_service import MarketDataService
+from app.modules.portfolio.cache import PORTFOLIO_CACHE_TAG
 from app.modules.portfolio.domain.asset_analysis import calculate_returns_analysis
 from app.modules.portfolio.domain.returns import (
     calculate_asset_acc_returns,
@@ -23,16 +24,39 @@ from app.modules.portfolio.domain.returns import (
 )
 from app.modules.portfolio.repositories import PortfolioRepository
 from app.utils.df import df_to_dict_list, df_to_named_dict
-from app.utils.response import df_response
+from app.utils.memo import AsyncMemo
+from app.utils.response import SeriesFormat, df_response
+from app.utils.timeseries import TimeSeriesFilters, downsample_df
 from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
 
 
 class PortfolioPositionService:
-    def __init__(self, session):
+    def __init__(self, session, memo: AsyncMemo = None):
         self.session = session
         self.repo = PortfolioRepository(session)
         self.market_data_service = MarketDataService(session)
         self.cache = RedisService()
+        # Shares intermediates (returns rows, position frame, CDI history) with
+        # the other services of a batch request
+        self.memo = memo
+
+    async def _shared(self, key, factory):
+        if self.memo is None:
+            return await factory()
+        return await self.memo.get(key, factory)
+
+    async def _get_index_history(self, start_date, index_id: int) -> pd.Series:
+        return await self._shared(
+            ('index_history', index_id, start_date),
+            lambda: self.market_data_service.get_index_history(start_date, index_id),
+        )
+
+    async def _get_portfolio_returns_rows(self, portfolio_id: int, currency: str):
+        return await self._shared(
+            ('portfolio_returns', portfolio_id, currency),
+            lambda: self.repo.get_portfolio_returns(portfolio_id, currency),
+        )
 
     async def get_asset_details(self, portfolio_id: int, asset_id: int = None, currency: str = 'BRL') -> dict:
         asset = await self.repo.get_asset_details(asset_id)
@@ -82,7 +106,7 @@ class PortfolioPositionService:
         start_date = grouped['date'].min()
             
         benchmarks = {}
-        cdi_history = await self.market_data_service.get_index_history(start_date, INDEX.CDI)
+        cdi_history = await self._get_index_history(start_date, INDEX.CDI)
         benchmarks['CDI'] = cdi_history
     
         result = calculate_returns_analysis(portfolio_returns, benchmarks)
@@ -105,14 +129,12 @@ class PortfolioPositionService:
             
         benchmarks = {}
 
-        cdi_history = await self.market_data_service.get_index_history(start_date, INDEX.CDI)
+        cdi_history = await self._get_index_history(start_date, INDEX.CDI)
         benchmarks['CDI'] = cdi_history
 
         category = await self.repo.get_asset_category(portfolio_id, asset_id)
         if category.benchmark_id != INDEX.CDI:
-            benchmark_history = await self.market_data_service.get_index_history(
-                start_date, category.benchmark_id
-            )
+            benchmark_history = await self._get_index_history(start_date, category.benchmark_id)
             benchmarks[category.benchmark.short_name] = benchmark_history
         
 
@@ -122,7 +144,9 @@ class PortfolioPositionService:
 
 
     async def get_aported_history(self, portfolio_id: int, currency: str = 'BRL'):
-        transactions_df = await self.repo.get_transactions_df(portfolio_id)
+        transactions_df = await self._shared(
+            ('transactions', portfolio_id), lambda: self.repo.get_transactions_df(portfolio_id)
+        )
         usd_brl_df = await self.market_data_service.get_usd_brl_history(transactions_df['date'].min())
         transactions_df = transactions_df.merge(usd_brl_df[['date', 'usdbrl']], on='date', how='left')
         if currency == 'USD':
@@ -137,7 +161,7 @@ class PortfolioPositionService:
         total_aported.rename(columns={'amount': 'aported'}, inplace=True)
         return total_aported
 
-    @cached(key_prefix="patrimony_evolution", cache=lambda self: self.cache, ttl=3600)
+    @cached(key_prefix="patrimony_evolution", cache=lambda self: self.cache, ttl=3600, version_tag=PORTFOLIO_CACHE_TAG)
     async def get_patrimony_evolution(
         self, 
         portfolio_id: int,
@@ -157,11 +181,14 @@ class PortfolioPositionService:
         asset_type_ids: list = None,
         currency: str = 'BRL',
     ) -> pd.DataFrame:
-        portfolio_position_df = await self.repo.get_portfolio_position_df(
-            portfolio_id, 
-            asset_id=asset_id, 
-            asset_type_id=asset_type_id, 
-            asset_type_ids=asset_type_ids,
+        portfolio_position_df = await self._shared(
+            ('portfolio_position', portfolio_id, asset_id, asset_type_id, tuple(asset_type_ids or ())),
+            lambda: self.repo.get_portfolio_position_df(
+                portfolio_id,
+                asset_id=asset_id,
+                asset_type_id=asset_type_id,
+                asset_type_ids=asset_type_ids,
+            ),
         )
 
         if portfolio_position_df.empty:
@@ -192,11 +219,40 @@ class PortfolioPositionService:
         
         return df_to_dict_list(result)
 
+    @cached(key_prefix="portfolio_returns", cache=lambda self: self.cache, ttl=3600, version_tag=PORTFOLIO_CACHE_TAG)
     async def get_portfolio_returns(self, portfolio_id: int, currency: str = 'BRL'):
-        return await self.repo.get_portfolio_returns(portfolio_id, currency) or None
+        rows = await self._get_portfolio_returns_rows(portfolio_id, currency)
+        return jsonable_encoder([dict(row) for row in rows]) or None
+
+    async def get_portfolio_returns_since(self, portfolio_id: int, since: datetime.date, currency: str = 'BRL'):
+        """Returns dated after `since`, straight from the database (tail of the cached series)."""
+        rows = await self.repo.get_portfolio_returns(portfolio_id, currency, since=since)
+        return jsonable_encoder([dict(row) for row in rows])
 
-    async def get_category_returns(self, portfolio_id: int, custom_category_id: int = None, most_recent: bool = False, currency: str = 'BRL'):
-        return await self.repo.get_category_returns(portfolio_id, custom_category_id, most_recent, currency) or None
+    async def get_last_returns_date(self, portfolio_id: int, custom_category_id: int = None, by_category: bool = False):
+        if by_category:
+            return await self.repo.get_last_category_return_date(portfolio_id, custom_category_id)
+        return await self.repo.get_last_portfolio_return_date(portfolio_id)
+
+    async def get_category_returns(
+        self,
+        portfolio_id: int,
+        custom_category_id: int = None,
+        most_recent: bool = False,
+        currency: str = 'BRL',
+        since: datetime.date = None,
+    ):
+        if most_recent or since:
+            return await self.repo.get_category_returns(
+                portfolio_id, custom_category_id, most_recent, currency, since=since
+            ) or None
+        return await self._get_category_returns_rows(portfolio_id, custom_category_id, currency) or None
+
+    async def _get_category_returns_rows(self, portfolio_id: int, custom_category_id: int, currency: str):
+        return await self._shared(
+            ('category_returns', portfolio_id, custom_category_id, currency),
+            lambda: self.repo.get_category_returns(portfolio_id, custom_category_id, currency=currency),
+        )
 
     async def get_asset_acc_returns(
         self,
@@ -260,27 +316,35 @@ class PortfolioPositionService:
         return df_response(pos_df)
 
     async def get_portfolio_position_history(
-        self, portfolio_id: int, asset_id: int = None, currency: str = 'BRL'
+        self,
+        portfolio_id: int,
+        asset_id: int = None,
+        currency: str = 'BRL',
+        series_format: SeriesFormat = None,
+        filters: TimeSeriesFilters = None,
     ) -> pd.DataFrame:
-        pos_df = await self.repo.get_portfolio_position_df(portfolio_id, asset_id=asset_id)
-
-        if pos_df.empty:
-            return []
-
-        price_col = 'price_usd' if currency == 'USD' else 'price'
-        avg_price_col = 'average_price_usd' if currency == 'USD' else 'average_price'
-        pos_df['price'] = pos_df[price_col]
-        pos_df['average_price'] = pos_df[avg_price_col]
-        pos_df['value'] = pos_df['quantity'] * pos_df['price']
+        filters = filters or TimeSeriesFilters()
+        pos_df = await self.repo.get_portfolio_position_df(
+            portfolio_id,
+            start_date=filters.start_date,
+            end_date=filters.end_date,
+            asset_id=asset_id,
+        )
 
-        return df_response(pos_df)
+        if not pos_df.empty:
+            price_col = 'price_usd' if currency == 'USD' else 'price'
+            avg_price_col = 'average_price_usd' if currency == 'USD' else 'average_price'
+            pos_df['price'] = pos_df[price_col]
+            pos_df['average_price'] = pos_df[avg_price_col]
+            pos_df['value'] = pos_df['quantity'] * pos_df['price']
+            pos_df = downsample_df(pos_df, filters, value_column='value', group_column='asset_id')
 
-    async def get_consolidated_portfolio_returns(self, portfolio_id: int):
-        """Used by the cache task to pre-compute and store in Redis."""
-        return await self.repo.get_portfolio_returns(portfolio_id) or None
+        # One row per asset and day: columnar splits the series by asset
+        return df_response(pos_df, series_format, key_column='asset_id', attribute_columns=['ticker', 'category'])
 
+    @cached(key_prefix="portfolio_stats", cache=lambda self: self.cache, ttl=3600, version_tag=PORTFOLIO_CACHE_TAG)
     async def get_portfolio_stats(self, portfolio_id: int, currency: str = 'BRL') -> dict:
-        rows = await self.repo.get_portfolio_returns(portfolio_id, currency)
+        rows = await self._get_portfolio_returns_rows(portfolio_id, currency)
         if not rows:
             return None
 
@@ -290,14 +354,15 @@ class PortfolioPositionService:
         start_date = df['date'].min()
 
         benchmarks = {}
-        cdi_history = await self.market_data_service.get_index_history(start_date, INDEX.CDI)
+        cdi_history = await self._get_index_history(start_date, INDEX.CDI)
         benchmarks['CDI'] = cdi_history
 
         result = calculate_returns_analysis(returns_series, benchmarks)
-        return result
+        return jsonable_encoder(result)
 
+    @cached(key_prefix="category_stats", cache=lambda self: self.cache, ttl=3600, version_tag=PORTFOLIO_CACHE_TAG)
     async def get_category_stats(self, portfolio_id: int, custom_category_id: int, currency: str = 'BRL') -> dict:
-        rows = await self.repo.get_category_returns(portfolio_id, custom_category_id, currency=currency)
+        rows = await self._get_category_returns_rows(portfolio_id, custom_category_id, currency)
         if not rows:
             return None
 
@@ -307,15 +372,13 @@ class PortfolioPositionService:
         start_date = df['date'].min()
 
         benchmarks = {}
-        cdi_history = await self.market_data_service.get_index_history(start_date, INDEX.CDI)
+        cdi_history = await self._get_index_history(start_date, INDEX.CDI)
         benchmarks['CDI'] = cdi_history
 
         category = await self.repo.get_asset_category_by_id(custom_category_id)
         if category and category.benchmark_id and category.benchmark_id != INDEX.CDI:
-            benchmark_history = await self.market_data_service.get_index_history(
-                start_date, category.benchmark_id
-            )
+            benchmark_history = await self._get_index_history(start_date, category.benchmark_id)
             benchmarks[category.benchmark.short_name] = benchmark_history
 
         result = calculate_returns_analysis(returns_series, benchmarks)
-        return result
\ No newline at end of file
+        return jsonable_encoder(result)
\ No newline at end of file
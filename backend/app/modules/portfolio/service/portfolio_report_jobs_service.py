@@ -0,0 +1,199 @@
+# app/modules/portfolio/service/portfolio_report_jobs_service.py
+"""
+Portfolio report jobs - reports built by the worker and downloaded when ready.
+"""
+
+import hashlib
+import json
+import time
+from typing import AsyncIterator
+
+import pandas as pd
+from fastapi import HTTPException, status
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.entrypoints.worker.task_runner import run_task
+from app.infra.artifacts import get_artifact_store
+from app.infra.redis.redis_service import RedisService
+from app.modules.portfolio.cache import get_portfolio_cache_version
+from app.modules.portfolio.domain.portfolio_reports import (
+    ReportJobState,
+    StatementFormat,
+    StatementScope,
+)
+from app.modules.portfolio.repositories import PortfolioRepository
+from app.modules.portfolio.service.portfolio_reports_service import (
+    PortfolioReportsService,
+)
+from app.modules.portfolio.tasks.build_report import build_performance_statement
+from app.utils.response import CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE
+from app.utils.spreadsheet import iter_csv, iter_xlsx
+
+PERFORMANCE_STATEMENT = 'performance_statement'
+MEDIA_TYPES = {
+    StatementFormat.XLSX: XLSX_MEDIA_TYPE,
+    StatementFormat.CSV: CSV_MEDIA_TYPE,
+}
+# Window in which a second identical request waits for the first one to enqueue
+ENQUEUE_LOCK_SECONDS = 10
+
+
+def _job_key(job_id: str) -> str:
+    return f'report_job:{job_id}'
+
+
+class PortfolioReportJobsService:
+    """
+    A job is identified by its report, parameters and the portfolio's cache
+    version, so requesting the same report again before the portfolio changes
+    returns the existing job (and its artifact) instead of building a new one.
+    Job state lives in Redis and the built file in the artifact store, both for
+    REPORT_ARTIFACT_TTL_SECONDS. A running job saves its progress after every
+    chunk; a queued job no worker took, or a running one that stopped updating,
+    for REPORT_JOB_STALE_SECONDS counts as failed, so it can be requested (and
+    built) again. A job that couldn't be enqueued fails right away.
+    """
+
+    def __init__(self):
+        self.redis = RedisService()
+        self.store = get_artifact_store()
+
+    async def request_performance_statement(
+        self,
+        portfolio_id: int,
+        scope: StatementScope = StatementScope.PORTFOLIO,
+        asset_ids: list[int] | None = None,
+        statement_format: StatementFormat = StatementFormat.XLSX,
+    ) -> dict:
+        asset_ids = PortfolioReportsService.statement_asset_ids(scope, asset_ids)
+        version, _ = await get_portfolio_cache_version(portfolio_id)
+        params = {
+            'portfolio_id': portfolio_id,
+            'asset_ids': sorted(asset_ids) if asset_ids else None,
+            'statement_format': statement_format.value,
+        }
+        job_id = hashlib.sha256(
+            json.dumps([PERFORMANCE_STATEMENT, params, version], sort_keys=True).encode()
+        ).hexdigest()[:32]
+
+        job = await self.redis.get_json(_job_key(job_id))
+        if job and job['state'] != ReportJobState.FAILED and not self._is_stale(job):
+            return job
+
+        lock_token = await self.redis.acquire_lock(_job_key(job_id), ENQUEUE_LOCK_SECONDS)
+        if lock_token is None:
+            # An identical request is enqueueing it right now
+            return await self.redis.get_json(_job_key(job_id)) or self._new_job(job_id, params, statement_format)
+
+        try:
+            job = self._new_job(job_id, params, statement_format)
+            await self._save(job)
+            try:
+                run_task(build_performance_statement, job_id)
+            except Exception as e:
+                logger.exception(f'Report job {job_id} could not be enqueued')
+                job.update(state=ReportJobState.FAILED.value, error=str(e), finished_at=time.time())
+                await self._save(job)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Report queue unavailable'
+                ) from e
+        finally:
+            await self.redis.release_lock(_job_key(job_id), lock_token)
+        return job
+
+    @staticmethod
+    def _new_job(job_id: str, params: dict, statement_format: StatementFormat) -> dict:
+        return {
+            'job_id': job_id,
+            'state': ReportJobState.QUEUED.value,
+            'report': PERFORMANCE_STATEMENT,
+            'params': params,
+            'filename': f'{PERFORMANCE_STATEMENT}.{statement_format.value}',
+            'media_type': MEDIA_TYPES[statement_format],
+            'rows_written': 0,
+            'total_rows': None,
+            'progress': None,
+            'size': None,
+            'error': None,
+            'created_at': time.time(),
+            'updated_at': time.time(),
+            'finished_at': None,
+        }
+
+    @staticmethod
+    def _is_stale(job: dict) -> bool:
+        return (
+            job['state'] in (ReportJobState.QUEUED, ReportJobState.RUNNING)
+            and time.time() - job.get('updated_at', job['created_at']) > settings.REPORT_JOB_STALE_SECONDS
+        )
+
+    async def _save(self, job: dict) -> None:
+        job['updated_at'] = time.time()
+        await self.redis.set_json(_job_key(job['job_id']), job, expire_seconds=settings.REPORT_ARTIFACT_TTL_SECONDS)
+
+    async def get_job(self, portfolio_id: int, job_id: str) -> dict:
+        job = await self.redis.get_json(_job_key(job_id))
+        if not job or job['params']['portfolio_id'] != portfolio_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Report job not found')
+        if self._is_stale(job):
+            error = (
+                'No report worker took the job' if job['state'] == ReportJobState.QUEUED
+                else 'The report worker stopped responding'
+            )
+            job.update(state=ReportJobState.FAILED.value, error=error)
+        return job
+
+    async def get_artifact(self, portfolio_id: int, job_id: str) -> tuple[dict, AsyncIterator[bytes]]:
+        job = await self.get_job(portfolio_id, job_id)
+        if job['state'] != ReportJobState.DONE:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Report job is {job['state']}")
+        if not await self.store.size(job_id):
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail='Report file expired')
+        return job, self.store.read(job_id)
+
+    async def build_performance_statement(self, session, job_id: str) -> None:
+        """Runs in the worker: writes the statement to the artifact store, updating the job's progress per chunk."""
+        job = await self.redis.get_json(_job_key(job_id))
+        if not job or job['state'] == ReportJobState.DONE:
+            return
+        if job['state'] == ReportJobState.RUNNING and not self._is_stale(job):
+            # Another worker is building it
+            return
+
+        params = job['params']
+        job.update(state=ReportJobState.RUNNING.value, rows_written=0, progress=None, error=None)
+        await self._save(job)
+
+        try:
+            repo = PortfolioRepository(session)
+            job['total_rows'] = await repo.count_complete_portfolio_position_history(
+                params['portfolio_id'], params['asset_ids']
+            )
+            await self._save(job)
+
+            async def chunks_with_progress() -> AsyncIterator[pd.DataFrame]:
+                async for chunk in repo.stream_complete_portfolio_position_history_df(
+                    portfolio_id=params['portfolio_id'],
+                    asset_ids=params['asset_ids'],
+                ):
+                    yield chunk
+                    job['rows_written'] += len(chunk)
+                    if job['total_rows']:
+                        job['progress'] = min(job['rows_written'] / job['total_rows'], 1.0)
+                    await self._save(job)
+
+            if params['statement_format'] == StatementFormat.CSV:
+                encoded = iter_csv(chunks_with_progress())
+            else:
+                encoded = iter_xlsx(chunks_with_progress(), sheet_name='Performance Statement')
+
+            async with self.store.writer(job_id) as writer:
+                async for data in encoded:
+                    await writer.write(data)
+
+            job.update(state=ReportJobState.DONE.value, progress=1.0, size=writer.size, finished_at=time.time())
+        except Exception as e:
+            logger.exception(f'Report job {job_id} failed')
+            job.update(state=ReportJobState.FAILED.value, error=str(e), finished_at=time.time())
+        await self._save(job)
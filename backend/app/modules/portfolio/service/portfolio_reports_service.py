@@ -1,12 +1,31 @@
-from app.modules.portfolio.domain.portfolio_reports import StatementScope
-from app.modules.portfolio.repositories.portfolio_repository import PortfolioRepository
-from app.utils.response import df_to_xlsx_response
+from typing import AsyncIterator
+
+import pandas as pd
+
+from app.modules.portfolio.domain.portfolio_reports import (
+    ExportFormat,
+    StatementFormat,
+    StatementScope,
+)
+from app.modules.portfolio.repositories.portfolio_repository import (
+    CATEGORY_RETURNS_DTYPES,
+    COMPLETE_POSITION_HISTORY_DTYPES,
+    RETURNS_DTYPES,
+    PortfolioRepository,
+)
+from app.utils.response import (
+    df_chunks_to_arrow_response,
+    df_chunks_to_csv_response,
+    df_chunks_to_xlsx_response,
+)
 
 
 class PortfolioReportsService:
-    def __init__(self, session):
+    def __init__(self, session=None, session_factory=None):
         self.session = session
         self.repo: PortfolioRepository = PortfolioRepository(session)
+        # Streamed reports read after the endpoint returned, on their own session
+        self.session_factory = session_factory
 
     async def generate_performance_statement(
         self,
@@ -15,27 +34,96 @@ class PortfolioReportsService:
         asset_ids: list[int] | None = None,
         asset_tickers: list[str] | None = None,
         category_ids: list[int] | None = None,
+        statement_format: StatementFormat = StatementFormat.XLSX,
     ):
+        asset_ids = self.statement_asset_ids(scope, asset_ids, asset_tickers, category_ids)
+        position_history_chunks = self._stream_position_history(portfolio_id, asset_ids)
+        if statement_format == StatementFormat.CSV:
+            return df_chunks_to_csv_response(
+                position_history_chunks,
+                filename='performance_statement.csv',
+            )
+        return df_chunks_to_xlsx_response(
+            position_history_chunks,
+            filename='performance_statement.xlsx',
+            sheet_name='Performance Statement'
+        )
+
+    @staticmethod
+    def statement_asset_ids(
+        scope: StatementScope,
+        asset_ids: list[int] | None = None,
+        asset_tickers: list[str] | None = None,
+        category_ids: list[int] | None = None,
+    ) -> list[int] | None:
+        """Validates the statement's scope and returns the assets it covers, None for all."""
         if scope == StatementScope.PORTFOLIO:
-            asset_ids = None
-            category_ids = None
+            return None
 
-        elif scope == StatementScope.ASSET and not (asset_ids or asset_tickers):
+        if scope == StatementScope.ASSET and not (asset_ids or asset_tickers):
             raise ValueError(
                 f'asset_ids or asset_tickers is required when scope={StatementScope.ASSET}'
             )
 
-        elif scope == StatementScope.CATEGORY and not category_ids:
+        if scope == StatementScope.CATEGORY and not category_ids:
             raise ValueError(
                 f'category_ids is required when scope={StatementScope.CATEGORY}'
             )
-            
-        position_history_df = await self.repo.get_complete_portfolio_position_history_df(
-            portfolio_id=portfolio_id,
-            asset_ids=asset_ids
+        return asset_ids
+
+    async def _stream_position_history(
+        self,
+        portfolio_id: int,
+        asset_ids: list[int] | None = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        # Opened only when the response starts reading, and kept open until it ends
+        async with self.session_factory() as session:
+            repo = PortfolioRepository(session)
+            async for chunk in repo.stream_complete_portfolio_position_history_df(
+                portfolio_id=portfolio_id,
+                asset_ids=asset_ids,
+            ):
+                yield chunk
+
+    async def export_position_history(
+        self,
+        portfolio_id: int,
+        export_format: ExportFormat,
+        asset_ids: list[int] | None = None,
+    ):
+        position_history_chunks = self._stream_position_history(portfolio_id, asset_ids)
+        return df_chunks_to_arrow_response(
+            position_history_chunks,
+            COMPLETE_POSITION_HISTORY_DTYPES,
+            filename=f'position_history.{export_format.value}',
+            file_format=export_format.value,
         )
-        return df_to_xlsx_response(
-            position_history_df, 
-            filename=f'performance_statement.xlsx',
-            sheet_name='Performance Statement'
+
+    async def export_portfolio_returns(
+        self,
+        portfolio_id: int,
+        export_format: ExportFormat,
+        currency: str = 'BRL',
+    ):
+        returns_df = await self.repo.get_portfolio_returns_df(portfolio_id, currency)
+        return df_chunks_to_arrow_response(
+            returns_df,
+            RETURNS_DTYPES,
+            filename=f'returns.{export_format.value}',
+            file_format=export_format.value,
+        )
+
+    async def export_category_returns(
+        self,
+        portfolio_id: int,
+        export_format: ExportFormat,
+        category_id: int | None = None,
+        currency: str = 'BRL',
+    ):
+        returns_df = await self.repo.get_category_returns_df(portfolio_id, category_id, currency)
+        return df_chunks_to_arrow_response(
+            returns_df,
+            CATEGORY_RETURNS_DTYPES,
+            filename=f'category_returns.{export_format.value}',
+            file_format=export_format.value,
         )
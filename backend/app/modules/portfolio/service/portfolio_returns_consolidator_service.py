@@ -12,6 +12,7 @@ from app.infra.db.models.portfolio import (
     CustomCategoryAssignment,
     PortfolioReturn,
 )
+from app.modules.portfolio.cache import bump_portfolio_cache_version
 from app.modules.portfolio.domain.returns import (
     calculate_category_acc_return,
     calculate_portfolio_acc_return,
@@ -40,6 +41,7 @@ class PortfolioReturnsConsolidatorService:
         await self._consolidate_category_returns(pos_df, portfolio_id)
 
         await self.session.commit()
+        await bump_portfolio_cache_version(portfolio_id)
         logger.info(f"Retornos consolidados com sucesso para portfolio {portfolio_id}")
 
     async def consolidate_category_returns(self, portfolio_id: int):
@@ -55,6 +57,7 @@ class PortfolioReturnsConsolidatorService:
         await self._consolidate_category_returns(pos_df, portfolio_id)
 
         await self.session.commit()
+        await bump_portfolio_cache_version(portfolio_id)
         logger.info(f"Retornos das categorias consolidados para portfolio {portfolio_id}")
 
     async def _consolidate_portfolio_returns(self, pos_df: pd.DataFrame, portfolio_id: int):
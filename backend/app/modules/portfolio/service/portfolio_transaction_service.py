@@ -3,10 +3,14 @@
 Portfolio transaction service - handles transaction CRUD and calculations.
 """
 
+import base64
+import binascii
+from datetime import datetime
 from typing import List
 
 import numpy as np
 import pandas as pd
+from fastapi import HTTPException
 
 from app.domain.finance import trade
 from app.entrypoints.worker.task_runner import run_task
@@ -18,6 +22,7 @@ from app.modules.portfolio.tasks.recalculate_asset_position import (
     recalculate_position_asset,
 )
 from app.utils.response import df_response
+from app.utils.serialize import df_to_records
 
 
 class PortfolioTransactionService:
@@ -57,6 +62,55 @@ class PortfolioTransactionService:
         transactions_df.sort_values(by=['date'], inplace=True)
         return df_response(transactions_df)
 
+    async def get_transactions_page(self, portfolio_id: int, filters) -> dict:
+        """
+        A page of transactions, newest first, and the cursor of the next one.
+        Average price and realized profit come from the consolidated positions
+        (see `get_transactions_page_df`) instead of replaying the whole history.
+        """
+        after = self._decode_cursor(filters.cursor) if filters.cursor else None
+        page_df = await self.repo.get_transactions_page_df(portfolio_id, filters, after)
+
+        next_cursor = None
+        if len(page_df) > filters.limit:
+            page_df = page_df.iloc[:filters.limit]
+            last = page_df.iloc[-1]
+            next_cursor = self._encode_cursor(last['date'], last['id'])
+
+        is_usd = page_df['currency_id'] == CURRENCY.USD
+        page_df['price'] = np.where(
+            is_usd, page_df['original_price'] * page_df['usdbrl'], page_df['original_price']
+        )
+        page_df['type'] = np.where(page_df['quantity'] > 0, 'Compra', 'Venda')
+        page_df['value'] = page_df['quantity'] * page_df['price']
+        page_df['realized_profit'] = np.where(
+            page_df['type'] == 'Venda',
+            -page_df['quantity'] * (page_df['price'] - page_df['average_price']),
+            0.0,
+        )
+        page_df['position'] = page_df['acc_quantity'] * page_df['price']
+        page_df['profit_pct'] = np.where(
+            page_df['type'] == 'Venda',
+            (page_df['realized_profit'] / abs(page_df['value'])) * 100,
+            np.nan,
+        )
+        page_df['portfolio_id'] = portfolio_id
+        return {'items': df_to_records(page_df), 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _encode_cursor(date, transaction_id) -> str:
+        raw = f'{pd.Timestamp(date).isoformat()}|{int(transaction_id)}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            date, transaction_id = raw.split('|')
+            return datetime.fromisoformat(date), int(transaction_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise HTTPException(status_code=400, detail='Invalid cursor') from None
+
     async def _normalize_to_brl(self, transactions_df):
         usdbrl_df = await self.market_data_service.get_usd_brl_history()
         transactions_df = transactions_df.merge(usdbrl_df, on='date', how='left')
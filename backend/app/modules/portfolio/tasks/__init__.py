@@ -4,6 +4,7 @@ Portfolio Celery tasks.
 Tasks are auto-discovered by importing this module.
 """
 
+from app.modules.portfolio.tasks.build_report import build_performance_statement
 from app.modules.portfolio.tasks.consolidate_all_portfolios import (
     consolidate_all_portfolios,
 )
@@ -16,18 +17,17 @@ from app.modules.portfolio.tasks.consolidate_single_portfolio import (
 from app.modules.portfolio.tasks.recalculate_asset_position import (
     recalculate_position_asset,
 )
-from app.modules.portfolio.tasks.set_patrimony_evolution_cache import (
-    set_patrimony_evolution_cache,
-)
-from app.modules.portfolio.tasks.set_portfolio_returns_cache import (
-    set_portfolio_returns_cache,
+from app.modules.portfolio.tasks.recalculate_all_positions import (
+    recalculate_all_positions,
 )
+from app.modules.portfolio.tasks.warm_portfolio_cache import warm_portfolio_cache
 
 __all__ = [
+    'build_performance_statement',
     'consolidate_all_portfolios',
     'consolidate_fiis_dividends',
     'consolidate_single_portfolio',
+    'recalculate_all_positions',
     'recalculate_position_asset',
-    'set_patrimony_evolution_cache',
-    'set_portfolio_returns_cache',
+    'warm_portfolio_cache',
 ]
@@ -0,0 +1,19 @@
+# app/modules/portfolio/tasks/build_report.py
+"""
+Celery tasks that build requested portfolio reports into the artifact store.
+"""
+
+from app.config.logger import logger
+from app.entrypoints.worker.task_runner import celery_async_task
+
+
+@celery_async_task(name="build_performance_statement")
+async def build_performance_statement(job_id: str):
+    from app.infra.db.session import AsyncSessionLocal
+    from app.modules.portfolio.service.portfolio_report_jobs_service import (
+        PortfolioReportJobsService,
+    )
+
+    logger.info(f"🟢 build_performance_statement job {job_id}")
+    async with AsyncSessionLocal() as session:
+        await PortfolioReportJobsService().build_performance_statement(session, job_id)
@@ -1,5 +1,7 @@
 from app.config.logger import logger
-from app.entrypoints.worker.task_runner import celery_async_task
+from app.config.settings import settings
+from app.entrypoints.worker.task_runner import celery_async_task, run_task
+from app.modules.portfolio.tasks.warm_portfolio_cache import warm_portfolio_cache
 
 
 @celery_async_task(name="consolidate_portfolio_returns")
@@ -14,5 +16,7 @@ async def consolidate_portfolio_returns(portfolio_id: int):
         async with AsyncSessionLocal() as session:
             service = PortfolioReturnsConsolidatorService(session)
             await service.consolidate_returns(portfolio_id)
+        if settings.CACHE_WARM_ENABLED:
+            run_task(warm_portfolio_cache, portfolio_id)
     except Exception as e:
         logger.error(f"❌ Erro em consolidate_portfolio_returns: {e}", exc_info=True)
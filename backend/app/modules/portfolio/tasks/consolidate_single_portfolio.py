@@ -1,10 +1,14 @@
 from app.config.logger import logger
-from app.entrypoints.worker.task_runner import celery_async_task
+from app.entrypoints.worker.task_runner import celery_async_task, run_task
+from app.modules.portfolio.tasks.consolidate_portfolio_returns import (
+    consolidate_portfolio_returns,
+)
 
 
 @celery_async_task(name="consolidate_single_portfolio")
-async def consolidate_single_portfolio(portfolio_id: int):
+async def consolidate_single_portfolio(portfolio_id: int, run_id: str | None = None):
     from app.infra.db.session import AsyncSessionLocal
+    from app.modules.portfolio.consolidation_progress import ConsolidationProgress
     from app.modules.portfolio.service.portfolio_consolidator_service import (
         PortfolioConsolidatorService,
     )
@@ -13,6 +17,10 @@ async def consolidate_single_portfolio(portfolio_id: int):
     try:
         async with AsyncSessionLocal() as session:
             service = PortfolioConsolidatorService(session)
-            await service.consolidate_position_portfolio(portfolio_id)
+            await service.consolidate_position_portfolio(portfolio_id, run_id)
+        run_task(consolidate_portfolio_returns, portfolio_id)
     except Exception as e:
         logger.error(f"❌ Erro em consolidate_single_portfolio: {e}", exc_info=True)
+        if run_id:
+            # A run queued from the API is being followed; end it instead of leaving it queued
+            await ConsolidationProgress(portfolio_id, run_id).fail(str(e))
@@ -0,0 +1,82 @@
+# app/modules/portfolio/tasks/warm_portfolio_cache.py
+"""
+Celery task that precomputes the cached portfolio endpoint variants after
+consolidation, so the first dashboard load of each view is a cache hit.
+"""
+
+import asyncio
+import time
+
+from app.config.logger import logger
+from app.config.settings import settings
+from app.entrypoints.worker.task_runner import celery_async_task
+from app.infra.db.models.constants.asset_type import ASSET_TYPE
+
+# patrimony_evolution filters requested by the portfolio pages, as the API parses them
+PATRIMONY_EVOLUTION_FILTERS = [
+    {},
+    {'asset_type_id': int(ASSET_TYPE.FII)},
+    {'asset_type_id': int(ASSET_TYPE.CRIPTO)},
+    {'asset_type_id': int(ASSET_TYPE.PREV)},
+    {'asset_type_ids': [int(ASSET_TYPE.STOCK), int(ASSET_TYPE.BDR), int(ASSET_TYPE.ETF)]},
+    {'asset_type_ids': [
+        int(ASSET_TYPE.CDB), int(ASSET_TYPE.DEB), int(ASSET_TYPE.CRI), int(ASSET_TYPE.CRA), int(ASSET_TYPE.TREASURY),
+    ]},
+]
+
+
+async def _warm_variant(semaphore: asyncio.Semaphore, method_name: str, portfolio_id: int, *args, **kwargs) -> bool:
+    from app.infra.db.session import AsyncSessionLocal
+    from app.modules.portfolio.service.portfolio_position_service import (
+        PortfolioPositionService,
+    )
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as session:
+                service = PortfolioPositionService(session)
+                method = getattr(PortfolioPositionService, method_name)
+                await method.refresh(service, portfolio_id, *args, **kwargs)
+        except Exception as e:
+            logger.error(f"❌ Erro aquecendo {method_name} {args} {kwargs} do portfolio {portfolio_id}: {e}", exc_info=True)
+            return False
+
+        logger.info(f"🔥 {method_name} {args} {kwargs} do portfolio {portfolio_id} em {time.perf_counter() - start:.2f}s")
+        return True
+
+
+@celery_async_task(name="warm_portfolio_cache")
+async def warm_portfolio_cache(portfolio_id: int):
+    from app.infra.db.models.portfolio import CustomCategory
+    from app.infra.db.repositories.base_repository import SQLAlchemyRepository
+    from app.infra.db.session import AsyncSessionLocal
+
+    logger.info(f"🟢 Iniciando warm_portfolio_cache para {portfolio_id}")
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            categories = await SQLAlchemyRepository(session).get(CustomCategory, by={'portfolio_id': portfolio_id})
+            category_ids = [category.id for category in categories]
+
+        semaphore = asyncio.Semaphore(settings.CACHE_WARM_CONCURRENCY)
+        variants = []
+        for currency in settings.CACHE_WARM_CURRENCIES:
+            variants.append(_warm_variant(semaphore, 'get_portfolio_returns', portfolio_id, currency=currency))
+            variants.append(_warm_variant(semaphore, 'get_portfolio_stats', portfolio_id, currency=currency))
+            for filters in PATRIMONY_EVOLUTION_FILTERS:
+                variants.append(
+                    _warm_variant(semaphore, 'get_patrimony_evolution', portfolio_id, **filters, currency=currency)
+                )
+            for category_id in category_ids:
+                variants.append(
+                    _warm_variant(semaphore, 'get_category_stats', portfolio_id, category_id, currency=currency)
+                )
+
+        results = await asyncio.gather(*variants)
+        logger.info(
+            f"✅ warm_portfolio_cache do portfolio {portfolio_id}: {sum(results)}/{len(results)} variantes "
+            f"em {time.perf_counter() - start:.2f}s"
+        )
+    except Exception as e:
+        logger.error(f"❌ Erro em warm_portfolio_cache: {e}", exc_info=True)
@@ -1,18 +1,19 @@
 from typing import List
 
 from app.config.settings import settings
-from app.infra.db.session import get_session
+from app.infra.db.session import AsyncSessionLocal, get_session
 from app.modules.users.db import get_user_db
 from app.modules.users.manager import UserManager
 from app.modules.users.models import User
 from app.modules.users.schemas import UserCreate, UserRead, UserUpdate
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi_users import FastAPIUsers
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
+from fastapi_users.db import SQLAlchemyUserDatabase
 
 
 def get_jwt_strategy() -> JWTStrategy:
@@ -57,6 +58,22 @@ else:
     current_superuser = fastapi_users.current_user(superuser=True)
 
 
+async def is_superuser_request(request: Request) -> bool:
+    """
+    Whether the request carries a superuser's token, for code that runs outside
+    the dependency injection (middlewares).
+    """
+    if settings.ENVIRONMENT in {'development', 'local'}:
+        return True
+
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return False
+    async with AsyncSessionLocal() as session:
+        user = await get_jwt_strategy().read_token(token, UserManager(SQLAlchemyUserDatabase(session, User)))
+    return bool(user and user.is_active and user.is_superuser)
+
+
 # Superuser guard permanece igual
 def superuser_guard(user: User = Depends(current_active_user)) -> User:
     if not user.is_superuser:
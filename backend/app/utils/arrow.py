@@ -0,0 +1,83 @@
+"""
+Parquet and Arrow IPC encoding of DataFrame chunks, yielded as bytes while the
+chunks are read. pyarrow is only needed by these exports, so it is imported
+when one runs rather than at startup.
+"""
+
+from typing import AsyncIterator, Literal
+
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+
+class _ByteSink:
+    """Write-only file object the writer targets; its bytes are drained after each chunk."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _arrow_schema(dtypes: dict[str, str]):
+    import pyarrow as pa
+
+    arrow_types = {
+        'datetime64[ns]': pa.date32(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'object': pa.string(),
+    }
+    return pa.schema([(name, arrow_types[dtype]) for name, dtype in dtypes.items()])
+
+
+async def iter_arrow(
+    chunks: AsyncIterator[pd.DataFrame],
+    dtypes: dict[str, str],
+    file_format: Literal['parquet', 'arrow'],
+) -> AsyncIterator[bytes]:
+    """
+    Chunks typed as `dtypes` as a Parquet file, one row group per chunk, or an
+    Arrow IPC stream, one record batch per chunk. Datetime columns are written
+    as dates. Converting, compressing and closing run in a worker thread.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dtypes)
+    sink = _ByteSink()
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    def write_chunk(chunk: pd.DataFrame):
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    try:
+        async for chunk in chunks:
+            await run_in_threadpool(write_chunk, chunk)
+            yield sink.drain()
+    finally:
+        # Writes the Parquet footer / end of stream marker
+        await run_in_threadpool(writer.close)
+    yield sink.drain()
@@ -1,21 +1,36 @@
-from typing import Any
+from typing import Sequence
 
 import numpy as np
 import pandas as pd
 
+from app.utils.serialize import column_values, df_to_records
+from app.utils.timing import SERIALIZE, timeit
 
+
+@timeit('df_to_named_dict', category=SERIALIZE)
 def df_to_named_dict(df: pd.DataFrame) -> dict[str, list[dict]]:
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-    return {
-        col: df[['date', col]]
-        .dropna()
-        .rename(columns={col: 'value'})
-        .to_dict(orient='records')
-        for col in df.columns
-        if col != 'date'
-    }
-    
+    dates = pd.to_datetime(df['date'])
+    if dates.dt.tz is None:
+        date_strings = np.datetime_as_string(dates.to_numpy(), unit='D').astype(object)
+    else:
+        date_strings = dates.dt.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    has_date = dates.notna().to_numpy()
+
+    result = {}
+    for col in df.columns:
+        if col == 'date':
+            continue
+        values = df[col]
+        mask = has_date & values.notna().to_numpy()
+        result[col] = [
+            {'date': date, 'value': value}
+            for date, value in zip(
+                date_strings[mask].tolist(), values.to_numpy()[mask].tolist(), strict=True
+            )
+        ]
+    return result
+
+
 def extend_values_to_today(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
@@ -39,19 +54,90 @@ def extend_values_to_today(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def df_to_dict_list(df: pd.DataFrame) -> list[dict]:
-    def convert_value(val:  Any):
-            if isinstance(val, pd.Timestamp):
-                return val.isoformat()
-            if pd.isna(val) or val in {
-                float('inf'),
-                float('-inf'),
-                np.inf,
-                -np.inf,
-            }:
-                return None
-            return val
-
-    records = [
-        {k: convert_value(v) for k, v in row.items()} for row in df.to_dict(orient='records')
-    ]
-    return records
\ No newline at end of file
+    return df_to_records(df)
+
+
+def date_values(dates: pd.Series, epoch_days: bool = False) -> list:
+    """Dates as 'YYYY-MM-DD' strings, or as days since 1970-01-01 when `epoch_days`."""
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy().astype('datetime64[D]')
+    if epoch_days:
+        values = days.astype('int64').astype(object)
+    else:
+        values = np.datetime_as_string(days, unit='D').astype(object)
+    values[np.isnat(days)] = None
+    return values.tolist()
+
+
+@timeit('df_to_columnar', category=SERIALIZE)
+def df_to_columnar(df: pd.DataFrame, date_column: str = 'date', epoch_days: bool = False) -> dict:
+    """
+    Columnar layout for time series: `{'dates': [...], 'series': {column: [...]}}`,
+    one array entry per row, so each date and column name is written once
+    instead of once per point. Missing values are null.
+    """
+    return {
+        'dates': date_values(df[date_column], epoch_days) if date_column in df.columns else [],
+        'series': {
+            col: column_values(df[col])
+            for col in df.columns
+            if col != date_column
+        },
+    }
+
+
+@timeit('df_to_keyed_columnar', category=SERIALIZE)
+def df_to_keyed_columnar(
+    df: pd.DataFrame,
+    key_column: str,
+    attribute_columns: Sequence[str] = (),
+    date_column: str = 'date',
+    epoch_days: bool = False,
+) -> dict:
+    """
+    Columnar layout of a long frame, one row per key (e.g. asset) and date:
+    `{'dates': [...], 'series': {column: {key: [...]}}, 'keys': {key: {attribute: value}}}`.
+    Each date is written once on the shared axis and each key gets one array
+    per column, null on the dates it has no row for. `attribute_columns` are
+    constant per key and written once in `keys`.
+    """
+    if df.empty:
+        return {'dates': [], 'series': {}, 'keys': {}}
+
+    value_columns = [col for col in df.columns if col not in {date_column, key_column, *attribute_columns}]
+    rows = df.drop_duplicates([date_column, key_column], keep='last')
+    wide = rows.pivot(index=date_column, columns=key_column, values=value_columns).sort_index()
+    keys = wide.columns.get_level_values(1).unique().tolist()
+    attributes = df_to_records(rows.drop_duplicates(key_column, keep='last')[[key_column, *attribute_columns]])
+    return {
+        'dates': date_values(wide.index.to_series(), epoch_days),
+        'series': {
+            col: {key: column_values(wide[(col, key)]) for key in keys}
+            for col in value_columns
+        },
+        'keys': {
+            record[key_column]: {attr: record[attr] for attr in attribute_columns}
+            for record in sorted(attributes, key=lambda record: record[key_column])
+        },
+    }
+
+
+@timeit('named_dict_to_columnar', category=SERIALIZE)
+def named_dict_to_columnar(named: dict[str, list[dict]], epoch_days: bool = False) -> dict:
+    """Columnar layout of a `df_to_named_dict` result, aligned on the union of its dates."""
+    if not named:
+        return {'dates': [], 'series': {}}
+    df = pd.concat(
+        {
+            name: pd.Series(
+                [point['value'] for point in points],
+                index=[point['date'] for point in points],
+                dtype=float,
+            )
+            for name, points in named.items()
+        },
+        axis=1,
+    ).sort_index()
+    return df_to_columnar(df.rename_axis('date').reset_index(), epoch_days=epoch_days)
@@ -0,0 +1,23 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class AsyncMemo:
+    """
+    Results of coroutines shared by concurrent callers for the lifetime of the
+    memo, e.g. one batch request. The first caller of a key runs the factory and
+    the others await the same task; results are shared, callers must not mutate
+    them.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+        return await task
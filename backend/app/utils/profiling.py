@@ -0,0 +1,52 @@
+"""
+Sampling profiler for a single request.
+
+A background thread snapshots the event loop thread's stack every `interval`
+seconds and counts identical stacks. The result is in the "folded" format
+(`frame;frame;frame count` per line) read by flamegraph.pl, inferno and
+speedscope. The event loop is shared, so other requests served meanwhile show
+up too, and work sent to the threadpool appears as time the loop spent idle.
+"""
+
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import CodeType
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = '/'.join(Path(code.co_filename).parts[-2:])
+            label = self._labels[code] = f'{code.co_qualname} ({path}:{code.co_firstlineno})'
+        return label
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
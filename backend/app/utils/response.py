@@ -1,30 +1,70 @@
-from io import BytesIO
-from typing import Any
+from typing import AsyncIterator, Literal, Sequence
 
-import numpy as np
 import pandas as pd
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
+from app.utils.arrow import iter_arrow
+from app.utils.df import df_to_columnar, df_to_keyed_columnar
+from app.utils.serialize import df_to_records, dumps
+from app.utils.spreadsheet import iter_csv, iter_xlsx
+from app.utils.timing import SERIALIZE, timed
 
-def df_response(df: pd.DataFrame) -> JSONResponse:
-    def convert_value(val: Any):
-        if isinstance(val, pd.Timestamp):
-            return val.isoformat()
-        if pd.isna(val) or val in {
-            float('inf'),
-            float('-inf'),
-            np.inf,
-            -np.inf,
-        }:
-            return None
-        return val
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
 
-    records = [
-        {k: convert_value(v) for k, v in row.items()} for row in df.to_dict(orient='records')
-    ]
 
-    return JSONResponse(content=jsonable_encoder(records))
+class SeriesFormat(BaseModel):
+    """
+    Query parameters of time-series endpoints. `format=columnar` returns
+    `{dates, series}` instead of one record per point; series with one row per
+    key and date (e.g. per asset) are split by key, see `df_to_keyed_columnar`.
+    `date_format=epoch_days` encodes those dates as days since 1970-01-01.
+    """
+    format: Literal['records', 'columnar'] = 'records'
+    date_format: Literal['iso', 'epoch_days'] = 'iso'
+
+    @property
+    def columnar(self) -> bool:
+        return self.format == 'columnar'
+
+    @property
+    def epoch_days(self) -> bool:
+        return self.date_format == 'epoch_days'
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """Default response class; its rendering counts as the request's `serialize` time."""
+
+    def render(self, content) -> bytes:
+        with timed(SERIALIZE):
+            return super().render(content)
+
+
+def json_response(content) -> Response:
+    return Response(content=dumps(content), media_type='application/json')
+
+
+def df_response(
+    df: pd.DataFrame,
+    series_format: SeriesFormat | None = None,
+    key_column: str | None = None,
+    attribute_columns: Sequence[str] = (),
+) -> Response:
+    """`key_column` marks a long frame (one row per key and date) for the columnar layout."""
+    if series_format is not None and series_format.columnar:
+        if key_column is not None:
+            return json_response(
+                df_to_keyed_columnar(df, key_column, attribute_columns, epoch_days=series_format.epoch_days)
+            )
+        return json_response(df_to_columnar(df, epoch_days=series_format.epoch_days))
+    return json_response(df_to_records(df))
+
+
+async def _single_chunk(df: pd.DataFrame) -> AsyncIterator[pd.DataFrame]:
+    yield df
 
 
 def df_to_xlsx_response(
@@ -32,23 +72,68 @@ def df_to_xlsx_response(
     filename: str,
     sheet_name: str = "Sheet1",
 ) -> StreamingResponse:
-    output = BytesIO()
+    return df_chunks_to_xlsx_response(_single_chunk(df), filename, sheet_name)
 
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(
-            writer,
-            index=False,
-            sheet_name=sheet_name,
-        )
 
-    output.seek(0)
+def df_chunks_to_xlsx_response(
+    chunks: AsyncIterator[pd.DataFrame],
+    filename: str,
+    sheet_name: str = "Sheet1",
+) -> StreamingResponse:
+    """
+    Streams the chunks as an XLSX file while they are read: each chunk is
+    encoded and sent before the next one is fetched, so memory stays flat. The
+    chunks are consumed after the endpoint returns, so they must not depend on
+    the request's session (see `get_read_session_factory`).
+    """
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+
+    return StreamingResponse(
+        iter_xlsx(chunks, sheet_name),
+        media_type=XLSX_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+def df_chunks_to_csv_response(
+    chunks: AsyncIterator[pd.DataFrame],
+    filename: str,
+) -> StreamingResponse:
+    """CSV counterpart of `df_chunks_to_xlsx_response`, with the same constraints."""
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+
+    return StreamingResponse(
+        iter_csv(chunks),
+        media_type=CSV_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+def df_chunks_to_arrow_response(
+    chunks: AsyncIterator[pd.DataFrame] | pd.DataFrame,
+    dtypes: dict[str, str],
+    filename: str,
+    file_format: Literal["parquet", "arrow"],
+) -> StreamingResponse:
+    """
+    Streams DataFrame chunks (or a single DataFrame) typed as `dtypes` as a
+    Parquet file or an Arrow IPC stream (see `iter_arrow`). Chunks are consumed
+    after the endpoint returns, with the same constraints as
+    `df_chunks_to_xlsx_response`.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = _single_chunk(chunks)
 
     headers = {
         "Content-Disposition": f'attachment; filename="{filename}"'
     }
 
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iter_arrow(chunks, dtypes, file_format),
+        media_type=PARQUET_MEDIA_TYPE if file_format == "parquet" else ARROW_STREAM_MEDIA_TYPE,
         headers=headers,
-    )
\ No newline at end of file
+    )
@@ -1,14 +1,84 @@
 import math
 
+import numpy as np
+import orjson
 import pandas as pd
+from fastapi.encoders import jsonable_encoder
 
+from app.utils.timing import SERIALIZE, timeit
+
+# Inferred types of object columns whose values are already JSON-ready once nulls are None
+_PLAIN_OBJECT_TYPES = {'string', 'empty', 'boolean', 'integer'}
+
+
+def clean_value(v):
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    if isinstance(v, (float, np.floating)) and not math.isfinite(v):
+        return None
+    if v is None or v is pd.NaT or v is pd.NA:
+        return None
+    return v
 
-def sanitize_dict(records: list[dict]) -> list[dict]:
-    def clean_value(v):
-        if isinstance(v, float) and (math.isnan(v) or v in {float('inf'), float('-inf')}):
-            return None
-        if isinstance(v, pd.Timestamp):
-            return v.isoformat()
-        return v
 
+def sanitize_dict(records: list[dict]) -> list[dict]:
     return [{k: clean_value(v) for k, v in row.items()} for row in records]
+
+
+def _datetime_values(series: pd.Series) -> list:
+    values = series.to_numpy()
+    if series.dt.tz is None:
+        seconds = values.astype('datetime64[s]')
+        missing = np.isnat(values)
+        if ((seconds == values) | missing).all():
+            # Whole seconds render as Timestamp.isoformat() does, without the Python loop
+            strings = np.datetime_as_string(seconds, unit='s').astype(object)
+            strings[missing] = None
+            return strings.tolist()
+    return [None if value is pd.NaT else value.isoformat() for value in series]
+
+
+def _float_values(values: np.ndarray) -> list:
+    objects = values.astype(object)
+    objects[~np.isfinite(values)] = None
+    return objects.tolist()
+
+
+def column_values(series: pd.Series) -> list:
+    """
+    The column as JSON-ready Python values: NaN, NaT and ±inf become None and
+    timestamps their isoformat(). Conversion runs per column with NumPy; only
+    object columns holding other types (Decimal, date, ...) go through
+    `clean_value` cell by cell.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return _datetime_values(series)
+    if isinstance(dtype, np.dtype):
+        if dtype.kind == 'f':
+            return _float_values(series.to_numpy())
+        if dtype.kind in 'iub':
+            return series.to_numpy().tolist()
+
+    values = series.to_numpy(dtype=object, na_value=None)
+    if pd.api.types.infer_dtype(values, skipna=True) in _PLAIN_OBJECT_TYPES:
+        return values.tolist()
+    return [clean_value(v) for v in values]
+
+
+@timeit('df_to_records', category=SERIALIZE)
+def df_to_records(df: pd.DataFrame) -> list[dict]:
+    """Same records as `df.to_dict(orient='records')` with every value passed through `clean_value`."""
+    columns = list(df.columns)
+    values = [column_values(df.iloc[:, i]) for i in range(len(columns))]
+    return [dict(zip(columns, row, strict=True)) for row in zip(*values, strict=True)]
+
+
+@timeit('dumps', category=SERIALIZE)
+def dumps(content) -> bytes:
+    """JSON bytes for API responses; types orjson doesn't know (Decimal, ...) go through jsonable_encoder."""
+    return orjson.dumps(
+        content,
+        default=jsonable_encoder,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
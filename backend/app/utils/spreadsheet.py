@@ -0,0 +1,175 @@
+"""
+Streaming XLSX and CSV encoders: DataFrame chunks in, file bytes out, one chunk
+at a time. Memory is bounded by the chunk size and the first bytes go out as
+soon as the first chunk is encoded.
+
+The XLSX package is written directly instead of through openpyxl, whose
+workbooks (even write-only ones) can only be saved as a whole: the static parts
+come first, then the worksheet XML is deflated into the zip as rows arrive. The
+zip uses data descriptors, so it never needs to seek back.
+"""
+
+import re
+import zipfile
+from typing import AsyncIterator, Iterable
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+XLSX_COMPRESS_LEVEL = 6
+# Excel's day zero in the 1900 date system, counting its 1900-02-29
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+CSV_DATE_FORMAT = '%Y-%m-%d'
+UTF8_BOM = b'\xef\xbb\xbf'
+
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_RELATIONSHIPS_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+
+def _xlsx_parts(sheet_name: str) -> dict[str, str]:
+    content_types = (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    )
+    package_rels = (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{_RELATIONSHIPS_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    workbook = (
+        f'<workbook xmlns="{_SPREADSHEET_NS}" xmlns:r="{_RELATIONSHIPS_NS}">'
+        f'<sheets><sheet name={quoteattr(sheet_name[:31])} sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+    workbook_rels = (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{_RELATIONSHIPS_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_RELATIONSHIPS_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    # Style 1 is the built-in short date format (numFmtId 14), used by date cells
+    styles = (
+        f'<styleSheet xmlns="{_SPREADSHEET_NS}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
+    parts = {
+        '[Content_Types].xml': content_types,
+        '_rels/.rels': package_rels,
+        'xl/workbook.xml': workbook,
+        'xl/_rels/workbook.xml.rels': workbook_rels,
+        'xl/styles.xml': styles,
+    }
+    return {name: _XML_DECLARATION + xml for name, xml in parts.items()}
+
+
+def _text_cells(values: pd.Series) -> pd.Series:
+    text = values.map(lambda value: escape(_ILLEGAL_XML_CHARS.sub('', str(value))), na_action='ignore')
+    return '<c t="inlineStr"><is><t xml:space="preserve">' + text + '</t></is></c>'
+
+
+def _column_cells(values: pd.Series) -> pd.Series:
+    """One `<c>` element per row; missing values become empty cells to keep the columns aligned."""
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(values):
+        cells = '<c t="b"><v>' + values.astype('int8').astype(str) + '</v></c>'
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        serials = (values - EXCEL_EPOCH) / pd.Timedelta(days=1)
+        cells = '<c s="1"><v>' + serials.astype(str) + '</v></c>'
+    elif pd.api.types.is_numeric_dtype(values):
+        missing = missing | ~np.isfinite(values.to_numpy(dtype='float64', na_value=np.nan))
+        cells = '<c><v>' + values.astype(str) + '</v></c>'
+    else:
+        cells = _text_cells(values)
+    return cells.where(~missing, '<c/>')
+
+
+def _rows_xml(df: pd.DataFrame) -> str:
+    rows = pd.Series('<row>', index=df.index)
+    for column in df.columns:
+        rows = rows + _column_cells(df[column])
+    return ''.join(rows + '</row>')
+
+
+def _header_xml(columns: Iterable) -> str:
+    return '<row>' + ''.join(_text_cells(pd.Series([str(column) for column in columns]))) + '</row>'
+
+
+class _ByteSink:
+    """Write-only file object the zip is written to; its bytes are drained after each chunk."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _write_chunk(sheet, chunk: pd.DataFrame, header: bool):
+    xml = (_header_xml(chunk.columns) if header else '') + _rows_xml(chunk)
+    sheet.write(xml.encode())
+
+
+async def iter_xlsx(chunks: AsyncIterator[pd.DataFrame], sheet_name: str = 'Sheet1') -> AsyncIterator[bytes]:
+    """
+    XLSX bytes of the chunks, a header row from the first chunk's columns and
+    then their rows. Encoding and deflating a chunk run in a worker thread.
+    """
+    sink = _ByteSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=XLSX_COMPRESS_LEVEL) as archive:
+        for name, xml in _xlsx_parts(sheet_name).items():
+            archive.writestr(name, xml)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(f'{_XML_DECLARATION}<worksheet xmlns="{_SPREADSHEET_NS}"><sheetData>'.encode())
+            header = True
+            async for chunk in chunks:
+                await run_in_threadpool(_write_chunk, sheet, chunk, header)
+                header = False
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+async def iter_csv(chunks: AsyncIterator[pd.DataFrame]) -> AsyncIterator[bytes]:
+    """
+    UTF-8 CSV bytes of the chunks, header from the first one. Starts with a BOM
+    so Excel detects the encoding of accented names.
+    """
+    yield UTF8_BOM
+    header = True
+    async for chunk in chunks:
+        yield await run_in_threadpool(
+            lambda chunk=chunk, header=header: chunk.to_csv(
+                index=False, header=header, date_format=CSV_DATE_FORMAT
+            ).encode()
+        )
+        header = False
@@ -0,0 +1,166 @@
+import datetime as dt
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, model_validator
+
+from app.utils.timing import timeit
+
+
+class TimeSeriesFilters(BaseModel):
+    """
+    Query parameters of chart endpoints. `resolution` keeps the last point of
+    each week or month; `max_points` further reduces each series with LTTB.
+    """
+    start_date: dt.date | None = None
+    end_date: dt.date | None = None
+    resolution: Literal['daily', 'weekly', 'monthly'] = 'daily'
+    max_points: int | None = Field(None, ge=3)
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date must be <= end_date")
+        return self
+
+    @property
+    def is_noop(self) -> bool:
+        return (
+            self.start_date is None
+            and self.end_date is None
+            and self.resolution == 'daily'
+            and self.max_points is None
+        )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points of (x, y),
+    x ascending, that keep the visual shape of the series. First and last points
+    are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype('float64')
+    y = np.nan_to_num(y.astype('float64'))
+    every = (n - 2) / (threshold - 2)
+    edges = np.append((np.arange(threshold - 1) * every).astype(np.int64) + 1, n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end, next_end = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def series_indices(
+    dates: Sequence,
+    filters: TimeSeriesFilters,
+    values: Optional[Sequence] = None,
+    groups: Optional[Sequence] = None,
+) -> np.ndarray:
+    """
+    Positions of the points to keep, in their original order. `groups` splits
+    the rows into independent series (e.g. one per asset), each reduced on its
+    own; `values` is the series LTTB preserves and is required for `max_points`.
+    """
+    days = pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[D]')
+    index = np.arange(len(days))
+
+    mask = np.ones(len(days), dtype=bool)
+    if filters.start_date:
+        mask &= days >= np.datetime64(filters.start_date)
+    if filters.end_date:
+        mask &= days <= np.datetime64(filters.end_date)
+    index = index[mask]
+
+    group_keys = np.zeros(len(days), dtype=np.int64) if groups is None else pd.factorize(pd.Series(groups))[0]
+
+    if filters.resolution != 'daily':
+        day_numbers = days[index].astype(np.int64)
+        if filters.resolution == 'weekly':
+            # Monday-based weeks; 1970-01-05 (day 4) was a Monday
+            periods = (day_numbers - 4) // 7
+        else:
+            periods = days[index].astype('datetime64[M]').astype(np.int64)
+        # Rows are ordered by date within each series, so the last row of a period is its close
+        keys = pd.DataFrame({'group': group_keys[index], 'period': periods})
+        index = index[~keys.duplicated(keep='last').to_numpy()]
+
+    if filters.max_points and values is not None:
+        values = np.asarray(values, dtype='float64')
+        kept = []
+        for group in np.unique(group_keys[index]):
+            group_index = index[group_keys[index] == group]
+            selected = lttb_indices(
+                days[group_index].astype(np.int64), values[group_index], filters.max_points
+            )
+            kept.append(group_index[selected])
+        index = np.sort(np.concatenate(kept)) if kept else index
+
+    return index
+
+
+@timeit('downsample_df')
+def downsample_df(
+    df: pd.DataFrame,
+    filters: TimeSeriesFilters,
+    value_column: Optional[str] = None,
+    group_column: Optional[str] = None,
+    date_column: str = 'date',
+) -> pd.DataFrame:
+    if df is None or df.empty or filters.is_noop:
+        return df
+    index = series_indices(
+        df[date_column],
+        filters,
+        values=df[value_column] if value_column else None,
+        groups=df[group_column] if group_column else None,
+    )
+    return df.iloc[index]
+
+
+@timeit('downsample_records')
+def downsample_records(
+    records: Optional[Sequence],
+    filters: TimeSeriesFilters,
+    value_key: Optional[str] = None,
+    group_key: Optional[str] = None,
+    date_key: str = 'date',
+) -> Optional[list]:
+    """Same as `downsample_df` for lists of records, returned as they are (cached payloads keep their types)."""
+    if not records or filters.is_noop:
+        return records
+    index = series_indices(
+        [record[date_key] for record in records],
+        filters,
+        values=[record[value_key] for record in records] if value_key else None,
+        groups=[record[group_key] for record in records] if group_key else None,
+    )
+    return [records[i] for i in index]
+
+
+def records_since(records: Optional[Sequence], since: Optional[dt.date], date_key: str = 'date') -> Optional[list]:
+    """Records dated after `since`, for delta sync of series served from the cache."""
+    if since is None:
+        return records
+    return downsample_records(records, TimeSeriesFilters(start_date=since + dt.timedelta(days=1)), date_key=date_key)
+
+
+def last_date(records: Optional[Sequence], date_key: str = 'date') -> Optional[dt.date]:
+    if not records:
+        return None
+    # ISO strings, dates and datetimes all start with YYYY-MM-DD
+    return dt.date.fromisoformat(max(str(record[date_key])[:10] for record in records))
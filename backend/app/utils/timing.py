@@ -1,21 +1,130 @@
+"""
+Per request time breakdown.
+
+ServerTimingMiddleware opens a `RequestTimings` for each request. The DB and
+Redis clients, the serializers and the `timed`/`timeit` sections add their
+durations to it through a context variable, so it follows the request into
+tasks it spawns and into threadpool calls. Outside a request (worker, scripts)
+nothing is recorded.
+"""
+
 import asyncio
 import functools
 import logging
+import threading
 import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+DB = 'db'
+REDIS = 'redis'
+SERIALIZE = 'serialize'
+COMPUTE = 'compute'
+
+
+class RequestTimings:
+    """Time per category spent by one request, plus how many times each was entered."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: dict[str, float] = defaultdict(float)
+        self.counts: dict[str, int] = defaultdict(int)
+        # Threadpool calls of the request record concurrently
+        self._lock = threading.Lock()
+
+    def record(self, category: str, seconds: float):
+        with self._lock:
+            self.durations[category] += seconds
+            self.counts[category] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> dict[str, float | int]:
+        """
+        Milliseconds per category and call counts. `app` is the time not
+        attributed to any category; concurrent sections (e.g. queries run in
+        parallel) can add up to more than the wall time, so it is floored at 0.
+        """
+        total = self.elapsed()
+        with self._lock:
+            durations = dict(self.durations)
+            counts = dict(self.counts)
+        summary = {'total_ms': round(total * 1000, 1)}
+        for category, seconds in durations.items():
+            summary[f'{category}_ms'] = round(seconds * 1000, 1)
+            summary[f'{category}_count'] = counts[category]
+        summary['app_ms'] = round(max(total - sum(durations.values()), 0) * 1000, 1)
+        return summary
+
+    def server_timing(self) -> str:
+        """The `Server-Timing` header value of the time recorded so far."""
+        summary = self.summary()
+        metrics = []
+        for category in (DB, REDIS, SERIALIZE, COMPUTE):
+            if f'{category}_ms' in summary:
+                count = summary[f'{category}_count']
+                calls = 'call' if count == 1 else 'calls'
+                metrics.append(f'{category};dur={summary[f"{category}_ms"]};desc="{count} {calls}"')
+        metrics.append(f'app;dur={summary["app_ms"]}')
+        metrics.append(f'total;dur={summary["total_ms"]}')
+        return ', '.join(metrics)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+# Set inside a `timed` section, so nested sections aren't counted twice
+_in_section: ContextVar[bool] = ContextVar('in_timed_section', default=False)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token]:
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def reset_request_timings(token: Token):
+    _request_timings.reset(token)
+
+
+def record_timing(category: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.record(category, seconds)
+
+
+@contextmanager
+def timed(category: str) -> Iterator[None]:
+    """
+    Adds the section's duration to `category` of the current request. Only the
+    outermost section counts: a serializer called from a compute section is
+    part of the compute time.
+    """
+    if _in_section.get() or _request_timings.get() is None:
+        yield
+        return
+
+    token = _in_section.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(category, time.perf_counter() - start)
+        _in_section.reset(token)
+
 
-def timeit(label='Execution'):
+def timeit(label='Execution', category=COMPUTE):
     def decorator(func):
         if asyncio.iscoroutinefunction(func):
 
             @functools.wraps(func)
             async def async_wrapper(*args, **kwargs):
                 start = time.perf_counter()
-                result = await func(*args, **kwargs)
-                end = time.perf_counter()
-                print(f'{label} took {end - start:.4f} seconds')
+                with timed(category):
+                    result = await func(*args, **kwargs)
+                logger.debug('%s took %.4f seconds', label, time.perf_counter() - start)
                 return result
 
             return async_wrapper
@@ -24,9 +133,9 @@ def timeit(label='Execution'):
             @functools.wraps(func)
             def sync_wrapper(*args, **kwargs):
                 start = time.perf_counter()
-                result = func(*args, **kwargs)
-                end = time.perf_counter()
-                print(f'{label} took {end - start:.4f} seconds')
+                with timed(category):
+                    result = func(*args, **kwargs)
+                logger.debug('%s took %.4f seconds', label, time.perf_counter() - start)
                 return result
 
             return sync_wrapper
@@ -0,0 +1,100 @@
+"""
+Benchmark for rendering and compressing the large time-series responses.
+
+Builds payloads shaped like `/portfolio/{id}/position?most_recent=false`,
+`/portfolio/{id}/patrimony_evolution` and `/market_data/indexes/time_series`
+and reports, per payload, the render time of the stdlib JSON response against
+the orjson one, and the bytes on the wire and compression time for gzip and
+brotli at the levels used by `CompressionMiddleware`.
+
+Runs without a database:
+
+    poetry run python -m benchmarks.response_rendering
+"""
+
+import timeit
+import zlib
+
+import brotli
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+NUMBER = 5
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+DATES = pd.date_range(end=pd.Timestamp.today().normalize(), periods=5 * 365, freq='D')
+rng = np.random.default_rng(42)
+
+
+def position_history(n_assets=30):
+    rows = []
+    for asset_id in range(1, n_assets + 1):
+        prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(DATES)))
+        for date, price in zip(DATES, prices, strict=True):
+            rows.append({
+                'date': date.isoformat(),
+                'asset_id': asset_id,
+                'ticker': f'TICK{asset_id}',
+                'quantity': 100.0,
+                'price': float(price),
+                'price_usd': float(price / 5),
+                'average_price': 100.0,
+                'value': float(price * 100),
+                'dividend': None,
+                'acc_return': float(price / 100 - 1),
+                'twelve_months_return': None,
+                'asset_type_id': 1,
+                'category': 'Ações',
+            })
+    return rows
+
+
+def patrimony_evolution():
+    values = 100000 * np.cumprod(1 + rng.normal(0, 0.005, len(DATES)))
+    return [
+        {'date': date.isoformat(), 'value': float(value), 'invested': 100000.0}
+        for date, value in zip(DATES, values, strict=True)
+    ]
+
+
+def indexes_time_series(indexes=('CDI', 'IPCA', 'IBOV', 'S&P500', 'NASDAQ', 'USD/BRL')):
+    return {
+        index: [
+            {'date': date.isoformat(), 'value': float(value)}
+            for date, value in zip(DATES, np.cumprod(1 + rng.normal(0, 0.01, len(DATES))) - 1, strict=True)
+        ]
+        for index in indexes
+    }
+
+
+def ms(fn):
+    return timeit.timeit(fn, number=NUMBER) / NUMBER * 1000
+
+
+def report(name, payload):
+    content = jsonable_encoder(payload)
+    body = ORJSONResponse(content).body
+    gzipped = zlib.compress(body, GZIP_LEVEL, wbits=31)
+    brotlied = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    print(f'{name}')
+    print(f'  render json:   {ms(lambda: JSONResponse(content)):8.1f} ms')
+    print(f'  render orjson: {ms(lambda: ORJSONResponse(content)):8.1f} ms')
+    print(f'  identity: {len(body) / 1024:9.0f} KiB')
+    print(
+        f'  gzip {GZIP_LEVEL}:   {len(gzipped) / 1024:9.0f} KiB'
+        f'  {ms(lambda: zlib.compress(body, GZIP_LEVEL, wbits=31)):6.1f} ms'
+    )
+    print(
+        f'  br {BROTLI_QUALITY}:     {len(brotlied) / 1024:9.0f} KiB'
+        f'  {ms(lambda: brotli.compress(body, quality=BROTLI_QUALITY)):6.1f} ms'
+    )
+
+
+if __name__ == '__main__':
+    report('position history (30 assets, 5y daily)', position_history())
+    report('patrimony evolution (5y daily)', patrimony_evolution())
+    report('indexes time series (6 indexes, 5y daily)', indexes_time_series())
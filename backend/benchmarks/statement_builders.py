@@ -0,0 +1,150 @@
+"""
+Micro-benchmark for the prebuilt portfolio position statements.
+
+Compares, per call, building the select tree with literal values and compiling
+it (what the repository did before) against reusing the statement that
+get_portfolio_position_df prebuilds and only binding its parameters. Also
+checks that the SQL text no longer changes with the number of asset ids, which
+keeps asyncpg's prepared-statement cache warm.
+
+Runs without a database:
+
+    poetry run python -m benchmarks.statement_builders
+"""
+
+import asyncio
+import os
+import timeit
+from datetime import date
+
+os.environ.setdefault('ENVIRONMENT', 'testing')
+
+import pandas as pd  # noqa: E402
+from sqlalchemy import and_, func, select  # noqa: E402
+from sqlalchemy.dialects.postgresql import asyncpg  # noqa: E402
+
+from app.infra.db.models.asset import Asset  # noqa: E402
+from app.infra.db.models.portfolio import Dividend, Position  # noqa: E402
+from app.modules.portfolio.repositories.portfolio_repository import (  # noqa: E402
+    PortfolioRepository,
+    get_custom_category_subquery,
+)
+
+DIALECT = asyncpg.dialect()
+NUMBER = 2000
+
+
+def build_legacy(portfolio_id, start_date, asset_ids):
+    dividend_subquery = (
+        select(
+            Dividend.asset_id,
+            Dividend.portfolio_id,
+            Dividend.date,
+            func.sum(Dividend.amount).label('total_dividend'),
+            func.sum(Dividend.amount_usd).label('total_dividend_usd'),
+        )
+        .where(Dividend.portfolio_id == portfolio_id)
+        .group_by(Dividend.asset_id, Dividend.portfolio_id, Dividend.date)
+        .subquery()
+    )
+    cat_assignment_subq = get_custom_category_subquery(portfolio_id)
+
+    return (
+        select(
+            Position.date,
+            Position.asset_id,
+            Asset.ticker,
+            Position.quantity,
+            Position.price,
+            Position.price_usd,
+            Position.average_price,
+            dividend_subquery.c.total_dividend.label('dividend'),
+            dividend_subquery.c.total_dividend_usd.label('dividend_usd'),
+            cat_assignment_subq.c.category,
+        )
+        .join(Asset, Position.asset_id == Asset.id)
+        .outerjoin(
+            dividend_subquery,
+            and_(
+                dividend_subquery.c.asset_id == Position.asset_id,
+                dividend_subquery.c.date == Position.date,
+                dividend_subquery.c.portfolio_id == Position.portfolio_id,
+            ),
+        )
+        .outerjoin(cat_assignment_subq, cat_assignment_subq.c.asset_id == Position.asset_id)
+        .where(Position.portfolio_id == portfolio_id)
+        .where(Position.date >= start_date)
+        .where(Position.asset_id.in_(asset_ids))
+        .order_by(Position.date)
+    )
+
+
+def legacy_call():
+    stmt = build_legacy(1, date(2024, 1, 1), [1, 2, 3])
+    stmt.compile(dialect=DIALECT, compile_kwargs={'render_postcompile': True})
+
+
+class CapturingRepository(PortfolioRepository):
+    """Records the statement and parameters the repository would run instead of running them."""
+
+    async def fetch_frame(self, stmt, dtypes, params=None):
+        self.statement, self.params = stmt, params
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+
+
+def prebuilt_statement():
+    repo = CapturingRepository(None)
+    asyncio.run(repo.get_portfolio_position_df(1, start_date=date(2024, 1, 1), asset_ids=[1, 2, 3]))
+    return repo.statement
+
+
+PREBUILT = prebuilt_statement()
+PREBUILT_COMPILED = PREBUILT.compile(dialect=DIALECT)
+
+
+def prebuilt_call():
+    PREBUILT_COMPILED.construct_params(
+        {'portfolio_id': 1, 'start_date': date(2024, 1, 1), 'asset_ids': [1, 2, 3]}
+    )
+
+
+def cache_key_call(build):
+    build()._generate_cache_key()
+
+
+def distinct_sql(asset_id_lists):
+    legacy = {
+        str(build_legacy(1, date(2024, 1, 1), ids).compile(
+            dialect=DIALECT, compile_kwargs={'render_postcompile': True}
+        ))
+        for ids in asset_id_lists
+    }
+    prebuilt = {str(PREBUILT.compile(dialect=DIALECT)) for _ in asset_id_lists}
+    return len(legacy), len(prebuilt)
+
+
+def report(label, seconds):
+    print(f'{label:<40} {seconds / NUMBER * 1e6:>10.1f} us/call')
+
+
+def main():
+    report('legacy build + compile', timeit.timeit(legacy_call, number=NUMBER))
+    report('prebuilt bind params', timeit.timeit(prebuilt_call, number=NUMBER))
+    report(
+        'legacy build + cache key',
+        timeit.timeit(lambda: cache_key_call(lambda: build_legacy(1, date(2024, 1, 1), [1, 2, 3])), number=NUMBER),
+    )
+    report(
+        'prebuilt cache key',
+        timeit.timeit(
+            lambda: cache_key_call(lambda: PREBUILT),
+            number=NUMBER,
+        ),
+    )
+
+    legacy, prebuilt = distinct_sql([list(range(1, n + 1)) for n in range(1, 21)])
+    print(f'distinct SQL strings for 20 asset id list sizes: legacy={legacy} prebuilt={prebuilt}')
+
+
+if __name__ == '__main__':
+    main()
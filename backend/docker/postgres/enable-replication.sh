@@ -0,0 +1,6 @@
+#!/bin/bash
+# Lets the db_replica service stream WAL from this instance.
+# Runs only when the data volume is initialised; on an existing volume append
+# the same line to pg_hba.conf and reload.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
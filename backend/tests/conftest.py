@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, patch
 
 # Must set ENVIRONMENT before any app import
@@ -129,9 +130,9 @@ _REDIS_PATCHES = [
     'app.modules.market_data.service.market_data_service.RedisService',
     'app.modules.portfolio.service.portfolio_base_service.RedisService',
     'app.modules.portfolio.service.portfolio_position_service.RedisService',
-    'app.modules.portfolio.tasks.set_patrimony_evolution_cache.RedisService',
-    'app.modules.portfolio.tasks.set_portfolio_returns_cache.RedisService',
-    'app.modules.market_data.tasks.set_indexes_history_cache.RedisService',
+    'app.modules.portfolio.cache.RedisService',
+    'app.modules.portfolio.service.portfolio_report_jobs_service.RedisService',
+    'app.modules.portfolio.consolidation_progress.RedisService',
 ]
 
 
@@ -146,6 +147,12 @@ def mock_redis():
         instance.get_json = AsyncMock(return_value=None)
         instance.set_json = AsyncMock()
         instance.delete = AsyncMock()
+        instance.acquire_lock = AsyncMock(return_value='lock-token')
+        instance.release_lock = AsyncMock()
+        instance.get_version = AsyncMock(return_value=0)
+        instance.bump_version = AsyncMock()
+        instance.get_version_info = AsyncMock(return_value=(0, None))
+        instance.publish_json = AsyncMock()
         patchers.append(p)
     yield
     for p in patchers:
@@ -161,6 +168,7 @@ _RUN_TASK_PATCHES = [
     'app.modules.portfolio.api.transaction.router.run_task',
     'app.modules.portfolio.api.position_consolidator.router.run_task',
     'app.modules.portfolio.service.portfolio_transaction_service.run_task',
+    'app.modules.portfolio.service.portfolio_report_jobs_service.run_task',
 ]
 
 
@@ -180,12 +188,18 @@ def mock_run_task():
 # ---------------------------------------------------------------------------
 @pytest_asyncio.fixture
 async def client():
-    from app.infra.db.session import get_session
+    from app.infra.db.session import (
+        get_read_session,
+        get_read_session_factory,
+        get_session,
+    )
     from app.main import app
     from app.modules.users.views import current_active_user, current_superuser
 
     # Point the app at the test database
     app.dependency_overrides[get_session] = _test_get_session
+    app.dependency_overrides[get_read_session] = _test_get_session
+    app.dependency_overrides[get_read_session_factory] = lambda: asynccontextmanager(_test_get_session)
 
     # Bypass JWT authentication
     fake_user = User(
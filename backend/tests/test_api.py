@@ -9,3 +9,43 @@ async def test_healthcheck_should_return_ok(client):
 
     assert response.status_code == HTTPStatus.OK
     assert response.json() == {'status': 'ok'}
+
+
+@pytest.mark.asyncio
+async def test_db_pool_status_should_return_primary_pool(client):
+    response = await client.get('/monitoring/db/pool')
+
+    assert response.status_code == HTTPStatus.OK
+    primary = response.json()['primary']
+    assert primary['size'] >= 1
+    assert {'checked_out', 'overflow', 'checkouts', 'timeouts', 'avg_wait_ms', 'wait_histogram'} <= primary.keys()
+
+
+@pytest.mark.asyncio
+async def test_cache_metrics_should_count_decorated_lookups(client):
+    await client.get('/assets/assets')
+
+    response = await client.get('/monitoring/cache')
+
+    assert response.status_code == HTTPStatus.OK
+    assets_list = response.json()['prefixes']['assets_list']
+    assert assets_list['misses'] >= 1
+    assert 'l1' in response.json()
+
+
+@pytest.mark.asyncio
+async def test_responses_should_carry_server_timing(client):
+    response = await client.get('/assets/assets')
+
+    assert response.status_code == HTTPStatus.OK
+    server_timing = response.headers['server-timing']
+    assert 'total;dur=' in server_timing
+    assert 'app;dur=' in server_timing
+
+
+@pytest.mark.asyncio
+async def test_profile_should_require_a_superuser(client):
+    response = await client.get('/hc', params={'profile': 1})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'status': 'ok'}
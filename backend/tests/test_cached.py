@@ -0,0 +1,198 @@
+# tests/test_cached.py
+"""
+Tests for the @cached decorator (app/infra/redis/decorators.py) against an
+in-memory RedisService.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+
+from app.infra.redis import decorators
+from app.infra.redis.decorators import ENVELOPE_FRESH_UNTIL, ENVELOPE_VALUE, cached
+
+
+class FakeRedis:
+    """The parts of RedisService used by @cached, kept in a dict."""
+
+    def __init__(self):
+        self.values = {}
+        self.locks = {}
+        self.set_count = 0
+
+    async def get_version(self, tag):
+        return 0
+
+    async def get_json(self, key):
+        return self.values.get(key)
+
+    async def set_json(self, key, value, expire_seconds=None):
+        self.set_count += 1
+        self.values[key] = value
+
+    async def acquire_lock(self, key, timeout_seconds):
+        if key in self.locks:
+            return None
+        self.locks[key] = 'token'
+        return 'token'
+
+    async def release_lock(self, key, token):
+        if self.locks.get(key) == token:
+            del self.locks[key]
+
+
+def _service_class(redis, compute, **cached_kwargs):
+    """A service whose cached `get` awaits `compute(calls)`, `calls` counting its runs."""
+
+    class Service:
+        calls = 0
+
+        def __init__(self, session=None):
+            self.cache = redis
+
+        @cached(key_prefix='test', cache=lambda self: self.cache, **cached_kwargs)
+        async def get(self, item_id: int):
+            Service.calls += 1
+            return await compute(Service.calls)
+
+    return Service
+
+
+def _key(item_id):
+    return f'test:item_id={item_id}'
+
+
+@pytest.fixture(autouse=True)
+def fast_lock_polling(monkeypatch):
+    monkeypatch.setattr(decorators, 'LOCK_POLL_SECONDS', 0.01)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    redis = FakeRedis()
+
+    async def compute(calls):
+        await asyncio.sleep(0.05)
+        return {'calls': calls}
+
+    service = _service_class(redis, compute)()
+
+    results = await asyncio.gather(*(service.get(1) for _ in range(5)))
+
+    assert results == [{'calls': 1}] * 5
+    assert type(service).calls == 1
+    assert redis.set_count == 1
+    assert redis.values[_key(1)][ENVELOPE_VALUE] == {'calls': 1}
+
+
+@pytest.mark.asyncio
+async def test_waits_for_lock_holder_elsewhere():
+    redis = FakeRedis()
+    # Another process holds the lock and stores the value a bit later
+    redis.locks[_key(1)] = 'other'
+
+    async def other_process():
+        await asyncio.sleep(0.05)
+        redis.values[_key(1)] = {ENVELOPE_VALUE: 'theirs', ENVELOPE_FRESH_UNTIL: time.time() + 60}
+
+    async def compute(calls):
+        return 'mine'
+
+    service = _service_class(redis, compute)()
+
+    result, _ = await asyncio.gather(service.get(1), other_process())
+
+    assert result == 'theirs'
+    assert type(service).calls == 0
+
+
+@pytest.mark.asyncio
+async def test_computes_after_lock_wait_times_out():
+    redis = FakeRedis()
+    redis.locks[_key(1)] = 'other'
+
+    async def compute(calls):
+        return 'mine'
+
+    service = _service_class(redis, compute, lock_timeout=0.05)()
+
+    assert await service.get(1) == 'mine'
+    assert type(service).calls == 1
+    # The other process's lock is left alone
+    assert redis.locks[_key(1)] == 'other'
+
+
+@pytest.mark.asyncio
+async def test_waiter_computes_when_first_caller_is_cancelled():
+    redis = FakeRedis()
+
+    async def compute(calls):
+        if calls == 1:
+            await asyncio.sleep(10)
+        return calls
+
+    service = _service_class(redis, compute)()
+
+    first = asyncio.create_task(service.get(1))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(service.get(1))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 2
+    assert first.cancelled()
+    assert _key(1) not in decorators._inflight
+    assert _key(1) not in redis.locks
+
+
+@pytest.mark.asyncio
+async def test_stale_hit_returns_at_once_and_refreshes_once():
+    redis = FakeRedis()
+    redis.values[_key(1)] = {ENVELOPE_VALUE: 'old', ENVELOPE_FRESH_UNTIL: time.time() - 1}
+    refresh_started = asyncio.Event()
+    release_refresh = asyncio.Event()
+
+    async def compute(calls):
+        refresh_started.set()
+        await release_refresh.wait()
+        return 'new'
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    service = _service_class(redis, compute)()
+
+    with patch('app.infra.db.session.AsyncSessionLocal', session_factory):
+        assert await service.get(1) == 'old'
+        assert await service.get(1) == 'old'
+        refresh = decorators._refreshing[_key(1)]
+        await refresh_started.wait()
+        release_refresh.set()
+        await refresh
+
+    assert type(service).calls == 1
+    assert redis.values[_key(1)][ENVELOPE_VALUE] == 'new'
+    assert _key(1) not in decorators._refreshing
+    assert await service.get(1) == 'new'
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter():
+    redis = FakeRedis()
+
+    async def compute(calls):
+        await asyncio.sleep(0.05)
+        raise ValueError('boom')
+
+    service = _service_class(redis, compute)()
+
+    results = await asyncio.gather(*(service.get(1) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert type(service).calls == 1
+    assert redis.values == {}
+    assert redis.locks == {}
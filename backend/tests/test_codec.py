@@ -0,0 +1,103 @@
+# tests/test_codec.py
+"""
+Tests for the cache payload codec (app/infra/redis/codec.py).
+"""
+
+import pytest
+
+from app.config.settings import settings
+from app.infra.redis import codec as codec_module
+from app.infra.redis.codec import RAW, ZLIB, CacheCodec
+from app.infra.redis.redis_service import RedisService
+
+VALUE = {
+    'value': [
+        {'date': '2025-01-02', 'acc_return': 0.0125, 'cagr': None, 'asset_id': 7, 'ticker': 'PETR4'},
+        {'date': '2025-01-03', 'acc_return': -0.5, 'cagr': 1e-9, 'asset_id': 8, 'ticker': 'Itaú'},
+    ],
+    'fresh_until': 1760000000.5,
+    'flags': {'partial': False, 'tags': ['a', 'b']},
+}
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    """Compression threshold set around the size of VALUE's serialized form."""
+    def set_threshold(codec: CacheCodec, above: bool):
+        size = len(codec.codec.dumps(VALUE))
+        monkeypatch.setattr(settings, 'CACHE_COMPRESSION_THRESHOLD_BYTES', size if above else size + 1)
+    return set_threshold
+
+
+@pytest.mark.parametrize('codec_name', ['msgpack', 'json'])
+@pytest.mark.parametrize('compressed', [False, True])
+def test_round_trip(codec_name, compressed, threshold):
+    codec = CacheCodec(codec_name)
+    threshold(codec, above=compressed)
+
+    payload = codec.encode(VALUE)
+
+    assert payload[:1] == (ZLIB if compressed else RAW)
+    assert codec.decode(payload) == VALUE
+    assert codec.decoded_size(payload) == len(codec.codec.dumps(VALUE))
+
+
+def test_msgpack_keeps_int_keys():
+    codec = CacheCodec('msgpack')
+
+    assert codec.decode(codec.encode({1: 'a', 2: ['b']})) == {1: 'a', 2: ['b']}
+
+
+def test_json_rejects_nan():
+    with pytest.raises(ValueError):
+        CacheCodec('json').encode({'value': float('nan')})
+
+
+def test_codec_tag_is_in_the_key(monkeypatch):
+    monkeypatch.setattr(codec_module.cache_codec, 'tag', 'json1')
+    assert RedisService()._format_key('portfolio_returns:1') == 'cache:json1:portfolio_returns:1'
+
+    monkeypatch.setattr(codec_module.cache_codec, 'tag', 'msgpack1')
+    assert RedisService()._format_key('portfolio_returns:1') == 'cache:msgpack1:portfolio_returns:1'
+
+    assert CacheCodec('json').tag == 'json1'
+    assert CacheCodec('msgpack').tag == 'msgpack1'
+
+
+@pytest.fixture
+def thread_calls(monkeypatch):
+    """Names of the codec methods run through asyncio.to_thread."""
+    calls = []
+
+    async def to_thread(func, *args):
+        calls.append(func.__name__)
+        return func(*args)
+
+    monkeypatch.setattr(codec_module.asyncio, 'to_thread', to_thread)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_are_coded_in_a_thread(monkeypatch, thread_calls):
+    monkeypatch.setattr(settings, 'CACHE_CODEC_THREAD_MIN_ITEMS', 100)
+    monkeypatch.setattr(settings, 'CACHE_CODEC_THREAD_THRESHOLD_BYTES', 1024)
+    codec = CacheCodec('msgpack')
+    # The @cached envelope holding a long list of records
+    value = {'value': [{'date': f'2025-01-{i % 28 + 1:02d}', 'close': i / 3} for i in range(500)], 'fresh_until': 1.0}
+
+    payload = await codec.encode_async(value)
+    assert await codec.decode_async(payload) == value
+
+    assert thread_calls == ['encode', 'decode']
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_are_coded_inline(monkeypatch, thread_calls):
+    monkeypatch.setattr(settings, 'CACHE_CODEC_THREAD_MIN_ITEMS', 100)
+    monkeypatch.setattr(settings, 'CACHE_CODEC_THREAD_THRESHOLD_BYTES', 1024)
+    codec = CacheCodec('msgpack')
+
+    payload = await codec.encode_async(VALUE)
+    assert await codec.decode_async(payload) == VALUE
+
+    assert thread_calls == []
@@ -0,0 +1,228 @@
+# tests/test_local_cache.py
+"""
+Tests for the in-process L1 cache (app/infra/redis/local_cache.py) and its
+invalidation listener.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.infra.redis import local_cache as local_cache_module
+from app.infra.redis import redis_service as redis_service_module
+from app.infra.redis.local_cache import (
+    INSTANCE_ID,
+    MISSING,
+    LocalCache,
+    listen_for_invalidations,
+)
+from app.infra.redis.redis_service import RedisService
+
+
+def _enabled_cache(max_bytes=100) -> LocalCache:
+    cache = LocalCache(max_bytes)
+    cache.enabled = True
+    return cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_evicts_least_recently_used_within_byte_budget():
+    cache = _enabled_cache(max_bytes=100)
+    cache.set('a', 'A', size=40)
+    cache.set('b', 'B', size=40)
+    # Reading `a` makes `b` the least recently used
+    assert cache.get('a') == 'A'
+
+    cache.set('c', 'C', size=40)
+
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+    assert cache.used_bytes == 80
+
+
+def test_skips_values_larger_than_the_budget():
+    cache = _enabled_cache(max_bytes=100)
+    cache.set('a', 'A', size=40)
+
+    cache.set('big', 'BIG', size=101)
+
+    assert cache.get('big') is MISSING
+    assert cache.get('a') == 'A'
+    assert cache.used_bytes == 40
+
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = _enabled_cache(max_bytes=100)
+    cache.set('a', 'A', size=40)
+
+    cache.set('a', 'A2', size=30)
+
+    assert cache.get('a') == 'A2'
+    assert cache.used_bytes == 30
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(local_cache_module, 'time', clock)
+    cache = _enabled_cache()
+    cache.set('a', 'A', size=10, ttl_seconds=5)
+    cache.set('b', 'B', size=10)
+
+    clock.now += 4.9
+    assert cache.get('a') == 'A'
+
+    clock.now += 0.1
+    assert cache.get('a') is MISSING
+    assert cache.get('b') == 'B'
+    assert cache.used_bytes == 10
+
+
+def test_set_racing_an_invalidation_is_dropped():
+    cache = _enabled_cache()
+    # Read from Redis before the invalidation arrives, stored after it
+    generation = cache.generation
+    cache.invalidate('a')
+
+    cache.set('a', 'old', size=10, generation=generation)
+
+    assert cache.get('a') is MISSING
+    assert cache.used_bytes == 0
+
+    cache.set('a', 'new', size=10, generation=cache.generation)
+    assert cache.get('a') == 'new'
+
+
+@pytest.mark.asyncio
+async def test_get_json_drops_value_invalidated_during_the_read(monkeypatch):
+    cache = _enabled_cache(max_bytes=1 << 20)
+    monkeypatch.setattr(redis_service_module, 'local_cache', cache)
+    service = RedisService()
+    payload = redis_service_module.cache_codec.encode({'value': 1})
+
+    async def execute():
+        # Another process rewrites the key while the read is in flight
+        cache.invalidate(service._format_key('key'))
+        return [payload, 60_000]
+
+    pipeline = MagicMock()
+    pipeline.get.return_value = pipeline
+    pipeline.pttl.return_value = pipeline
+    pipeline.execute = execute
+    service.client = MagicMock()
+    service.client.pipeline.return_value = pipeline
+
+    assert await service.get_json('key') == {'value': 1}
+    assert cache.get(service._format_key('key')) is MISSING
+
+
+def test_disabled_cache_neither_stores_nor_serves():
+    cache = LocalCache(100)
+
+    cache.set('a', 'A', size=10)
+
+    assert cache.get('a') is MISSING
+    cache.enabled = True
+    assert cache.get('a') is MISSING
+
+
+class FakePubSub:
+    def __init__(self, messages: asyncio.Queue, subscribed: asyncio.Event, block_subscribe: bool):
+        self.messages = messages
+        self.subscribed = subscribed
+        self.block_subscribe = block_subscribe
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def subscribe(self, channel):
+        if self.block_subscribe:
+            # Redis unreachable: the reconnect never completes
+            await asyncio.Event().wait()
+        self.subscribed.set()
+
+    async def listen(self):
+        while True:
+            message = await self.messages.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+
+@pytest.mark.asyncio
+async def test_enabled_only_while_listener_is_subscribed(monkeypatch):
+    cache = LocalCache(100)
+    monkeypatch.setattr(local_cache_module, 'local_cache', cache)
+    monkeypatch.setattr(local_cache_module, 'RECONNECT_DELAY_SECONDS', 0)
+    messages, subscribed = asyncio.Queue(), asyncio.Event()
+    connections = []
+
+    def pubsub():
+        connections.append(FakePubSub(messages, subscribed, block_subscribe=bool(connections)))
+        return connections[-1]
+
+    client = MagicMock()
+    client.pubsub = pubsub
+    client.aclose = AsyncMock()
+    monkeypatch.setattr(local_cache_module.Redis, 'from_url', lambda *args, **kwargs: client)
+
+    assert cache.enabled is False
+    listener = asyncio.create_task(listen_for_invalidations())
+    await subscribed.wait()
+    assert cache.enabled is True
+
+    cache.set('a', 'A', size=10)
+    await messages.put(ConnectionError('connection lost'))
+    while len(connections) < 2:
+        await asyncio.sleep(0.01)
+
+    # Disconnected: nothing is served or stored until it subscribes again
+    assert cache.enabled is False
+    assert cache.used_bytes == 0
+    cache.set('a', 'A', size=10)
+    assert cache.get('a') is MISSING
+
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+    client.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_listener_drops_keys_rewritten_by_other_processes(monkeypatch):
+    cache = LocalCache(100)
+    monkeypatch.setattr(local_cache_module, 'local_cache', cache)
+    messages, subscribed = asyncio.Queue(), asyncio.Event()
+    client = MagicMock()
+    client.pubsub = lambda: FakePubSub(messages, subscribed, block_subscribe=False)
+    client.aclose = AsyncMock()
+    monkeypatch.setattr(local_cache_module.Redis, 'from_url', lambda *args, **kwargs: client)
+
+    listener = asyncio.create_task(listen_for_invalidations())
+    await subscribed.wait()
+    cache.set('mine', 'M', size=10)
+    cache.set('theirs', 'T', size=10)
+    await messages.put({'type': 'subscribe', 'data': 1})
+    await messages.put({'type': 'message', 'data': f'{INSTANCE_ID}:mine'})
+    await messages.put({'type': 'message', 'data': 'other-instance:theirs'})
+    while not messages.empty():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+    assert cache.get('mine') == 'M'
+    assert cache.get('theirs') is MISSING
+
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
@@ -69,6 +69,25 @@ async def test_indexes_time_series_with_data(client, db):
     assert isinstance(data, dict)
 
 
+@pytest.mark.asyncio
+async def test_indexes_time_series_columnar(client, db):
+    """format=columnar returns shared dates and one value array per index."""
+    ih = IndexHistory(index_id=6, date=date(2025, 1, 2), close=130000)
+    db.add(ih)
+    db.commit()
+
+    response = await client.get(
+        '/market_data/indexes/time_series',
+        params={'format': 'columnar', 'date_format': 'epoch_days'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert set(data) == {'dates', 'series'}
+    for values in data['series'].values():
+        assert len(values) == len(data['dates'])
+
+
 # ---------------------------------------------------------------------------
 # USD/BRL HISTORY
 # ---------------------------------------------------------------------------
@@ -92,6 +111,22 @@ async def test_usd_brl_history_with_data(client, db):
     assert isinstance(data, list)
 
 
+@pytest.mark.asyncio
+async def test_usd_brl_history_since(client, db):
+    """`since` returns only newer points and reports the latest date in a header."""
+    db.add_all([
+        IndexHistory(index_id=1, date=date(2025, 1, 2), close=5.25),
+        IndexHistory(index_id=1, date=date(2025, 1, 3), close=5.30),
+    ])
+    db.commit()
+
+    response = await client.get('/market_data/indexes/usd_brl', params={'since': '2025-01-02'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [{'date': '2025-01-03', 'usdbrl': 5.30}]
+    assert response.headers['x-last-consolidated-date'] == '2025-01-03'
+
+
 # ---------------------------------------------------------------------------
 # QUOTES (requires external API – mock MarketDataProvider)
 # ---------------------------------------------------------------------------
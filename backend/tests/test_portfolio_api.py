@@ -5,20 +5,30 @@ Covers portfolio CRUD, transactions, dividends, categories,
 user configuration, and rebalancing.
 """
 
-from datetime import date, datetime
+import io
+import json
+from datetime import date, datetime, timedelta
+from functools import partialmethod
 from http import HTTPStatus
 from unittest.mock import AsyncMock, patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from app.infra.db.models.asset import Asset
-from app.infra.db.models.market_data import Index
+from app.infra.db.models.market_data import Index, IndexHistory
 from app.infra.db.models.portfolio import (
     Broker,
+    CategoryReturn,
     CustomCategory,
     Dividend,
     Portfolio,
+    PortfolioReturn,
+    Position,
     Transaction,
 )
+from app.modules.portfolio.consolidation_progress import ConsolidationProgress
+from app.modules.portfolio.repositories import PortfolioRepository
 
 
 # ---------------------------------------------------------------------------
@@ -55,6 +65,48 @@ async def _create_portfolio(client, name='Carteira Principal', benchmark_id=6):
     return await client.post('/portfolio/create', json=payload)
 
 
+def _seed_position(db, portfolio_id, asset_id, day, quantity, price, average_price):
+    position = Position(
+        portfolio_id=portfolio_id, asset_id=asset_id, date=day, quantity=quantity,
+        price=price, average_price=average_price, daily_return=0, acc_return=0,
+        price_usd=price, average_price_usd=average_price, daily_return_usd=0, acc_return_usd=0,
+    )
+    db.add(position)
+    db.commit()
+    return position
+
+
+def _seed_daily_history(db, portfolio_id, asset_id, broker_id, start, days):
+    """A buy on `start`, then one position and one portfolio return per day."""
+    # USD/BRL (index 1) quote of the buy, the amount invested is converted with it
+    db.add(IndexHistory(index_id=1, date=start, close=5.0))
+    db.add(Transaction(
+        portfolio_id=portfolio_id, asset_id=asset_id, broker_id=broker_id,
+        date=datetime.combine(start, datetime.min.time()), quantity=10, price=30.0,
+    ))
+    for i in range(days):
+        day = start + timedelta(days=i)
+        price = 30.0 + (i % 17) - (i % 5)
+        db.add(Position(
+            portfolio_id=portfolio_id, asset_id=asset_id, date=day, quantity=10,
+            price=price, average_price=30.0, daily_return=0, acc_return=price / 30 - 1,
+            price_usd=price, average_price_usd=30.0, daily_return_usd=0, acc_return_usd=price / 30 - 1,
+        ))
+        db.add(PortfolioReturn(
+            portfolio_id=portfolio_id, date=day, daily_return=0, acc_return=price / 30 - 1,
+        ))
+    db.commit()
+
+
+def _read_arrow_export(response, export_format):
+    """The exported table and the number of chunks (row groups or record batches) it was written in."""
+    if export_format == 'parquet':
+        parquet_file = pq.ParquetFile(io.BytesIO(response.content))
+        return parquet_file.read(), parquet_file.num_row_groups
+    batches = list(pa.ipc.open_stream(response.content))
+    return pa.Table.from_batches(batches), len(batches)
+
+
 def _seed_portfolio(db, name='Carteira Test', user_id=1):
     portfolio = Portfolio(name=name, user_id=user_id)
     db.add(portfolio)
@@ -195,6 +247,67 @@ class TestTransactions:
 
         assert response.status_code == HTTPStatus.OK
 
+    @pytest.mark.asyncio
+    async def test_get_transactions_page(self, client, db):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+
+        for day in (10, 15, 20):
+            db.add(Transaction(
+                portfolio_id=portfolio.id,
+                asset_id=asset.id,
+                broker_id=broker.id,
+                date=datetime(2025, 1, day),
+                quantity=10,
+                price=35.50,
+            ))
+        db.commit()
+
+        response = await client.get(f'/portfolio/transaction/{portfolio.id}/page', params={'limit': 2})
+
+        assert response.status_code == HTTPStatus.OK
+        first_page = response.json()
+        assert [t['date'][:10] for t in first_page['items']] == ['2025-01-20', '2025-01-15']
+        assert first_page['next_cursor']
+
+        response = await client.get(
+            f'/portfolio/transaction/{portfolio.id}/page',
+            params={'limit': 2, 'cursor': first_page['next_cursor']},
+        )
+
+        second_page = response.json()
+        assert [t['date'][:10] for t in second_page['items']] == ['2025-01-10']
+        assert second_page['next_cursor'] is None
+
+    @pytest.mark.asyncio
+    async def test_get_transactions_page_full_sell_profit(self, client, db):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+        db.add_all([
+            Transaction(portfolio_id=portfolio.id, asset_id=asset.id, broker_id=broker.id,
+                        date=datetime(2025, 1, 10), quantity=10, price=30.0),
+            Transaction(portfolio_id=portfolio.id, asset_id=asset.id, broker_id=broker.id,
+                        date=datetime(2025, 1, 20), quantity=-10, price=40.0),
+        ])
+        db.commit()
+        # Positions end the day before the sell that closes them
+        for day in range(10, 20):
+            _seed_position(db, portfolio.id, asset.id, date(2025, 1, day), 10, 35.0, 30.0)
+
+        response = await client.get(f'/portfolio/transaction/{portfolio.id}/page')
+
+        assert response.status_code == HTTPStatus.OK
+        sell, buy = response.json()['items']
+        assert sell['type'] == 'Venda'
+        assert sell['average_price'] == 30.0
+        assert sell['acc_quantity'] == 0
+        assert sell['realized_profit'] == pytest.approx(100.0)
+        assert sell['profit_pct'] == pytest.approx(25.0)
+        assert buy['average_price'] == 30.0
+        assert buy['acc_quantity'] == 10
+
     @pytest.mark.asyncio
     async def test_delete_transaction(self, client, db):
         portfolio = _seed_portfolio(db)
@@ -352,10 +465,15 @@ class TestCategories:
         db.commit()
         db.refresh(cat)
 
-        response = await client.delete(f'/portfolio/category/{cat.id}')
+        with patch(
+            'app.modules.portfolio.service.portfolio_category_service.bump_portfolio_cache_version',
+            new_callable=AsyncMock,
+        ) as bump:
+            response = await client.delete(f'/portfolio/category/{cat.id}')
 
         assert response.status_code == HTTPStatus.OK
         assert db.query(CustomCategory).filter_by(id=cat.id).first() is None
+        bump.assert_awaited_once_with(portfolio.id)
 
     @pytest.mark.asyncio
     async def test_assign_category_to_asset(self, client, db):
@@ -466,6 +584,50 @@ class TestPosition:
 
         assert response.status_code == HTTPStatus.OK
 
+    @pytest.mark.asyncio
+    async def test_get_portfolio_returns_not_modified(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        response = await client.get(f'/portfolio/{portfolio.id}/returns')
+        etag = response.headers['etag']
+        cached_response = await client.get(
+            f'/portfolio/{portfolio.id}/returns',
+            headers={'If-None-Match': etag},
+        )
+
+        assert cached_response.status_code == HTTPStatus.NOT_MODIFIED
+        assert cached_response.headers['etag'] == etag
+
+    @pytest.mark.asyncio
+    async def test_get_position_history_columnar(self, client, db):
+        portfolio = _seed_portfolio(db)
+        petr = _seed_asset(db)
+        vale = _seed_asset(db, ticker='VALE3', name='Vale')
+        for day in (2, 3, 6):
+            _seed_position(db, portfolio.id, petr.id, date(2025, 1, day), 10, 35.0, 30.0)
+        for day in (3, 6, 7):
+            _seed_position(db, portfolio.id, vale.id, date(2025, 1, day), 5, 60.0, 55.0)
+
+        response = await client.get(
+            f'/portfolio/{portfolio.id}/position',
+            params={'most_recent': False, 'format': 'columnar'},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        # Each date once, one array per asset on the shared axis
+        assert data['dates'] == ['2025-01-02', '2025-01-03', '2025-01-06', '2025-01-07']
+        assert data['series']['quantity'] == {
+            str(petr.id): [10, 10, 10, None],
+            str(vale.id): [None, 5, 5, 5],
+        }
+        assert data['series']['value'][str(vale.id)] == [None, 300, 300, 300]
+        assert 'asset_id' not in data['series']
+        assert data['keys'] == {
+            str(petr.id): {'ticker': 'PETR4', 'category': None},
+            str(vale.id): {'ticker': 'VALE3', 'category': None},
+        }
+
     @pytest.mark.asyncio
     async def test_get_patrimony_evolution(self, client, db):
         portfolio = _seed_portfolio(db)
@@ -474,6 +636,61 @@ class TestPosition:
 
         assert response.status_code == HTTPStatus.OK
 
+    @pytest.mark.asyncio
+    async def test_get_patrimony_evolution_downsampled(self, client, db):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+        # 2024-01-01 to 2025-02-03, both Mondays
+        _seed_daily_history(db, portfolio.id, asset.id, broker.id, date(2024, 1, 1), 400)
+
+        response = await client.get(
+            f'/portfolio/{portfolio.id}/patrimony_evolution',
+            params={'start_date': '2024-03-01', 'resolution': 'weekly', 'max_points': 20},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        points = response.json()
+        assert len(points) == 20
+        # Closes of the week of the start date and of the last, partial, week
+        assert points[0]['date'][:10] == '2024-03-03'
+        assert points[-1]['date'][:10] == '2025-02-03'
+        assert all(point['date'][:10] >= '2024-03-01' for point in points)
+
+    @pytest.mark.asyncio
+    async def test_get_dashboard(self, client, db):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+        _seed_daily_history(db, portfolio.id, asset.id, broker.id, date(2024, 1, 1), 400)
+
+        response = await client.post(
+            f'/portfolio/{portfolio.id}/dashboard',
+            json={'views': [
+                {'view': 'position'},
+                {'view': 'returns', 'filters': {'max_points': 100}},
+                {'view': 'patrimony_evolution', 'filters': {'resolution': 'monthly'}},
+                {'view': 'analysis'},
+                {'view': 'dividends'},
+            ]},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        views = response.json()
+        assert set(views) == {'position', 'returns', 'patrimony_evolution', 'analysis', 'dividends'}
+        assert all(view['status'] == HTTPStatus.OK for view in views.values())
+
+        returns = views['returns']['data']
+        assert len(returns) == 100
+        assert returns[0]['date'][:10] == '2024-01-01'
+        assert returns[-1]['date'][:10] == '2025-02-03'
+
+        # Last day of each of the 14 months
+        evolution = views['patrimony_evolution']['data']
+        assert len(evolution) == 14
+        assert evolution[0]['date'][:10] == '2024-01-31'
+        assert evolution[-1]['date'][:10] == '2025-02-03'
+
 
 # ============================================================================
 # INCOME TAX
@@ -501,3 +718,293 @@ class TestIncomeTax:
         )
 
         assert response.status_code == HTTPStatus.OK
+
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+class TestReports:
+
+    @pytest.mark.asyncio
+    async def test_performance_statement_csv(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        response = await client.get(f'/portfolio/{portfolio.id}/reports/performance_statement.csv')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('text/csv')
+        assert response.content.startswith(b'\xef\xbb\xbf')
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('export_format', ['parquet', 'arrow'])
+    async def test_export_position_history(self, client, db, export_format):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+        _seed_daily_history(db, portfolio.id, asset.id, broker.id, date(2024, 1, 1), 400)
+        stream = PortfolioRepository.stream_complete_portfolio_position_history_df
+
+        with patch.object(
+            PortfolioRepository,
+            'stream_complete_portfolio_position_history_df',
+            partialmethod(stream, chunk_size=150),
+        ):
+            response = await client.get(
+                f'/portfolio/{portfolio.id}/reports/position_history.{export_format}'
+            )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-disposition'] == (
+            f'attachment; filename="position_history.{export_format}"'
+        )
+        table, chunks = _read_arrow_export(response, export_format)
+        assert table.num_rows == 400
+        assert chunks == 3
+        assert table.schema.field('date').type == pa.date32()
+        assert table.schema.field('asset_id').type == pa.int64()
+        assert table.schema.field('price').type == pa.float64()
+        assert table.schema.field('ticker').type == pa.string()
+        assert table.column('date')[0].as_py() == date(2024, 1, 1)
+        assert table.column('date')[-1].as_py() == date(2025, 2, 3)
+        assert set(table.column('ticker').to_pylist()) == {'PETR4'}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('export_format', ['parquet', 'arrow'])
+    async def test_export_portfolio_returns(self, client, db, export_format):
+        portfolio = _seed_portfolio(db)
+        asset = _seed_asset(db)
+        broker = _seed_broker(db)
+        _seed_daily_history(db, portfolio.id, asset.id, broker.id, date(2024, 1, 1), 400)
+
+        response = await client.get(f'/portfolio/{portfolio.id}/reports/returns.{export_format}')
+
+        assert response.status_code == HTTPStatus.OK
+        table, _ = _read_arrow_export(response, export_format)
+        assert table.num_rows == 400
+        assert table.schema == pa.schema([
+            ('date', pa.date32()),
+            ('daily_return', pa.float64()),
+            ('acc_return', pa.float64()),
+            ('cagr', pa.float64()),
+        ])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('export_format', ['parquet', 'arrow'])
+    async def test_export_category_returns(self, client, db, export_format):
+        portfolio = _seed_portfolio(db)
+        category = CustomCategory(name='Ações', portfolio_id=portfolio.id, color='#FF0000')
+        db.add(category)
+        db.commit()
+        for i in range(30):
+            db.add(CategoryReturn(
+                portfolio_id=portfolio.id, custom_category_id=category.id,
+                date=date(2025, 1, 1) + timedelta(days=i), daily_return=0.001, acc_return=0.001 * i,
+            ))
+        db.commit()
+
+        response = await client.get(
+            f'/portfolio/{portfolio.id}/reports/category_returns.{export_format}'
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        table, _ = _read_arrow_export(response, export_format)
+        assert table.num_rows == 30
+        assert table.schema == pa.schema([
+            ('date', pa.date32()),
+            ('custom_category_id', pa.int64()),
+            ('category', pa.string()),
+            ('daily_return', pa.float64()),
+            ('acc_return', pa.float64()),
+            ('cagr', pa.float64()),
+        ])
+        assert set(table.column('category').to_pylist()) == {'Ações'}
+
+    @pytest.mark.asyncio
+    async def test_request_performance_statement_job(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        response = await client.post(
+            f'/portfolio/{portfolio.id}/reports/jobs/performance_statement',
+            json={'statement_format': 'csv'},
+        )
+
+        assert response.status_code == HTTPStatus.ACCEPTED
+        job = response.json()
+        assert job['state'] == 'queued'
+        assert job['filename'] == 'performance_statement.csv'
+
+    @pytest.mark.asyncio
+    async def test_stale_running_job_is_requeued(self, client, db):
+        portfolio = _seed_portfolio(db)
+        stale_job = {
+            'job_id': 'stale',
+            'state': 'running',
+            'report': 'performance_statement',
+            'params': {'portfolio_id': portfolio.id, 'asset_ids': None, 'statement_format': 'csv'},
+            'filename': 'performance_statement.csv',
+            'created_at': 0.0,
+            'updated_at': 0.0,
+        }
+
+        with patch('app.modules.portfolio.service.portfolio_report_jobs_service.RedisService') as redis_cls:
+            redis = redis_cls.return_value
+            redis.get_json = AsyncMock(return_value=stale_job)
+            redis.set_json = AsyncMock()
+            redis.acquire_lock = AsyncMock(return_value='lock-token')
+            redis.release_lock = AsyncMock()
+            response = await client.post(
+                f'/portfolio/{portfolio.id}/reports/jobs/performance_statement',
+                json={'statement_format': 'csv'},
+            )
+
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert response.json()['state'] == 'queued'
+
+    @pytest.mark.asyncio
+    async def test_stale_queued_job_is_requeued(self, client, db):
+        portfolio = _seed_portfolio(db)
+        # Its task message was lost: no worker ever took it
+        stale_job = {
+            'job_id': 'lost',
+            'state': 'queued',
+            'report': 'performance_statement',
+            'params': {'portfolio_id': portfolio.id, 'asset_ids': None, 'statement_format': 'csv'},
+            'filename': 'performance_statement.csv',
+            'created_at': 0.0,
+            'updated_at': 0.0,
+        }
+
+        with patch('app.modules.portfolio.service.portfolio_report_jobs_service.RedisService') as redis_cls, \
+                patch('app.modules.portfolio.service.portfolio_report_jobs_service.run_task') as run_task:
+            redis = redis_cls.return_value
+            redis.get_json = AsyncMock(return_value=stale_job)
+            redis.set_json = AsyncMock()
+            redis.acquire_lock = AsyncMock(return_value='lock-token')
+            redis.release_lock = AsyncMock()
+            status_response = await client.get(f'/portfolio/{portfolio.id}/reports/jobs/lost')
+            response = await client.post(
+                f'/portfolio/{portfolio.id}/reports/jobs/performance_statement',
+                json={'statement_format': 'csv'},
+            )
+
+        assert status_response.json()['state'] == 'failed'
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert response.json()['state'] == 'queued'
+        run_task.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_job_fails_when_enqueue_fails(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        with patch('app.modules.portfolio.service.portfolio_report_jobs_service.RedisService') as redis_cls, \
+                patch('app.modules.portfolio.service.portfolio_report_jobs_service.run_task',
+                      side_effect=ConnectionError('broker down')):
+            redis = redis_cls.return_value
+            redis.get_json = AsyncMock(return_value=None)
+            redis.set_json = AsyncMock()
+            redis.acquire_lock = AsyncMock(return_value='lock-token')
+            redis.release_lock = AsyncMock()
+            response = await client.post(
+                f'/portfolio/{portfolio.id}/reports/jobs/performance_statement',
+                json={'statement_format': 'csv'},
+            )
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        saved_job = redis.set_json.await_args.args[1]
+        assert saved_job['state'] == 'failed'
+        assert saved_job['error'] == 'broker down'
+        redis.release_lock.assert_awaited_once()
+
+
+class TestConsolidation:
+
+    @pytest.mark.asyncio
+    async def test_consolidate_in_background(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        with patch('app.modules.portfolio.consolidation_progress.RedisService') as redis_cls, \
+                patch('app.modules.portfolio.api.position_consolidator.router.run_task') as run_task:
+            redis_cls.return_value.set_json = AsyncMock()
+            response = await client.post(f'/portfolio/{portfolio.id}/consolidate', params={'background': True})
+
+        assert response.status_code == HTTPStatus.ACCEPTED
+        run_id = response.json()['run_id']
+        assert response.json() == {'message': 'Queued', 'run_id': run_id}
+        # Stored as queued before the task, so the events stream follows this run
+        status = redis_cls.return_value.set_json.await_args.args[1]
+        assert status['run_id'] == run_id
+        assert status['state'] == 'queued'
+        assert run_task.call_args.kwargs == {'run_id': run_id}
+
+    @pytest.mark.asyncio
+    async def test_consolidate_in_background_enqueue_failure(self, client, db):
+        portfolio = _seed_portfolio(db)
+
+        with patch('app.modules.portfolio.consolidation_progress.RedisService') as redis_cls, \
+                patch('app.modules.portfolio.api.position_consolidator.router.run_task',
+                      side_effect=ConnectionError('broker down')):
+            redis_cls.return_value.set_json = AsyncMock()
+            with pytest.raises(ConnectionError):
+                await client.post(f'/portfolio/{portfolio.id}/consolidate', params={'background': True})
+
+        status = redis_cls.return_value.set_json.await_args.args[1]
+        assert status['state'] == 'failed'
+        assert status['error'] == 'broker down'
+
+    @pytest.mark.asyncio
+    async def test_consolidation_events_end_after_finished_run(self, client, db):
+        portfolio = _seed_portfolio(db)
+        snapshot = {'run_id': 'abc', 'state': 'done', 'total_assets': 1, 'completed': 1, 'failed': 0}
+
+        with patch('app.modules.portfolio.consolidation_progress.RedisService') as redis_cls:
+            redis_cls.return_value.get_json = AsyncMock(return_value=snapshot)
+            response = await client.get(f'/portfolio/{portfolio.id}/consolidation/events')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['content-type'].startswith('text/event-stream')
+        assert response.text.startswith('event: snapshot\n')
+        assert response.text.count('event:') == 1
+
+    @pytest.mark.asyncio
+    async def test_consolidation_events_follow_requested_run(self, client, db):
+        portfolio = _seed_portfolio(db)
+        # The previous run finished; a one-asset run starts and ends while ours runs
+        snapshot = {'run_id': 'previous', 'state': 'done', 'total_assets': 1, 'completed': 1, 'failed': 0}
+        messages = [
+            {'event': 'run_started', 'run_id': 'mine', 'total_assets': 2},
+            {'event': 'run_started', 'run_id': 'single', 'total_assets': 1},
+            {'event': 'run_finished', 'run_id': 'single', 'completed': 1, 'failed': 0},
+            {'event': 'persisted', 'run_id': 'mine', 'asset_id': 1},
+            {'event': 'run_finished', 'run_id': 'mine', 'completed': 2, 'failed': 0},
+        ]
+
+        with patch('app.modules.portfolio.consolidation_progress.RedisService') as redis_cls:
+            redis = redis_cls.return_value
+            redis.get_json = AsyncMock(return_value=snapshot)
+            pubsub = redis.subscribe.return_value.__aenter__.return_value
+            pubsub.get_message = AsyncMock(side_effect=[{'data': json.dumps(m)} for m in messages])
+            response = await client.get(
+                f'/portfolio/{portfolio.id}/consolidation/events', params={'run_id': 'mine'}
+            )
+
+        assert response.status_code == HTTPStatus.OK
+        events = [line.split(': ', 1)[1] for line in response.text.splitlines() if line.startswith('event:')]
+        assert events == ['run_started', 'persisted', 'run_finished']
+        assert '"single"' not in response.text
+
+    @pytest.mark.asyncio
+    async def test_single_asset_run_keeps_running_status(self):
+        running = {'run_id': 'full', 'state': 'running', 'total_assets': 5, 'completed': 2, 'failed': 0}
+
+        with patch('app.modules.portfolio.consolidation_progress.RedisService') as redis_cls:
+            redis = redis_cls.return_value
+            redis.get_json = AsyncMock(return_value=running)
+            redis.set_json = AsyncMock()
+            redis.publish_json = AsyncMock()
+            progress = ConsolidationProgress(1, yields_status=True)
+            await progress.start([7])
+            await progress.finish()
+
+        redis.set_json.assert_not_awaited()
+        assert redis.publish_json.await_args.args[1]['event'] == 'run_finished'
+        assert redis.publish_json.await_args.args[1]['run_id'] == progress.run_id
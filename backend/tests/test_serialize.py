@@ -0,0 +1,75 @@
+# tests/test_serialize.py
+"""
+Tests that the column-wise serializers (app/utils/serialize.py, app/utils/df.py)
+render DataFrames exactly as the per-cell implementations they replaced.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.df import df_to_named_dict
+from app.utils.serialize import df_to_records, dumps, sanitize_dict
+
+
+def _legacy_records(df: pd.DataFrame) -> list[dict]:
+    return jsonable_encoder(sanitize_dict(df.to_dict(orient='records')))
+
+
+def _legacy_named_dict(df: pd.DataFrame) -> dict[str, list[dict]]:
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
+    return {
+        col: df[['date', col]]
+        .dropna()
+        .rename(columns={col: 'value'})
+        .to_dict(orient='records')
+        for col in df.columns
+        if col != 'date'
+    }
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2025-01-02', '2025-01-03', None, '2025-01-06']),
+        'float': [1.5, np.nan, np.inf, -np.inf],
+        'int': [1, 2, 3, 4],
+        'nullable_int': pd.array([1, None, 3, None], dtype='Int64'),
+        'naive_seconds': pd.to_datetime(['2025-01-02 10:30:00', None, '2025-01-03 00:00:00', '2025-01-04 23:59:59']),
+        'naive': pd.to_datetime(['2025-01-02 10:30:00', None, '2025-01-03 00:00:00.250', '2025-01-04'], format='ISO8601'),
+        'aware': pd.to_datetime(['2025-01-02 10:30', None, '2025-01-03 00:00', '2025-01-04 00:00']).tz_localize('America/Sao_Paulo'),
+        'decimal': [Decimal('1.10'), None, Decimal('3'), Decimal('-0.5')],
+        'day': [date(2025, 1, 2), None, date(2025, 1, 3), date(2025, 1, 6)],
+        'ticker': pd.Series(['PETR4', None, 'VALE3', 'ITUB4'], dtype='string'),
+        'name': pd.Series(['Petrobras', None, 'Vale', 'Itaú'], dtype=object),
+        'mixed': ['a', 1, None, 2.5],
+    })
+
+
+def test_df_to_records_matches_legacy_output():
+    df = _frame()
+
+    assert orjson.loads(dumps(df_to_records(df))) == _legacy_records(df)
+
+
+def test_df_to_records_matches_legacy_output_for_empty_frame():
+    df = _frame().iloc[:0]
+
+    assert orjson.loads(dumps(df_to_records(df))) == _legacy_records(df)
+
+
+def test_df_to_named_dict_matches_legacy_output():
+    df = _frame()[['date', 'float', 'int', 'nullable_int', 'decimal']]
+
+    assert df_to_named_dict(df) == _legacy_named_dict(df)
+
+
+def test_df_to_named_dict_matches_legacy_output_for_tz_aware_dates():
+    df = _frame()[['date', 'float', 'int']]
+    df['date'] = df['date'].dt.tz_localize('America/Sao_Paulo')
+
+    assert df_to_named_dict(df) == _legacy_named_dict(df)
@@ -0,0 +1,37 @@
+# tests/test_timeseries.py
+"""
+Tests for the chart series downsampling (app/utils/timeseries.py).
+"""
+
+import numpy as np
+
+from app.utils.timeseries import lttb_indices
+
+
+def test_lttb_keeps_threshold_points_in_order():
+    x = np.arange(400)
+    y = np.sin(x / 20)
+
+    selected = lttb_indices(x, y, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0
+    assert selected[-1] == 399
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_lttb_keeps_spikes():
+    x = np.arange(300)
+    y = np.zeros(300)
+    y[[57, 163, 241]] = [10, -8, 12]
+
+    selected = lttb_indices(x, y, 20)
+
+    assert {57, 163, 241} <= set(selected.tolist())
+
+
+def test_lttb_returns_all_points_below_threshold():
+    x = np.arange(10)
+
+    assert lttb_indices(x, x, 10).tolist() == list(range(10))
+    assert lttb_indices(x, x, 50).tolist() == list(range(10))